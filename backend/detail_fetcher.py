@@ -0,0 +1,110 @@
+# backend/detail_fetcher.py
+import os
+import queue
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Settings
+# -----------------------------
+# Detail pages loaded at once; the per-host budget (backend/host_budget.py) still paces them
+DETAIL_FETCH_WORKERS = int(os.getenv("DETAIL_FETCH_WORKERS", "3"))
+
+# Longest wait for the next page to finish; URLs still unfinished after it are reported as failed
+FETCH_TIMEOUT_SECONDS = float(os.getenv("DETAIL_FETCH_TIMEOUT_SECONDS", "120"))
+
+FETCH_FAILED = "Failed to load job details."
+
+# (job_url, (details, description_text, parsed) or None, error or None)
+FetchResult = Tuple[str, Optional[tuple], Optional[str]]
+
+
+class ParallelDetailFetcher:
+    """
+    Fetches job detail pages on `workers` threads, each with its own scraper
+    (from `scraper_factory`) calling fetch_job_details_cached. A worker returns
+    its browser to the shared driver pool after every page, so N workers share
+    the pooled drivers fairly with each other and with other sessions.
+
+    A page that fails is reported as an error for that URL only; the rest of
+    the batch carries on. Results are available per URL as Futures (submit),
+    through a callback, or as a generator in completion order (fetch_all).
+    """
+
+    def __init__(self, scraper_factory: Callable[[], object], workers: int = DETAIL_FETCH_WORKERS):
+        self.scraper_factory = scraper_factory
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="detail-fetch")
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _scraper(self):
+        scraper = getattr(self._local, "scraper", None)
+        if scraper is None:
+            scraper = self._local.scraper = self.scraper_factory()
+        return scraper
+
+    def _fetch(self, job_url: str):
+        scraper = self._scraper()
+        try:
+            return scraper.fetch_job_details_cached(job_url)
+        finally:
+            scraper.close()  # hand the driver (if one was needed) back between pages
+
+    def submit(self, job_url: str, on_result: Optional[Callable[[str, Optional[tuple], Optional[str]], None]] = None) -> Future:
+        """
+        Queues one URL. The Future resolves to (details, description_text, parsed);
+        on_result(job_url, result, error) is called from the worker thread when it's done.
+        """
+        future = self._executor.submit(self._fetch, job_url)
+        if on_result is not None:
+            future.add_done_callback(lambda f: on_result(*self._outcome(job_url, f)))
+        return future
+
+    @staticmethod
+    def _outcome(job_url: str, future: Future) -> FetchResult:
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Fetching {job_url} failed: {e}")
+            return job_url, None, str(e)
+        if result[0] is None:
+            return job_url, result, FETCH_FAILED
+        return job_url, result, None
+
+    def fetch_all(self, job_urls: Iterable[str], timeout: float = FETCH_TIMEOUT_SECONDS) -> Iterator[FetchResult]:
+        """
+        Fetches every URL and yields (job_url, result, error) as each page finishes.
+        If no page finishes for `timeout` seconds, the URLs still pending are yielded as errors.
+        """
+        done_queue = queue.Queue()
+        pending = {}
+        for position, job_url in enumerate(job_urls):
+            future = self.submit(job_url)
+            pending[position] = (job_url, future)
+            future.add_done_callback(lambda f, position=position: done_queue.put(position))
+
+        while pending:
+            try:
+                position = done_queue.get(timeout=timeout)
+            except queue.Empty:
+                error = f"Timed out after {timeout:g}s."
+                for job_url, future in pending.values():
+                    future.cancel()
+                    logger.error(f"Fetching {job_url} failed: {error}")
+                    yield job_url, None, error
+                return
+            yield self._outcome(*pending.pop(position))
+
+    def close(self) -> None:
+        """Drops queued URLs; pages already loading finish and release their drivers on their own."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
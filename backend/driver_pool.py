@@ -0,0 +1,231 @@
+# backend/driver_pool.py
+import os
+import time
+import atexit
+import random
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Settings
+# -----------------------------
+DEFAULT_POOL_SIZE = int(os.getenv("WEBDRIVER_POOL_SIZE", "2"))
+# A driver is replaced after this many page loads or this much wall time (Chrome leaks memory)
+MAX_PAGES_PER_DRIVER = int(os.getenv("WEBDRIVER_MAX_PAGES", "50"))
+MAX_DRIVER_AGE_SECONDS = float(os.getenv("WEBDRIVER_MAX_AGE_SECONDS", "1800"))
+# How long lease() waits for a driver when every one is in use
+LEASE_TIMEOUT_SECONDS = float(os.getenv("WEBDRIVER_LEASE_TIMEOUT_SECONDS", "120"))
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36"
+]
+
+
+class DriverPoolExhausted(RuntimeError):
+    """No driver became free within the lease timeout."""
+
+
+def is_invalid_session(error: Exception) -> bool:
+    return "invalid session id" in str(error).lower()
+
+
+# -----------------------------
+# Driver creation
+# -----------------------------
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path() -> str:
+    """
+    Path of the chromedriver binary, resolved once per process.
+    CHROMEDRIVER_PATH skips webdriver-manager entirely; otherwise install() runs
+    on first use only (it checks the installed Chrome version on every call).
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = os.getenv("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+            logger.info(f"Using chromedriver at {_driver_path}")
+        return _driver_path
+
+
+def create_chrome_driver(headless: bool = True) -> webdriver.Chrome:
+    """A new Chrome WebDriver with the scraper's anti-detection options."""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+
+    # Anti-detection options
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("window-size=1920,1080")
+    chrome_options.add_argument("--start-maximized")
+
+    # Random user agent
+    chrome_options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
+
+    driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=chrome_options)
+    logger.info("WebDriver initialized successfully.")
+    return driver
+
+
+# -----------------------------
+# Pool
+# -----------------------------
+class DriverLease:
+    """
+    One pooled driver, checked out by one caller at a time.
+    Load pages through get() so the pool can count them and spot dead sessions.
+    """
+
+    def __init__(self, driver, created_at: float):
+        self.driver = driver
+        self.created_at = created_at
+        self.pages = 0
+        self.broken = False
+
+    def get(self, url: str) -> None:
+        self.pages += 1
+        try:
+            self.driver.get(url)
+        except WebDriverException as e:
+            if is_invalid_session(e):
+                self.broken = True
+            raise
+
+    def expired(self, max_pages: int, max_age: float) -> bool:
+        return self.pages >= max_pages or time.monotonic() - self.created_at >= max_age
+
+
+class DriverPool:
+    """
+    Process-wide set of warm WebDrivers shared by every Streamlit session.
+
+    lease() hands out an idle driver (starting one if fewer than `size` exist),
+    release() takes it back. A driver that failed a health check, lost its
+    session, or passed its page/age budget is quit and replaced on the next lease.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, factory: Callable[[], object] = create_chrome_driver,
+                 max_pages: int = MAX_PAGES_PER_DRIVER, max_age: float = MAX_DRIVER_AGE_SECONDS):
+        self.size = max(1, size)
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self._idle: List[DriverLease] = []
+        self._leased: List[DriverLease] = []
+        self._slots = threading.Semaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def lease(self, timeout: float = LEASE_TIMEOUT_SECONDS) -> DriverLease:
+        if not self._slots.acquire(timeout=timeout):
+            raise DriverPoolExhausted(f"No WebDriver free after {timeout:g}s ({self.size} in use).")
+        try:
+            lease = self._take_idle() or self._start()
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._leased.append(lease)
+        return lease
+
+    def release(self, lease: DriverLease, broken: bool = False) -> None:
+        with self._lock:
+            if lease not in self._leased:
+                return  # already released
+            self._leased.remove(lease)
+        try:
+            keep = not (broken or lease.broken or self._closed) and not lease.expired(self.max_pages, self.max_age)
+            if keep:
+                try:
+                    lease.driver.get("about:blank")  # drop the last page's memory and state
+                except WebDriverException:
+                    keep = False
+            if keep:
+                with self._lock:
+                    self._idle.append(lease)
+            else:
+                self._quit(lease)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Quits every driver, including leased ones (for process exit)."""
+        with self._lock:
+            self._closed = True
+            leases, self._idle, self._leased = self._idle + self._leased, [], []
+        for lease in leases:
+            self._quit(lease)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle), "leased": len(self._leased)}
+
+    def _take_idle(self) -> Optional[DriverLease]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                lease = self._idle.pop()  # most recently used: least likely to have gone stale
+            if lease.expired(self.max_pages, self.max_age):
+                self._quit(lease)
+            elif self._healthy(lease):
+                return lease
+            else:
+                logger.warning("Pooled WebDriver failed its health check; replacing it.")
+                self._quit(lease)
+
+    def _start(self) -> DriverLease:
+        return DriverLease(self.factory(), time.monotonic())
+
+    @staticmethod
+    def _healthy(lease: DriverLease) -> bool:
+        try:
+            lease.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _quit(lease: DriverLease) -> None:
+        try:
+            lease.driver.quit()
+        except Exception as e:
+            logger.debug(f"Ignoring error while quitting WebDriver: {e}")
+
+
+_pools: Dict[bool, DriverPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_driver_pool(headless: bool = True) -> DriverPool:
+    """The shared pool for headless (or visible) Chrome, created on first use."""
+    with _pools_lock:
+        pool = _pools.get(headless)
+        if pool is None:
+            pool = _pools[headless] = DriverPool(factory=lambda: create_chrome_driver(headless))
+            if len(_pools) == 1:
+                atexit.register(close_driver_pools)
+        return pool
+
+
+def close_driver_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
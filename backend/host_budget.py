@@ -0,0 +1,64 @@
+# backend/host_budget.py
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict
+from urllib.parse import urlsplit
+
+# -----------------------------
+# Settings
+# -----------------------------
+# Politeness budget per host, shared by the HTTP and browser scrapers in this process
+HOST_MAX_CONCURRENCY = int(os.getenv("SCRAPE_HOST_MAX_CONCURRENCY", "3"))
+HOST_MIN_INTERVAL_SECONDS = float(os.getenv("SCRAPE_HOST_MIN_INTERVAL_SECONDS", "1.0"))
+
+
+class _HostState:
+    __slots__ = ("slots", "lock", "next_start")
+
+    def __init__(self, max_concurrency: int):
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+
+class HostBudget:
+    """
+    Limits how hard the scrapers hit any one host: at most `max_concurrency`
+    page loads in flight, and consecutive loads started at least `min_interval`
+    seconds apart. Wrap each request in `with budget.slot(url):`.
+    """
+
+    def __init__(self, max_concurrency: int = HOST_MAX_CONCURRENCY, min_interval: float = HOST_MIN_INTERVAL_SECONDS):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(self.max_concurrency)
+            return state
+
+    @contextmanager
+    def slot(self, url: str):
+        state = self._state(urlsplit(url).netloc.lower())
+        with state.slots:
+            # Starts are handed out one at a time, each min_interval after the previous one
+            with state.lock:
+                wait = state.next_start - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                state.next_start = time.monotonic() + self.min_interval
+            yield
+
+
+_budget = HostBudget()
+
+
+def get_host_budget() -> HostBudget:
+    """The process-wide budget every scraper request goes through."""
+    return _budget
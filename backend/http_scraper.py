@@ -0,0 +1,204 @@
+# backend/http_scraper.py
+import os
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.driver_pool import USER_AGENTS
+from backend.host_budget import get_host_budget
+from utils.database import LINKEDIN_JOB_ID_RE
+from utils.job_index import html_to_text
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Settings
+# -----------------------------
+# Point this at a local server to run the scraper against saved pages
+LINKEDIN_BASE_URL = os.getenv("LINKEDIN_BASE_URL", "https://www.linkedin.com").rstrip("/")
+# Public guest endpoints: server-rendered HTML fragments, no login or JavaScript needed
+GUEST_SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+GUEST_JOB_PATH = "/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_SCRAPER_TIMEOUT_SECONDS", "15"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_SCRAPER_POOL_SIZE", "4"))
+HTTP_RETRIES = int(os.getenv("HTTP_SCRAPER_RETRIES", "2"))
+
+# Statuses LinkedIn answers with when it refuses guest traffic (999 is its bot block)
+BLOCKED_STATUSES = (401, 403, 429, 999)
+
+
+class HttpScrapeUnavailable(RuntimeError):
+    """The guest endpoints refused the request or could not be reached; use the browser instead."""
+
+
+# -----------------------------
+# Session
+# -----------------------------
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Process-wide keep-alive session: every search and detail fetch reuses the
+    same pooled connections instead of paying a TLS handshake per page.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=HTTP_RETRIES, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                          allowed_methods=("GET",), raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENTS[0],
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "en-US,en;q=0.9",
+            })
+            _session = session
+        return _session
+
+
+def get_html(url: str, params: Optional[Dict[str, str]] = None) -> str:
+    """
+    GET a page through the shared session, within the host's politeness budget.
+    Returns the body ("" for 404, which the guest API uses for "no such page").
+    Raises HttpScrapeUnavailable when blocked, redirected to a login wall, or offline.
+    """
+    try:
+        with get_host_budget().slot(url):
+            response = get_http_session().get(url, params=params, timeout=HTTP_TIMEOUT_SECONDS)
+    except requests.RequestException as e:
+        raise HttpScrapeUnavailable(f"Request failed: {e}") from e
+
+    if response.status_code in BLOCKED_STATUSES or "authwall" in response.url or "/login" in response.url:
+        raise HttpScrapeUnavailable(f"Guest access refused (HTTP {response.status_code}) for {url}")
+    if response.status_code == 404:
+        return ""
+    if response.status_code >= 400:
+        raise HttpScrapeUnavailable(f"HTTP {response.status_code} for {url}")
+    return response.text
+
+
+# -----------------------------
+# Parsing
+# -----------------------------
+def _text(element, selectors: List[str]) -> str:
+    for selector in selectors:
+        found = element.select_one(selector)
+        if found:
+            text = found.get_text(" ", strip=True)
+            if text:
+                return text
+    return ""
+
+
+def parse_job_cards(html: str, convert_date: Callable[[str], Optional[str]]) -> List[Dict[str, str]]:
+    """
+    Job cards from a search results page or guest API fragment, in the same
+    shape LinkedInScraper.scrape_jobs_listing returns. Cards without a title are skipped.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    jobs = []
+    for card in soup.select("div.base-card"):
+        link = card.select_one("a.base-card__full-link") or card.select_one("a[href*='/jobs/view/']")
+        if link is None or not link.get("href"):
+            continue
+        job_url = link["href"].strip().split('?')[0]
+
+        title = _text(card, [".base-search-card__title", "h3"])
+        if not title:
+            logger.warning(f"Skipping card with missing title: {job_url}")
+            continue
+
+        time_elem = card.select_one("time")
+        date_text = (time_elem.get("datetime") or time_elem.get_text(strip=True)) if time_elem else ""
+
+        jobs.append({
+            "job_title": title,
+            "company_name": _text(card, [".base-search-card__subtitle", "h4"]),
+            "location": _text(card, [".job-search-card__location"]),
+            "job_url": job_url,
+            "posted_date": convert_date(date_text) if date_text else datetime.now().isoformat(),
+        })
+    return jobs
+
+
+def parse_job_page(html: str) -> Tuple[Optional[Dict[str, Optional[str]]], str]:
+    """
+    (details, description_text) from a job posting page or guest API fragment,
+    matching LinkedInScraper.fetch_job_details; (None, "") if it has no description.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    description_box = soup.select_one(".show-more-less-html__markup")
+    if description_box is None:
+        return None, ""
+
+    description_html = description_box.decode_contents().strip()
+    applicants = soup.select_one(".num-applicants__caption")
+    details = {
+        "job_description": description_html,
+        "applicants_count": applicants.get_text(" ", strip=True) if applicants else None,
+    }
+    # Same text the catalog path derives from stored HTML
+    return details, html_to_text(description_html).strip()
+
+
+# -----------------------------
+# Endpoints
+# -----------------------------
+def guest_job_url(job_url: str) -> str:
+    """The guest API fragment for a posting, or the posting page itself if its id is unknown."""
+    match = LINKEDIN_JOB_ID_RE.search(urlsplit(job_url).path)
+    if match:
+        return LINKEDIN_BASE_URL + GUEST_JOB_PATH.format(job_id=match.group(1))
+    return job_url
+
+
+def fetch_job_cards(search_params: Dict[str, str], limit_pages: int,
+                    convert_date: Callable[[str], Optional[str]]) -> List[Dict[str, str]]:
+    """
+    Walks the guest search pagination (start=0, then past every card seen so far)
+    for up to `limit_pages` pages. Stops early on an empty page or one with nothing new.
+    Raises HttpScrapeUnavailable if the first page has content but no recognisable
+    cards (a changed layout or an interstitial), since the browser may still cope.
+    """
+    job_data = []
+    seen_urls = set()
+    start = 0
+    for page in range(limit_pages):
+        html = get_html(LINKEDIN_BASE_URL + GUEST_SEARCH_PATH, {**search_params, "start": str(start)})
+        cards = parse_job_cards(html, convert_date) if html.strip() else []
+        logger.info(f"Guest search page {page + 1}/{limit_pages}: {len(cards)} cards.")
+        if page == 0 and html.strip() and not cards and "base-card" not in html:
+            raise HttpScrapeUnavailable("Guest search returned a page without job cards.")
+
+        new_cards = [card for card in cards if card["job_url"] not in seen_urls]
+        seen_urls.update(card["job_url"] for card in new_cards)
+        job_data.extend(new_cards)
+        if not new_cards:
+            break
+        start += len(cards)
+    return job_data
+
+
+def fetch_job_details(job_url: str) -> Tuple[Optional[Dict[str, Optional[str]]], str]:
+    """
+    (details, description_text) for one posting over plain HTTP.
+    Falls back from the guest API to the public posting page before giving up with (None, "").
+    """
+    api_url = guest_job_url(job_url)
+    details, description_text = parse_job_page(get_html(api_url))
+    if details is None and api_url != job_url:
+        details, description_text = parse_job_page(get_html(job_url))
+    return details, description_text
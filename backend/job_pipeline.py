@@ -0,0 +1,147 @@
+# backend/job_pipeline.py
+import os
+import queue
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from backend.models import WeightedMatch
+from backend.detail_fetcher import DETAIL_FETCH_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Max concurrent tasks per stage.
+# "fetch" loads detail pages on that many scrapers at once (paced per host by backend/host_budget.py).
+DEFAULT_STAGE_LIMITS = {
+    "fetch": DETAIL_FETCH_WORKERS,
+    "parse": 3,
+    "match": 3,
+}
+# Longest wait for the next job to finish; jobs still unfinished after it are reported as failed
+RESULT_TIMEOUT_SECONDS = float(os.getenv("PIPELINE_RESULT_TIMEOUT_SECONDS", "300"))
+
+
+class JobMatchPipeline:
+    """
+    Pipelined job analysis: fetch details -> (parse JD || score match) per job.
+    Postings already in the shared job catalog skip the fetch and parse stages.
+
+    Detail pages load concurrently through the scraper's detail_fetcher, and
+    the LLM calls for jobs that were already fetched run alongside them, so
+    total time approaches the slowest single job instead of the sum of all of them.
+    Results are yielded in completion order by `run()`.
+    """
+
+    def __init__(self, scraper, analyzer, resume_text: str, max_workers: int = 6,
+                 stage_limits: Optional[Dict[str, int]] = None):
+        self.scraper = scraper
+        self.analyzer = analyzer
+        self.resume_text = resume_text
+        self.max_workers = max_workers
+
+        limits = {**DEFAULT_STAGE_LIMITS, **(stage_limits or {})}
+        self.fetch_workers = max(1, limits["fetch"])
+        self._stage_slots = {name: threading.Semaphore(max(1, n)) for name, n in limits.items()}
+
+    def _run_stage(self, stage: str, fn, *args):
+        with self._stage_slots[stage]:
+            return fn(*args)
+
+    # -----------------------------
+    # Stage functions (worker threads)
+    # -----------------------------
+    def _parse(self, job_url: str, description_text: str) -> Dict[str, Any]:
+        return self._run_stage("parse", self.scraper.parse_job_details_cached, job_url, description_text)
+
+    def _match(self, job_description: str) -> WeightedMatch:
+        return self._run_stage("match", self.analyzer.analyze_match_weighted, self.resume_text, job_description)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def run(self, jobs: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Processes all jobs concurrently.
+        Yields (job, full_job_data, error) as each one finishes; full_job_data is None on failure.
+        Consume this from the Streamlit script thread so UI/DB calls stay on that thread.
+        """
+        if not jobs:
+            return
+
+        done_queue = queue.Queue()
+        # Fetches get their own workers so jobs waiting on a page never tie up LLM workers
+        fetcher = self.scraper.detail_fetcher(self.fetch_workers)
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+
+        # Callbacks run on worker threads, where concurrent.futures swallows exceptions;
+        # every path through them must end in finish() or run() would wait forever
+        def finish(index, full_job_data, error=None):
+            done_queue.put((index, full_job_data, error))
+
+        def on_fetched(index, fetch_future):
+            try:
+                job = jobs[index]
+                try:
+                    details, description_text, parsed = fetch_future.result()
+                except Exception as e:
+                    return finish(index, None, str(e))
+                if details is None:
+                    return finish(index, None, "Failed to load job details.")
+
+                # JD parsing and match scoring only depend on the fetched page, so run them side by side
+                if parsed is not None:  # parsed before, for this or another user
+                    parse_future = Future()
+                    parse_future.set_result(parsed)
+                else:
+                    parse_future = executor.submit(self._parse, job["job_url"], description_text)
+                match_future = executor.submit(self._match, details.get("job_description", ""))
+            except Exception as e:  # incl. RuntimeError: executor shut down (consumer stopped early)
+                return finish(index, None, str(e))
+
+            pending = [2]
+            pending_lock = threading.Lock()
+
+            def on_stage_done(_):
+                with pending_lock:
+                    pending[0] -= 1
+                    if pending[0]:
+                        return
+                try:
+                    try:
+                        details.update(parse_future.result())
+                    except Exception as e:
+                        logger.warning(f"JD parsing failed for {job.get('job_url')}: {e}")
+                    match_data = match_future.result()
+                    # Flat fields for the DB/UI, plus the typed match built once here
+                    finish(index, {**job, **details, **match_data.to_dict(), "match": match_data})
+                except Exception as e:
+                    finish(index, None, str(e))
+
+            parse_future.add_done_callback(on_stage_done)
+            match_future.add_done_callback(on_stage_done)
+
+        try:
+            for index, job in enumerate(jobs):
+                future = fetcher.submit(job["job_url"])
+                future.add_done_callback(lambda f, index=index: on_fetched(index, f))
+
+            unfinished = set(range(len(jobs)))
+            while unfinished:
+                try:
+                    index, full_job_data, error = done_queue.get(timeout=RESULT_TIMEOUT_SECONDS)
+                except queue.Empty:
+                    error = f"Timed out after {RESULT_TIMEOUT_SECONDS:g}s."
+                    for index in sorted(unfinished):
+                        logger.error(f"Pipeline failed for {jobs[index].get('job_url')}: {error}")
+                        yield jobs[index], None, error
+                    return
+                if index not in unfinished:
+                    continue  # already reported
+                unfinished.discard(index)
+                if error:
+                    logger.error(f"Pipeline failed for {jobs[index].get('job_url')}: {error}")
+                yield jobs[index], full_job_data, error
+        finally:
+            fetcher.close()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,246 @@
+# backend/json_extract.py
+import re
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+
+VALID_ESCAPES = frozenset('"\\/bfnrtu')
+PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+JSON_LITERALS = frozenset(("true", "false", "null"))
+CLOSERS = {"{": "}", "[": "]"}
+CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+# Runs of characters that need no attention, copied in one step
+PLAIN_OUTSIDE_RE = re.compile(r"[^\"'{}\[\]/A-Za-z_]+")
+PLAIN_INSIDE_RE = re.compile(r"[^\"'\\\x00-\x1f]+")
+WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# "{" followed by a (possibly single-quoted) key or "}", i.e. what a real object starts with
+OBJECT_START_RE = re.compile(r"\{\s*[\"'}]")
+WHITESPACE = " \t\r\n"
+
+
+def _next_significant(text: str, pos: int) -> str:
+    n = len(text)
+    while pos < n and text[pos] in WHITESPACE:
+        pos += 1
+    return text[pos] if pos < n else ""
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out:
+        last = out[-1].rstrip()
+        if not last:
+            out.pop()
+            continue
+        out[-1] = last[:-1] if last.endswith(",") else last
+        return
+
+
+def repair_json_object(text: str, start: int = 0) -> str:
+    """
+    Rewrites the JSON object that begins at text[start] ("{") into strict JSON, in one pass:
+
+    - single-quoted strings -> double-quoted
+    - raw newlines/tabs/control characters inside strings -> escaped
+    - stray quotes inside strings (e.g. 'Master's') -> escaped
+    - invalid backslash escapes -> literal backslashes
+    - trailing commas before } or ] -> removed
+    - True/False/None -> true/false/null; bare keys -> quoted
+    - // comments -> removed
+    - truncated output -> open strings and brackets are closed
+
+    Stops at the brace that closes the object, so trailing prose is ignored.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None
+    i, n = start, len(text)
+
+    while i < n:
+        if quote:
+            m = PLAIN_INSIDE_RE.match(text, i)
+            if m:
+                out.append(m.group())
+                i = m.end()
+                continue
+            ch = text[i]
+            if ch == "\\":
+                nxt = text[i + 1] if i + 1 < n else ""
+                if nxt == "'":
+                    out.append("'")
+                    i += 2
+                elif nxt in VALID_ESCAPES:
+                    out.append(ch + nxt)
+                    i += 2
+                else:
+                    out.append("\\\\")
+                    i += 1
+                continue
+            if ch == quote:
+                # A quote only ends the string if JSON structure follows it
+                if _next_significant(text, i + 1) in (",", "}", "]", ":", ""):
+                    out.append('"')
+                    quote = None
+                else:
+                    out.append('\\"' if ch == '"' else ch)
+            elif ch == '"':
+                out.append('\\"')
+            elif ch == "'":
+                out.append(ch)
+            else:
+                out.append(CONTROL_ESCAPES.get(ch, ""))
+            i += 1
+            continue
+
+        m = PLAIN_OUTSIDE_RE.match(text, i)
+        if m:
+            out.append(m.group())
+            i = m.end()
+            continue
+        ch = text[i]
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            out.append(CLOSERS[stack.pop()] if stack else ch)
+            if not stack:
+                return "".join(out)
+        elif ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif ch == "/":
+            out.append(ch)
+        else:
+            word = WORD_RE.match(text, i).group()
+            i += len(word)
+            if word in PY_LITERALS:
+                out.append(PY_LITERALS[word])
+            elif word not in JSON_LITERALS and _next_significant(text, i) == ":":
+                out.append(f'"{word}"')
+            else:
+                out.append(word)
+            continue
+        i += 1
+
+    # Truncated response: close whatever is still open
+    if quote:
+        out.append('"')
+    _strip_trailing_comma(out)
+    while stack:
+        out.append(CLOSERS[stack.pop()])
+    return "".join(out)
+
+
+def parse_llm_json(text: str) -> Dict[str, Any]:
+    """
+    Extracts the first JSON object from an LLM answer (fences, preambles and
+    trailing prose are ignored). Valid JSON is decoded by the C parser directly;
+    anything else goes through one repair pass. Returns {"error": ...} on failure.
+    """
+    if not text:
+        return {"error": "Empty response from LLM"}
+
+    # Skip braces in surrounding prose ("{placeholder}") when something better is present
+    match = OBJECT_START_RE.search(text)
+    start = match.start() if match else text.find("{")
+    if start == -1:
+        return {"error": "Invalid JSON response from LLM", "raw_response": text[:500]}
+
+    try:
+        obj, _ = _decoder.raw_decode(text, start)
+        if isinstance(obj, dict):
+            return obj
+    except (ValueError, RecursionError):  # JSONDecodeError, or absurdly deep nesting
+        pass
+
+    try:
+        obj = json.loads(repair_json_object(text, start))
+        if isinstance(obj, dict):
+            return obj
+    except (ValueError, RecursionError):  # JSONDecodeError, or absurdly deep nesting
+        pass
+
+    logger.error(f"Failed to parse JSON. Raw text start: {text[:200]}...")
+    return {"error": "Invalid JSON response from LLM", "raw_response": text[:500]}
+
+
+# -----------------------------
+# Schema validation
+# -----------------------------
+# A schema mirrors the expected JSON: {"score": int, "strengths": [str], "section": {"score": int}}.
+# [schema] means "list of schema"; a type means a leaf value of that type.
+
+def _coerce_leaf(value: Any, expected: type) -> Tuple[bool, Any]:
+    if expected is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return True, float(value)
+    if isinstance(value, expected) and not (expected is int and isinstance(value, bool)):
+        return True, value
+    if expected is str:
+        if value is None:
+            return True, None
+        if isinstance(value, (int, float)):
+            return True, str(value)
+        return False, None
+    if expected in (int, float) and isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        try:
+            number = float(str(value).strip().rstrip("%"))
+        except ValueError:
+            return False, None
+        return True, int(round(number)) if expected is int else number
+    return False, None
+
+
+def _validate(value: Any, schema: Any, path: str, problems: List[str]) -> Tuple[bool, Any]:
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            problems.append(f"{path.rstrip('.') or 'response'}: expected object")
+            return False, None
+        result = dict(value)
+        for key, sub_schema in schema.items():
+            if key not in value:
+                problems.append(f"{path}{key}: missing")
+                continue
+            ok, coerced = _validate(value[key], sub_schema, f"{path}{key}.", problems)
+            if ok:
+                result[key] = coerced
+            else:
+                del result[key]
+        return True, result
+
+    if isinstance(schema, list):
+        if isinstance(value, (str, dict)):
+            value = [value]  # a single item where a list was expected
+        if not isinstance(value, list):
+            problems.append(f"{path.rstrip('.')}: expected list")
+            return False, None
+        items = []
+        for item in value:
+            ok, coerced = _validate(item, schema[0], path, problems)
+            if ok:
+                items.append(coerced)
+        return True, items
+
+    ok, coerced = _coerce_leaf(value, schema)
+    if not ok:
+        problems.append(f"{path.rstrip('.')}: expected {schema.__name__}, got {type(value).__name__}")
+    return ok, coerced
+
+
+def validate_schema(data: Dict[str, Any], schema: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Coerces `data` towards `schema` (numeric strings -> numbers, a lone string ->
+    one-item list, ...). Values that cannot be coerced are dropped so callers'
+    .get() defaults apply. Returns (cleaned data, list of problems found).
+    """
+    problems: List[str] = []
+    ok, cleaned = _validate(data, schema, "", problems)
+    return (cleaned if ok else {}), problems
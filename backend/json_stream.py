@@ -0,0 +1,108 @@
+# backend/json_stream.py
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class IncrementalJSONObjectParser:
+    """
+    Parses a JSON object that arrives in chunks (a streamed LLM answer) and
+    reports each top-level field as soon as its value is complete.
+
+        parser = IncrementalJSONObjectParser()
+        for chunk in stream:
+            for key, value in parser.feed(chunk):
+                ...
+
+    Text before the first "{" (markdown fences, preambles) is ignored. The
+    scanner keeps its state between chunks, so every character is looked at once.
+    Values that are not valid JSON on their own are skipped here; the caller
+    still gets the complete text from `text` for a final, more lenient parse.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._reading_key = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Adds a chunk; returns the (key, value) pairs completed by it."""
+        if not chunk or self.done:
+            return []
+        self._text += chunk
+        text = self._text
+        completed = []
+
+        pos = self._pos
+        while pos < len(text):
+            ch = text[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._reading_key:
+                        self._reading_key = False
+                        try:
+                            self._key = json.loads(text[self._key_start:pos + 1])
+                        except json.JSONDecodeError:
+                            self._key = None
+                pos += 1
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                pos += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._reading_key = True
+                    self._key_start = pos
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_field(text, pos, completed)
+                    self.done = True
+                    pos += 1
+                    break
+            elif self._depth == 1:
+                if ch == ":" and self._key is not None and self._value_start is None:
+                    self._value_start = pos + 1
+                elif ch == ",":
+                    self._complete_field(text, pos, completed)
+            pos += 1
+
+        self._pos = pos
+        return completed
+
+    def _complete_field(self, text: str, end: int, completed: List[Tuple[str, Any]]) -> None:
+        key, start = self._key, self._value_start
+        self._key = None
+        self._value_start = None
+        if key is None or start is None:
+            return
+        try:
+            value = json.loads(text[start:end])
+        except json.JSONDecodeError:
+            return
+        self.fields[key] = value
+        completed.append((key, value))
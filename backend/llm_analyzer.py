@@ -1,17 +1,25 @@
 import os
+import hashlib
 import logging
-import json
 import re
-import time
-import ast
-from typing import Dict, Any, Optional
+import asyncio
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
 
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage
 from google.api_core.exceptions import ResourceExhausted
 
+from backend.llm_client import get_shared_client, run_sync, iterate_sync
+from backend.json_stream import IncrementalJSONObjectParser
+from backend.json_extract import parse_llm_json, validate_schema
+from backend.llm_cache import get_llm_cache, make_cache_key
+from backend.skill_matcher import score_match
+from backend.models import MATCH_COMPONENT_MAX, REPORT_SECTIONS, ResumeAnalysis, WeightedMatch, SkillsGap
+from backend.rate_limiter import (
+    get_rate_limiter, is_quota_error, backoff_delay,
+    PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, DEFAULT_QUOTA_WAIT_SECONDS,
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -21,164 +29,252 @@ env_path = Path(__file__).parent.parent / ".env"
 logger.info(f"Loading .env from: {env_path} (Exists: {env_path.exists()})")
 load_dotenv(dotenv_path=env_path, override=True)
 
+MODEL_NAME = "gemini-flash-latest"
+
+# Rough prompt sizing for batched calls (Gemini averages ~4 characters per token)
+CHARS_PER_TOKEN = 4
+# Tokens reserved from the TPM budget for the model's answer
+RESPONSE_TOKEN_ESTIMATE = 1024
+BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "12000"))
+
+# Field order matters: the report renders (and streams) top to bottom
+COMPREHENSIVE_ANALYSIS_PROMPT = """
+        Review the resume and provide a comprehensive, critical analysis aimed at a Software Engineering/Tech role.
+        
+        CRITICALLY ANALYZE FOR GAPS:
+        1. **Internships/Work Experience**: Does the candidate have industry experience? If missing, this is a CRITICAL GAP.
+        2. **DSA & Problem Solving**: Look specifically for "Data Structures", "Algorithms", "LeetCode", "CodeForces", etc. If missing, suggest it.
+        3. **Project Complexity**: Are the projects simple or complex? (e.g., clone apps vs real-world solutions).
+        4. **Tech Stack**: Is the stack modern? (e.g., React, Node, Cloud vs legacy).
+
+        Return a JSON object with this exact structure:
+        {
+            "candidate_name": "Name or 'Not Found'",
+            "candidate_email": "Email or 'Not Found'",
+            "candidate_phone": "Phone or 'Not Found'",
+            "score": INTEGER_0_TO_100,
+            "summary": "Brief professional summary. Mention if they differ from a typical candidate (e.g. no internships).",
+            "section_analysis": {
+                "summary_section": {"score": INT, "feedback": ["feedback"]},
+                "experience_section": {"score": INT, "feedback": ["feedback"]},
+                "projects_section": {"score": INT, "feedback": ["feedback"]},
+                "skills_section": {"score": INT, "feedback": ["feedback"]},
+                "education_section": {"score": INT, "feedback": ["feedback"]}
+            },
+            "strengths": ["List of 3-5 key strengths (e.g. 'Strong Academic Record', 'Full Stack Projects')"],
+            "weaknesses": [
+                "List of 3-5 critical weaknesses.",
+                "Explicitly mention 'Missing Internship Experience' if applicable.",
+                "Explicitly mention 'Lack of DSA/Competitive Programming evidence' if applicable."
+            ],
+            "skills_found": ["List of technical/soft skills"],
+            "missing_skills": ["List of missing implied skills (e.g., Git, Docker, Testing)"],
+            "improvement_suggestions": [
+                {"impact": "High", "suggestion": "Specific advice (e.g. 'Focus on DSA questions on LeetCode')"},
+                {"impact": "High", "suggestion": "Advice on Internships if missing"},
+                {"impact": "Medium", "suggestion": "Advice on Projects/Certs"}
+            ]
+        }
+        """
+
+# Expected response shapes (see backend/json_extract.validate_schema)
+COMPREHENSIVE_ANALYSIS_SCHEMA = {
+    "candidate_name": str,
+    "candidate_email": str,
+    "candidate_phone": str,
+    "score": int,
+    "summary": str,
+    "section_analysis": {
+        section: {"score": int, "feedback": [str]}
+        for section in REPORT_SECTIONS
+    },
+    "strengths": [str],
+    "weaknesses": [str],
+    "skills_found": [str],
+    "missing_skills": [str],
+    "improvement_suggestions": [{"impact": str, "suggestion": str}],
+}
+# Stored analyses are keyed by resume hash + this; editing the prompt or model makes them stale
+COMPREHENSIVE_PROMPT_VERSION = hashlib.sha256(
+    f"{MODEL_NAME}\n{COMPREHENSIVE_ANALYSIS_PROMPT}".encode("utf-8")
+).hexdigest()[:16]
+JOB_RECOMMENDATIONS_SCHEMA = {
+    "recommendations": [{
+        "role": str,
+        "match_score": int,
+        "matching_skills": [str],
+        "missing_skills": [str],
+        "salary_range": str,
+    }],
+    "overall_summary": str,
+}
+JOB_DESCRIPTION_SCHEMA = {
+    "salary_range": str,
+    "required_skills": [str],
+    "experience_level": str,
+    "job_type": str,
+    "education": str,
+}
+WEIGHTED_MATCH_SCHEMA = {
+    "match_score": int,
+    "component_scores": {name: int for name in MATCH_COMPONENT_MAX},
+    "matching_skills": [str],
+    "missing_skills": [str],
+    "analysis_summary": str,
+}
+# Entries are checked one by one by _validate_match_result
+BATCH_MATCH_SCHEMA = {"results": [{}]}
+SKILLS_GAP_SCHEMA = {
+    "match_score": int,
+    "summary": str,
+    "must_have": {"matched": [str], "missing": [str]},
+    "nice_to_have": {"matched": [str], "missing": [str]},
+    "recommendations": [{"skill": str, "why_important": str, "learning_resources": [str]}],
+}
+
+def _recover_api_key_from_file() -> Optional[str]:
+    """Attempt to read GOOGLE_API_KEY directly from .env file as a fallback."""
+    try:
+        if env_path.exists():
+            logger.info(f"Attempting manual key recovery from {env_path}")
+            content = env_path.read_text()
+            for line in content.splitlines():
+                if line.strip().startswith("GOOGLE_API_KEY="):
+                    parts = line.split("=", 1)
+                    if len(parts) == 2:
+                        key = parts[1].strip().strip('"').strip("'")
+                        if len(key) > 20:
+                            os.environ["GOOGLE_API_KEY"] = key
+                            return key
+    except Exception:
+        pass
+    return None
+
+_resolved_api_key: Optional[str] = None
+
+def _resolve_api_key() -> Optional[str]:
+    """Resolves the key once per process instead of on every LLMAnalyzer() (misses are retried)."""
+    global _resolved_api_key
+    if _resolved_api_key is None:
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key or "your_api_key" in api_key.lower() or len(api_key) < 20:
+            api_key = _recover_api_key_from_file()
+        _resolved_api_key = api_key
+    return _resolved_api_key
+
 class LLMAnalyzer:
     """
     Robust LLM Analyzer for Google Gemini.
     Handles JSON parsing with multiple fallback strategies.
     """
 
-    def __init__(self, temperature: float = 0.5):
+    def __init__(self, temperature: float = 0.5, use_cache: bool = True):
         """
         Initialize with lower temperature for more deterministic outputs.
         """
         self.mock_mode = False
         self.llm = None
+        self.model_name = MODEL_NAME
+        self.temperature = temperature
+        self.cache = get_llm_cache() if use_cache else None
+        self.client = None
         
-        # 1. Get API Key
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key or "your_api_key" in api_key.lower() or len(api_key) < 20:
-            api_key = self._recover_api_key_from_file()
+        # 1. Get API Key (resolved once per process)
+        api_key = _resolve_api_key()
 
-        # 2. Initialize Gemini
+        # 2. Initialize Gemini (shared client, reused across sessions/pages)
         if not api_key:
             logger.warning("No valid GOOGLE_API_KEY found. Analysis will fail.")
             self.llm = None
         else:
             try:
                 # Use gemini-flash-latest (Verified available)
-                # Use gemini-1.5-flash (Standard stable model)
-                self.llm = ChatGoogleGenerativeAI(
-                    model="gemini-flash-latest",
-                    google_api_key=api_key,
-                    temperature=temperature,
-                    convert_system_message_to_human=True,
-                    request_timeout=60,
-                    max_retries=2,
-                    # Disable safety filters to prevent "Empty Response" on valid resumes
-                    safety_settings={
-                        "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
-                        "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
-                        "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
-                        "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
-                    }
-                )
-                logger.info("LLMAnalyzer initialized successfully with Gemini (gemini-1.5-flash).")
+                self.client = get_shared_client(api_key, self.model_name, temperature)
+                self.llm = self.client.llm
+                logger.info(f"LLMAnalyzer initialized successfully with Gemini ({self.model_name}).")
             except Exception as e:
                 logger.error(f"Failed to initialize Gemini: {e}")
                 self.llm = None
 
     def _recover_api_key_from_file(self) -> Optional[str]:
         """Attempt to read GOOGLE_API_KEY directly from .env file as a fallback."""
-        try:
-            env_path = Path(__file__).parent.parent / ".env"
-            if env_path.exists():
-                logger.info(f"Attempting manual key recovery from {env_path}")
-                content = env_path.read_text()
-                for line in content.splitlines():
-                    if line.strip().startswith("GOOGLE_API_KEY="):
-                        parts = line.split("=", 1)
-                        if len(parts) == 2:
-                            key = parts[1].strip().strip('"').strip("'")
-                            if len(key) > 20:
-                                os.environ["GOOGLE_API_KEY"] = key
-                                return key
-        except Exception:
-            pass
-        return None
+        return _recover_api_key_from_file()
 
-    def _clean_and_parse_json(self, text: str) -> Dict[str, Any]:
+    def _clean_and_parse_json(self, text: str, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Robust JSON parsing strategy:
-        1. Clean Markdown fences.
-        2. Try standard json.loads.
-        3. Try regex extraction of first {...}.
-        4. Try ast.literal_eval (handling single quotes).
+        Single-pass extraction of the first JSON object in `text`, repairing common
+        LLM defects (see backend/json_extract.py). With a `schema`, values are
+        coerced to the expected types and a response sharing none of its keys is rejected.
         """
-        if not text:
-            return {"error": "Empty response from LLM"}
-
-        # 1. Basic cleaning
-        text = text.strip()
-        # Remove markdown fences
-        if "```" in text:
-            # Try to match specific json blocks first
-            if "```json" in text:
-                try:
-                    text = text.split("```json")[1].split("```")[0].strip()
-                except IndexError:
-                    pass
-            else:
-                try:
-                    text = text.split("```")[1].split("```")[0].strip()
-                except IndexError:
-                    pass
+        result = parse_llm_json(text)
+        if schema is None or "error" in result:
+            return result
 
-        # 2. Direct JSON Parse
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            pass # Fallthrough
+        cleaned, problems = validate_schema(result, schema)
+        if problems:
+            logger.warning(f"LLM response schema issues: {'; '.join(problems[:10])}")
+        if not any(key in cleaned for key in schema):
+            return {"error": "LLM response did not match the expected format", "raw_response": text[:500]}
+        return cleaned
 
-        # 3. Regex Extraction (Find outermost brackets)
-        try:
-            match = re.search(r"(\{.*\})", text, re.DOTALL)
-            if match:
-                potential_json = match.group(1)
-                return json.loads(potential_json)
-        except json.JSONDecodeError:
-            pass
-
-        # 4. AST Literal Eval (Handles Python-style dicts with single quotes)
-        try:
-            # Need to find start/end again for this to work well
-            start = text.find("{")
-            end = text.rfind("}")
-            if start != -1 and end != -1:
-                potential_dict = text[start:end+1]
-                return ast.literal_eval(potential_dict)
-        except (ValueError, SyntaxError):
-            pass
-
-        logger.error(f"Failed to parse JSON. Raw text start: {text[:200]}...")
-        return {"error": "Invalid JSON response from LLM", "raw_response": text[:500]}
-
-    def _call_llm(self, prompt: str, retries: int = 2) -> str:
+    async def acall(self, prompt: str, retries: int = 2, priority: int = PRIORITY_INTERACTIVE) -> str:
+        """
+        Async Gemini call on the shared client, paced by the shared rate limiter.
+
+        Quota errors (429) pause every caller for the server's suggested delay and
+        are retried until the quota wait budget runs out; other errors get `retries`
+        attempts with jittered exponential backoff.
+        """
         if not self.llm:
             print("ERR: LLM not initialized.")
             raise Exception("LLM is not initialized.")
 
-        messages = [HumanMessage(content=prompt)]
-        
-        for attempt in range(retries + 1):
+        limiter = get_rate_limiter()
+        quota_budget = limiter.quota_wait_seconds if limiter else DEFAULT_QUOTA_WAIT_SECONDS
+        est_tokens = len(prompt) // CHARS_PER_TOKEN + RESPONSE_TOKEN_ESTIMATE
+
+        attempt = 0
+        quota_attempt = 0
+        quota_waited = 0.0
+        while True:
             try:
-                print(f"DEBUG: Calling Gemini (Attempt {attempt+1})...")
-                response = self.llm.invoke(messages)
-                content = str(response.content)
-                print(f"DEBUG: Response gathered. Length: {len(content)}")
+                logger.debug(f"Calling Gemini (attempt {attempt + quota_attempt + 1})...")
+                content = await self.client.ainvoke(prompt, priority=priority, est_tokens=est_tokens)
+                logger.debug(f"Response gathered. Length: {len(content)}")
                 return content
 
             except Exception as e:
-                print(f"DEBUG: LLM Error: {e}")
-                error_str = str(e)
-                if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                    wait = 5.0 * (attempt + 1)
-                    if wait > 30: wait = 30
-                    logger.warning(f"Quota exceeded. Waiting {wait}s...")
-                    time.sleep(wait)
+                logger.warning(f"LLM error: {e}")
+                if is_quota_error(e):
+                    wait = backoff_delay(quota_attempt, e)
+                    if quota_waited + wait > quota_budget:
+                        logger.error(f"Quota still exhausted after waiting {quota_waited:.0f}s; giving up.")
+                        raise e
+                    logger.warning(f"Quota exceeded. Waiting {wait:.1f}s...")
+                    if limiter is not None:
+                        # Every queued caller waits it out, instead of each one retrying into the wall
+                        limiter.penalize(wait)
+                    else:
+                        await asyncio.sleep(wait)
+                    quota_waited += wait
+                    quota_attempt += 1
                     continue
-                
+
                 logger.error(f"LLM Call Error: {e}")
-                if attempt == retries:
+                if attempt >= retries:
                     raise e
-                time.sleep(2)
-        
-        return ""
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
 
-    def analyze_resume_generic(self, resume_text: str, task_prompt: str) -> Dict[str, Any]:
-        if self.mock_mode:
-            return self._get_mock_response(task_prompt)
+    def _call_llm(self, prompt: str, retries: int = 2, priority: int = PRIORITY_INTERACTIVE) -> str:
+        """Blocking wrapper around acall() for Streamlit code paths."""
+        if not self.llm:
+            print("ERR: LLM not initialized.")
+            raise Exception("LLM is not initialized.")
+        return run_sync(self.acall(prompt, retries, priority))
 
-        full_prompt = f"""
+    def _build_prompt(self, resume_text: str, task_prompt: str) -> str:
+        return f"""
         You are an expert resume analyzer.
         RESUME TEXT:
         {resume_text}
@@ -193,9 +289,40 @@ class LLMAnalyzer:
         - Ensure all strings are double-quoted.
         """
 
+    def _generate_json(self, resume_text: str, task_prompt: str,
+                       priority: int = PRIORITY_INTERACTIVE,
+                       schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Cached LLM round trip: returns the parsed JSON for (resume_text, task_prompt).
+        Successful results are stored in the shared response cache, so a repeated
+        request is answered from disk without touching the network.
+        Raises on LLM failure; parse failures come back as {"error": ...}.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(self.model_name, self.temperature, task_prompt, resume_text)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM cache hit.")
+                return cached
+
+        full_prompt = self._build_prompt(resume_text, task_prompt)
+        response_text = self._call_llm(full_prompt, priority=priority)
+        result = self._clean_and_parse_json(response_text, schema)
+
+        # Only real answers are cached; errors should be retried next time
+        if cache_key and isinstance(result, dict) and "error" not in result:
+            self.cache.set(cache_key, result)
+        return result
+
+    def analyze_resume_generic(self, resume_text: str, task_prompt: str,
+                               priority: int = PRIORITY_INTERACTIVE,
+                               schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if self.mock_mode:
+            return self._get_mock_response(task_prompt)
+
         try:
-            response_text = self._call_llm(full_prompt)
-            result = self._clean_and_parse_json(response_text)
+            result = self._generate_json(resume_text, task_prompt, priority, schema)
             
             # FALLBACK: If API returns error/empty, fall back to mock data so user sees something
             if "error" in result:
@@ -220,51 +347,83 @@ class LLMAnalyzer:
 
     # --- Specific Analysis Methods (Keep wrappers as they defines prompts) ---
 
-    def analyze_resume_comprehensive(self, resume_text: str) -> Dict[str, Any]:
+    def analyze_resume_comprehensive(self, resume_text: str) -> ResumeAnalysis:
         logger.info(f"Analyzing resume text (Length: {len(resume_text)} characters)")
         if len(resume_text) < 50:
             logger.warning("Resume text is suspiciously short/empty!")
-            return {"error": "Resume content appears to be empty or unreadable. Please upload a clear text-based PDF/DOCX."}
+            return ResumeAnalysis(error="Resume content appears to be empty or unreadable. Please upload a clear text-based PDF/DOCX.")
 
-        prompt = """
-        Review the resume and provide a comprehensive, critical analysis aimed at a Software Engineering/Tech role.
-        
-        CRITICALLY ANALYZE FOR GAPS:
-        1. **Internships/Work Experience**: Does the candidate have industry experience? If missing, this is a CRITICAL GAP.
-        2. **DSA & Problem Solving**: Look specifically for "Data Structures", "Algorithms", "LeetCode", "CodeForces", etc. If missing, suggest it.
-        3. **Project Complexity**: Are the projects simple or complex? (e.g., clone apps vs real-world solutions).
-        4. **Tech Stack**: Is the stack modern? (e.g., React, Node, Cloud vs legacy).
+        return ResumeAnalysis.from_dict(self.analyze_resume_generic(
+            resume_text, COMPREHENSIVE_ANALYSIS_PROMPT, schema=COMPREHENSIVE_ANALYSIS_SCHEMA
+        ))
 
-        Return a JSON object with this exact structure:
-        {
-            "candidate_name": "Name or 'Not Found'",
-            "candidate_email": "Email or 'Not Found'",
-            "candidate_phone": "Phone or 'Not Found'",
-            "score": INTEGER_0_TO_100,
-            "summary": "Brief professional summary. Mention if they differ from a typical candidate (e.g. no internships).",
-            "strengths": ["List of 3-5 key strengths (e.g. 'Strong Academic Record', 'Full Stack Projects')"],
-            "weaknesses": [
-                "List of 3-5 critical weaknesses.",
-                "Explicitly mention 'Missing Internship Experience' if applicable.",
-                "Explicitly mention 'Lack of DSA/Competitive Programming evidence' if applicable."
-            ],
-            "skills_found": ["List of technical/soft skills"],
-            "missing_skills": ["List of missing implied skills (e.g., Git, Docker, Testing)"],
-            "improvement_suggestions": [
-                {"impact": "High", "suggestion": "Specific advice (e.g. 'Focus on DSA questions on LeetCode')"},
-                {"impact": "High", "suggestion": "Advice on Internships if missing"},
-                {"impact": "Medium", "suggestion": "Advice on Projects/Certs"}
-            ],
-            "section_analysis": {
-                "summary_section": {"score": INT, "feedback": ["feedback"]},
-                "experience_section": {"score": INT, "feedback": ["feedback"]},
-                "projects_section": {"score": INT, "feedback": ["feedback"]},
-                "skills_section": {"score": INT, "feedback": ["feedback"]},
-                "education_section": {"score": INT, "feedback": ["feedback"]}
-            }
-        }
+    def stream_resume_comprehensive(self, resume_text: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Streaming variant of analyze_resume_comprehensive(): yields (field, value)
+        pairs as soon as each top-level field of the answer has arrived, so the
+        report can render while Gemini is still generating.
+        Cache hits, mock mode and failed streams yield the whole result at once.
+        A stream that broke off after some fields ends with ("provisional", True):
+        the report is incomplete, so it is neither cached nor meant to be stored.
         """
-        return self.analyze_resume_generic(resume_text, prompt)
+        if len(resume_text) < 50 or self.mock_mode or not self.llm:
+            yield from self.analyze_resume_comprehensive(resume_text).to_dict().items()
+            return
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(self.model_name, self.temperature, COMPREHENSIVE_ANALYSIS_PROMPT, resume_text)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM cache hit.")
+                yield from cached.items()
+                return
+
+        logger.info(f"Streaming resume analysis (Length: {len(resume_text)} characters)")
+        full_prompt = self._build_prompt(resume_text, COMPREHENSIVE_ANALYSIS_PROMPT)
+        est_tokens = len(full_prompt) // CHARS_PER_TOKEN + RESPONSE_TOKEN_ESTIMATE
+        parser = IncrementalJSONObjectParser()
+        streamed = set()  # keys already yielded; parser.fields also holds ones validation rejected
+        try:
+            for chunk in iterate_sync(self.client.astream(full_prompt, PRIORITY_INTERACTIVE, est_tokens)):
+                for key, value in parser.feed(chunk):
+                    if key in COMPREHENSIVE_ANALYSIS_SCHEMA:
+                        cleaned, _ = validate_schema({key: value}, {key: COMPREHENSIVE_ANALYSIS_SCHEMA[key]})
+                        if key not in cleaned:
+                            continue  # wrong shape; the final parse below logs it
+                        value = cleaned[key]
+                    streamed.add(key)
+                    yield key, value
+        except Exception as e:
+            logger.warning(f"Streaming failed: {e}")
+            if not streamed:
+                # Nothing shown yet: the regular path has the quota retries and fallbacks
+                yield from self.analyze_resume_comprehensive(resume_text).to_dict().items()
+                return
+
+        result = self._clean_and_parse_json(parser.text, COMPREHENSIVE_ANALYSIS_SCHEMA)
+        if "error" in result:
+            if not streamed:
+                yield from self.analyze_resume_comprehensive(resume_text).to_dict().items()
+                return
+            # Otherwise keep the partial report that was already streamed
+            result = {}
+
+        # Fields the incremental parser could not decode on their own, or that only
+        # passed validation once the final parse coerced them
+        for key, value in result.items():
+            if key not in streamed:
+                yield key, value
+
+        # Only a finished answer with every field is worth reusing; a truncated one
+        # repaired into valid JSON would otherwise sit in the cache for days
+        missing = [key for key in COMPREHENSIVE_ANALYSIS_SCHEMA if key not in result]
+        if parser.done and not missing:
+            if cache_key:
+                self.cache.set(cache_key, result)
+        else:
+            logger.warning(f"Resume analysis stream incomplete (missing: {', '.join(missing) or 'closing brace'}).")
+            yield "provisional", True
 
     def analyze_job_recommendations(self, resume_text: str) -> Dict[str, Any]:
         prompt = """
@@ -283,7 +442,7 @@ class LLMAnalyzer:
             "overall_summary": "Brief summary of career path"
         }
         """
-        return self.analyze_resume_generic(resume_text, prompt)
+        return self.analyze_resume_generic(resume_text, prompt, schema=JOB_RECOMMENDATIONS_SCHEMA)
 
     def parse_job_description(self, job_description: str) -> Dict[str, Any]:
         prompt = f"""
@@ -301,9 +460,10 @@ class LLMAnalyzer:
         """
         # Note: replace prompt template usage with f-string for simplicity in generic call if needed, 
         # but here we pass description in prompt.
-        return self.analyze_resume_generic("", prompt) 
+        # Background priority: queued JD parsing must not delay a user's resume analysis.
+        return self.analyze_resume_generic("", prompt, priority=PRIORITY_BACKGROUND, schema=JOB_DESCRIPTION_SCHEMA)
 
-    def analyze_match_weighted(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+    def analyze_match_weighted(self, resume_text: str, job_description: str) -> WeightedMatch:
         """
         Analyzes match with specific weighted scoring:
         - Skills: 50%
@@ -312,13 +472,12 @@ class LLMAnalyzer:
         - Responsibility: 10%
         """
         if self.mock_mode:
-            return {
+            return WeightedMatch.from_dict({
                 "match_score": 85,
                 "matching_skills": ["Python", "Streamlit"],
                 "missing_skills": ["Java"],
                 "analysis_summary": "Good match based on mock data.",
-                "explanation": "Mock explanation."
-            }
+            })
 
         prompt = f"""
         Compare the Resume and Job Description using the following STRICT SCORING RULES:
@@ -348,13 +507,134 @@ class LLMAnalyzer:
             "analysis_summary": "Brief explanation of the score."
         }}
         """
-        return self.analyze_resume_generic(resume_text, prompt)
+        try:
+            result = self._generate_json(resume_text, prompt, schema=WEIGHTED_MATCH_SCHEMA)
+            if "error" not in result:
+                return WeightedMatch.from_dict(result)
+            note = "AI response could not be parsed"
+        except Exception as e:
+            error_msg = str(e).lower()
+            if "exhausted" in error_msg or "quota" in error_msg or "429" in error_msg:
+                note = "Google AI quota reached"
+            else:
+                note = "AI service unavailable"
+
+        # FALLBACK: deterministic local scoring instead of mock data
+        logger.warning(f"{note}, using local skill matcher.")
+        local = score_match(resume_text, job_description)
+        local["analysis_summary"] += f" [NOTE: {note}; score computed locally.]"
+        return WeightedMatch.from_dict(local)
+
+    def _validate_match_result(self, entry: Any) -> Optional[WeightedMatch]:
+        """Converts one batched entry to a WeightedMatch, or None if it has no usable score."""
+        if not isinstance(entry, dict):
+            return None
+        try:
+            float(entry.get("match_score"))
+        except (TypeError, ValueError):
+            return None
+        return WeightedMatch.from_dict(entry)
+
+    def _chunk_jobs_by_budget(self, resume_text: str, job_descriptions: List[str], max_prompt_tokens: int) -> List[List[int]]:
+        """Groups job indexes so each batched prompt stays under the token budget (at least one job per chunk)."""
+        base_tokens = (len(resume_text) + 2500) // CHARS_PER_TOKEN  # resume + instructions
+        chunks, current, used = [], [], base_tokens
+        for idx, jd in enumerate(job_descriptions):
+            job_tokens = (len(jd) + 40) // CHARS_PER_TOKEN
+            if current and used + job_tokens > max_prompt_tokens:
+                chunks.append(current)
+                current, used = [], base_tokens
+            current.append(idx)
+            used += job_tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def analyze_matches_batch(self, resume_text: str, job_descriptions: List[str],
+                              max_prompt_tokens: int = BATCH_TOKEN_BUDGET) -> List[WeightedMatch]:
+        """
+        Scores many job descriptions against one resume, sending the resume once per request.
+        Uses the same 50/25/15/10 weighting as analyze_match_weighted.
+        Jobs are split into several requests when the prompt would exceed `max_prompt_tokens`;
+        any entry that is missing or fails validation is re-scored with a single-job call.
+        Returns one WeightedMatch per job description, in input order.
+        """
+        if not job_descriptions:
+            return []
+        if self.mock_mode:
+            return [self.analyze_match_weighted(resume_text, jd) for jd in job_descriptions]
+
+        resume_text = resume_text[:4000]
+        job_descriptions = [(jd or "")[:4000] for jd in job_descriptions]
+        results: List[Optional[WeightedMatch]] = [None] * len(job_descriptions)
+
+        for chunk in self._chunk_jobs_by_budget(resume_text, job_descriptions, max_prompt_tokens):
+            jobs_block = "\n\n".join(
+                f"JOB [{n}]:\n{job_descriptions[idx]}" for n, idx in enumerate(chunk)
+            )
+            prompt = f"""
+        Compare the Resume with EACH of the {len(chunk)} Job Descriptions below using the following STRICT SCORING RULES:
+        
+        1. **Skill Match (50%)**: Do they have the required technical/soft skills?
+        2. **Experience Match (25%)**: Do they have the years of experience and relevant industry background?
+        3. **Education Match (15%)**: Do they meet the degree/field requirements?
+        4. **Responsibility Match (10%)**: Have they done similar tasks?
+
+        Score every job independently.
 
-    def analyze_match(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+        {jobs_block}
+        
+        Return a JSON object with this exact structure, with one entry per job:
+        {{
+            "results": [
+                {{
+                    "job_index": INT (the number in JOB [n]),
+                    "match_score": INT_0_TO_100 (Sum of weighted components),
+                    "component_scores": {{
+                        "skills": INT_0_TO_50,
+                        "experience": INT_0_TO_25,
+                        "education": INT_0_TO_15,
+                        "responsibility": INT_0_TO_10
+                    }},
+                    "matching_skills": ["list of matched skills"],
+                    "missing_skills": ["list of missing skills"],
+                    "analysis_summary": "Brief explanation of the score."
+                }}
+            ]
+        }}
+        """
+            try:
+                parsed = self._generate_json(resume_text, prompt, schema=BATCH_MATCH_SCHEMA)
+            except Exception as e:
+                logger.warning(f"Batched match call failed ({len(chunk)} jobs): {e}")
+                continue
+
+            entries = parsed.get("results") if isinstance(parsed, dict) else None
+            if not isinstance(entries, list):
+                logger.warning("Batched match response had no 'results' list.")
+                continue
+
+            for pos, entry in enumerate(entries):
+                n = entry.get("job_index", pos) if isinstance(entry, dict) else pos
+                try:
+                    n = int(n)
+                except (TypeError, ValueError):
+                    n = pos
+                if 0 <= n < len(chunk) and results[chunk[n]] is None:
+                    results[chunk[n]] = self._validate_match_result(entry)
+
+        # Fallback: per-job calls for anything the batch did not return cleanly
+        for idx, result in enumerate(results):
+            if result is None:
+                logger.info(f"Falling back to single-job scoring for job {idx}.")
+                results[idx] = self.analyze_match_weighted(resume_text, job_descriptions[idx])
+        return results
+
+    def analyze_match(self, resume_text: str, job_description: str) -> WeightedMatch:
         # Alias for backward compatibility or simple match
         return self.analyze_match_weighted(resume_text, job_description)
 
-    def analyze_skills_gap(self, resume_text: str, target_role: str, experience_level: str) -> Dict[str, Any]:
+    def analyze_skills_gap(self, resume_text: str, target_role: str, experience_level: str) -> SkillsGap:
         prompt = f"""
         Perform a comprehensive gap analysis between the Resume and the Target Role: "{target_role}" ({experience_level}).
         
@@ -382,7 +662,7 @@ class LLMAnalyzer:
             ]
         }}
         """
-        return self.analyze_resume_generic(resume_text, prompt)
+        return SkillsGap.from_dict(self.analyze_resume_generic(resume_text, prompt, schema=SKILLS_GAP_SCHEMA))
 
     def check_connection(self) -> bool:
         if self.mock_mode: return False
@@ -455,6 +735,7 @@ class LLMAnalyzer:
         
         # Default to Resume Analysis structure
         return {
+            "provisional": True,
             "candidate_name": real_details["name"],
             "candidate_email": real_details["email"],
             "candidate_phone": real_details["phone"],
@@ -0,0 +1,151 @@
+# backend/llm_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from utils.data_paths import data_path
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Defaults (overridable via .env)
+# -----------------------------
+CACHE_FILE = os.getenv("LLM_CACHE_PATH", data_path("llm_cache.db"))
+DEFAULT_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+
+
+def make_cache_key(model: str, temperature: float, task_prompt: str, resume_text: str) -> str:
+    """
+    Content-addressed key: SHA-256 over (model, temperature, task prompt, resume text).
+    Fields are length-prefixed so different splits of the same bytes never collide.
+    """
+    h = hashlib.sha256()
+    for part in (model or "", f"{float(temperature):.4f}", task_prompt or "", resume_text or ""):
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Persistent SQLite cache for parsed LLM responses.
+
+    - Shared by every Streamlit session and process that points at the same file.
+    - Entries expire after `ttl_seconds`.
+    - When more than `max_entries` rows exist, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str = CACHE_FILE, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        # timeout lets concurrent processes wait on each other's writes instead of failing
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_accessed REAL NOT NULL
+        )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            response, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET last_accessed = ? WHERE cache_key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_cache (cache_key, response, created_at, last_accessed)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(value), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drops expired rows, then trims the oldest-accessed rows beyond max_entries."""
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        if self.max_entries:
+            self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE cache_key IN (
+                    SELECT cache_key FROM llm_cache
+                    ORDER BY last_accessed DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+# -----------------------------
+# Process-wide instance
+# -----------------------------
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Returns the shared cache, or None if it could not be opened (caching is then skipped)."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                try:
+                    _shared_cache = LLMResponseCache()
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM cache unavailable: {e}")
+                    return None
+    return _shared_cache
@@ -0,0 +1,165 @@
+# backend/llm_client.py
+import queue
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import AsyncIterator, Dict, Iterator, Tuple, Optional
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.messages import HumanMessage
+
+from backend.rate_limiter import get_rate_limiter, PRIORITY_INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Background event loop
+# -----------------------------
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    One asyncio loop per process, running in a daemon thread.
+    All Gemini calls go through it, so the async transport (and its keep-alive
+    connections) is created once and reused by every Streamlit session.
+    """
+    global _loop, _loop_thread
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="gemini-event-loop", daemon=True)
+                thread.start()
+                _loop, _loop_thread = loop, thread
+    return _loop
+
+
+def run_sync(coro, timeout: Optional[float] = None):
+    """Runs a coroutine on the shared loop and blocks the calling (non-loop) thread for the result."""
+    loop = get_event_loop()
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("run_sync() called from the event loop thread; await the coroutine instead.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+_STREAM_END = object()
+
+
+def iterate_sync(agen: AsyncIterator, timeout: Optional[float] = None) -> Iterator:
+    """
+    Consumes an async generator on the shared loop from a normal thread,
+    yielding its items as they arrive. Exceptions are re-raised in the caller.
+    Closing the returned generator early cancels the async side.
+    """
+    items: "queue.Queue" = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except BaseException as e:  # includes CancelledError when the consumer stops early
+            items.put((_STREAM_END, e))
+            raise
+        else:
+            items.put((_STREAM_END, None))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    try:
+        while True:
+            item, error = items.get(timeout=timeout)
+            if item is _STREAM_END:
+                if error is not None and not isinstance(error, asyncio.CancelledError):
+                    raise error
+                return
+            yield item
+    finally:
+        future.cancel()
+
+
+# -----------------------------
+# Shared client
+# -----------------------------
+class SharedGeminiClient:
+    """
+    Process-wide wrapper around ChatGoogleGenerativeAI.
+
+    Identical prompts that are in flight at the same time are coalesced: the
+    first caller starts the request and every other caller awaits the same result.
+    """
+
+    def __init__(self, api_key: str, model: str, temperature: float):
+        self.model = model
+        self.temperature = temperature
+        self.llm = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=api_key,
+            temperature=temperature,
+            convert_system_message_to_human=True,
+            request_timeout=60,
+            max_retries=2,
+            # Disable safety filters to prevent "Empty Response" on valid resumes
+            safety_settings={
+                "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
+                "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
+                "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
+                "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
+            }
+        )
+        # Only touched from the event loop thread, so no lock is needed
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def _ainvoke_once(self, prompt: str, priority: int, est_tokens: int) -> str:
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            await limiter.acquire(est_tokens, priority)
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        return str(response.content)
+
+    async def ainvoke(self, prompt: str, priority: int = PRIORITY_INTERACTIVE, est_tokens: int = 0) -> str:
+        """
+        Sends `prompt` to Gemini, sharing the request with identical concurrent callers.
+        Only the request that actually goes upstream takes a slot from the rate limiter.
+        """
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._ainvoke_once(prompt, priority, est_tokens))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, key=key: self._inflight.pop(key, None))
+        else:
+            logger.info("Coalescing identical in-flight Gemini request.")
+        # shield: one caller being cancelled must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def astream(self, prompt: str, priority: int = PRIORITY_INTERACTIVE, est_tokens: int = 0) -> AsyncIterator[str]:
+        """Streams the answer to `prompt` chunk by chunk. Streams are never coalesced."""
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            await limiter.acquire(est_tokens, priority)
+        async for chunk in self.llm.astream([HumanMessage(content=prompt)]):
+            if chunk.content:
+                yield str(chunk.content)
+
+    def invoke(self, prompt: str, priority: int = PRIORITY_INTERACTIVE, est_tokens: int = 0) -> str:
+        return run_sync(self.ainvoke(prompt, priority, est_tokens))
+
+
+_clients: Dict[Tuple[str, float, str], SharedGeminiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_shared_client(api_key: str, model: str, temperature: float) -> SharedGeminiClient:
+    """Returns the process-wide client for (model, temperature, key), creating it on first use."""
+    key = (model, float(temperature), api_key)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = SharedGeminiClient(api_key, model, temperature)
+    return client
@@ -0,0 +1,301 @@
+# backend/models.py
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Max points per component of the 50/25/15/10 weighted match
+MATCH_COMPONENT_MAX = {"skills": 50, "experience": 25, "education": 15, "responsibility": 10}
+
+REPORT_SECTIONS = ("summary_section", "experience_section", "projects_section", "skills_section", "education_section")
+
+
+# -----------------------------
+# Coercion helpers
+# -----------------------------
+def _int(value: Any, low: int = 0, high: int = 100) -> int:
+    try:
+        number = int(round(float(value.strip().rstrip("%")) if isinstance(value, str) else float(value)))
+    except (TypeError, ValueError):
+        return low
+    return max(low, min(high, number))
+
+
+def _str(value: Any, default: str = "") -> str:
+    if value is None:
+        return default
+    return value if isinstance(value, str) else str(value)
+
+
+def _str_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value] if value else []
+    if not isinstance(value, list):
+        return []
+    return [v if isinstance(v, str) else str(v) for v in value if v is not None]
+
+
+def _dict(value: Any) -> Dict[str, Any]:
+    # Mapping, not dict: stored rows arrive as lazily decoded JsonRow objects
+    return value if isinstance(value, Mapping) else {}
+
+
+# -----------------------------
+# Comprehensive resume analysis
+# -----------------------------
+@dataclass(slots=True)
+class SectionScore:
+    score: int = 0
+    feedback: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "SectionScore":
+        data = _dict(data)
+        return cls(score=_int(data.get("score"), 0, 10), feedback=_str_list(data.get("feedback")))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"score": self.score, "feedback": list(self.feedback)}
+
+
+@dataclass(slots=True)
+class Suggestion:
+    impact: str = "Medium"
+    suggestion: str = "No details available."
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Suggestion":
+        if isinstance(data, str):
+            return cls(suggestion=data)
+        data = _dict(data)
+        return cls(impact=_str(data.get("impact"), "Medium"), suggestion=_str(data.get("suggestion"), "No details available."))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"impact": self.impact, "suggestion": self.suggestion}
+
+
+@dataclass(slots=True)
+class ResumeAnalysis:
+    candidate_name: str = "Not Found"
+    candidate_email: str = "Not Found"
+    candidate_phone: str = "Not Found"
+    score: int = 0
+    summary: str = "No summary available."
+    section_analysis: Dict[str, SectionScore] = field(default_factory=dict)
+    strengths: List[str] = field(default_factory=list)
+    weaknesses: List[str] = field(default_factory=list)
+    skills_found: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+    improvement_suggestions: List[Suggestion] = field(default_factory=list)
+    # Demo/fallback data shown when the real analysis was unavailable; never persisted
+    provisional: bool = False
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResumeAnalysis":
+        """Builds a result from parsed LLM JSON (or mock data), coercing every field."""
+        data = _dict(data)
+        if data.get("error"):
+            return cls(error=_str(data["error"]))
+        sections = _dict(data.get("section_analysis"))
+        suggestions = data.get("improvement_suggestions")
+        return cls(
+            candidate_name=_str(data.get("candidate_name"), "Not Found"),
+            candidate_email=_str(data.get("candidate_email"), "Not Found"),
+            candidate_phone=_str(data.get("candidate_phone"), "Not Found"),
+            score=_int(data.get("score")),
+            summary=_str(data.get("summary"), "No summary available."),
+            section_analysis={key: SectionScore.from_dict(value) for key, value in sections.items()},
+            strengths=_str_list(data.get("strengths")),
+            weaknesses=_str_list(data.get("weaknesses")),
+            skills_found=_str_list(data.get("skills_found")),
+            missing_skills=_str_list(data.get("missing_skills")),
+            improvement_suggestions=[Suggestion.from_dict(s) for s in suggestions] if isinstance(suggestions, list) else [],
+            provisional=bool(data.get("provisional")),
+        )
+
+    @classmethod
+    def from_db_row(cls, row: Dict[str, Any]) -> "ResumeAnalysis":
+        """Rebuilds a stored analysis from a get_resume_analysis_by_user / get_stored_analysis row."""
+        scores = _dict(row.get("analysis_scores"))
+        return cls.from_dict({
+            **scores,
+            "strengths": row.get("strengths"),
+            "weaknesses": row.get("weaknesses"),
+            "skills_found": row.get("identified_skills"),
+            "missing_skills": row.get("recommended_skills"),
+        })
+
+    def section(self, key: str) -> SectionScore:
+        return self.section_analysis.get(key) or SectionScore()
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.error:
+            return {"error": self.error}
+        return {
+            "candidate_name": self.candidate_name,
+            "candidate_email": self.candidate_email,
+            "candidate_phone": self.candidate_phone,
+            "score": self.score,
+            "summary": self.summary,
+            "section_analysis": {key: s.to_dict() for key, s in self.section_analysis.items()},
+            "strengths": list(self.strengths),
+            "weaknesses": list(self.weaknesses),
+            "skills_found": list(self.skills_found),
+            "missing_skills": list(self.missing_skills),
+            "improvement_suggestions": [s.to_dict() for s in self.improvement_suggestions],
+            **({"provisional": True} if self.provisional else {}),
+        }
+
+    def to_db_fields(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for save_resume_analysis / update_resume_analysis.
+        Fields without a column of their own ride along in analysis_scores,
+        so from_db_row() can restore the full report.
+        """
+        return {
+            "analysis_scores": {
+                "score": self.score,
+                "summary": self.summary,
+                "section_analysis": {key: s.to_dict() for key, s in self.section_analysis.items()},
+                "candidate_name": self.candidate_name,
+                "candidate_email": self.candidate_email,
+                "candidate_phone": self.candidate_phone,
+                "improvement_suggestions": [s.to_dict() for s in self.improvement_suggestions],
+            },
+            "strengths": list(self.strengths),
+            "weaknesses": list(self.weaknesses),
+            "identified_skills": list(self.skills_found),
+            "recommended_skills": list(self.missing_skills),
+        }
+
+
+# -----------------------------
+# Weighted job match
+# -----------------------------
+@dataclass(slots=True)
+class WeightedMatch:
+    match_score: int = 0
+    component_scores: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(MATCH_COMPONENT_MAX, 0))
+    matching_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+    analysis_summary: str = ""
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WeightedMatch":
+        """
+        Builds a match from LLM JSON, the local matcher, or a stored job row
+        (which calls the score "match_percentage"). Components are clamped to their weights.
+        """
+        data = _dict(data)
+        if data.get("error"):
+            return cls(error=_str(data["error"]))
+        score = data.get("match_score")
+        if score is None:
+            score = data.get("match_percentage")
+        components = _dict(data.get("component_scores"))
+        return cls(
+            match_score=_int(score),
+            component_scores={name: _int(components.get(name), 0, max_val) for name, max_val in MATCH_COMPONENT_MAX.items()},
+            matching_skills=_str_list(data.get("matching_skills")),
+            missing_skills=_str_list(data.get("missing_skills")),
+            analysis_summary=_str(data.get("analysis_summary")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.error:
+            return {"error": self.error}
+        return {
+            "match_score": self.match_score,
+            "component_scores": dict(self.component_scores),
+            "matching_skills": list(self.matching_skills),
+            "missing_skills": list(self.missing_skills),
+            "analysis_summary": self.analysis_summary,
+        }
+
+    def to_db_fields(self) -> Dict[str, Any]:
+        """Keyword arguments for save_job_recommendation."""
+        return {
+            "match_percentage": self.match_score,
+            "matching_skills": list(self.matching_skills),
+            "missing_skills": list(self.missing_skills),
+            "analysis_summary": self.analysis_summary,
+            "component_scores": dict(self.component_scores),
+        }
+
+
+# -----------------------------
+# Skills gap
+# -----------------------------
+@dataclass(slots=True)
+class SkillSplit:
+    matched: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "SkillSplit":
+        data = _dict(data)
+        return cls(matched=_str_list(data.get("matched")), missing=_str_list(data.get("missing")))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"matched": list(self.matched), "missing": list(self.missing)}
+
+
+@dataclass(slots=True)
+class LearningRecommendation:
+    skill: str = "Skill"
+    why_important: str = ""
+    learning_resources: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "LearningRecommendation":
+        data = _dict(data)
+        return cls(
+            skill=_str(data.get("skill"), "Skill"),
+            why_important=_str(data.get("why_important")),
+            learning_resources=_str_list(data.get("learning_resources")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"skill": self.skill, "why_important": self.why_important, "learning_resources": list(self.learning_resources)}
+
+
+@dataclass(slots=True)
+class SkillsGap:
+    match_score: int = 0
+    summary: str = ""
+    must_have: SkillSplit = field(default_factory=SkillSplit)
+    nice_to_have: SkillSplit = field(default_factory=SkillSplit)
+    recommendations: List[LearningRecommendation] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SkillsGap":
+        data = _dict(data)
+        if data.get("error"):
+            return cls(error=_str(data["error"]))
+        recs = data.get("recommendations")
+        return cls(
+            match_score=_int(data.get("match_score")),
+            summary=_str(data.get("summary")),
+            must_have=SkillSplit.from_dict(data.get("must_have")),
+            nice_to_have=SkillSplit.from_dict(data.get("nice_to_have")),
+            recommendations=[LearningRecommendation.from_dict(r) for r in recs] if isinstance(recs, list) else [],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.error:
+            return {"error": self.error}
+        return {
+            "match_score": self.match_score,
+            "summary": self.summary,
+            "must_have": self.must_have.to_dict(),
+            "nice_to_have": self.nice_to_have.to_dict(),
+            "recommendations": [r.to_dict() for r in self.recommendations],
+        }
+
+    def to_db_fields(self) -> Dict[str, Any]:
+        """Keyword arguments for update_resume_analysis (skills columns only)."""
+        return {
+            "identified_skills": self.must_have.matched + self.nice_to_have.matched,
+            "recommended_skills": self.must_have.missing + self.nice_to_have.missing,
+        }
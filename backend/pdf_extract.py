@@ -0,0 +1,122 @@
+# backend/pdf_extract.py
+# Kept free of app imports (database, Streamlit) so spawned worker processes start quickly.
+import io
+import os
+import time
+import logging
+import multiprocessing
+from multiprocessing import TimeoutError as PoolTimeoutError
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import PyPDF2
+
+logger = logging.getLogger(__name__)
+
+# Documents with at least this many pages are extracted by a process pool
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+# Time allowed for the whole parallel extraction; pages not done by then come back empty
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "30"))
+MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# A file on disk, or the document already in memory
+PdfSource = Union[str, bytes]
+
+
+def _open_source(source: PdfSource) -> BinaryIO:
+    # PdfReader(path) would read the whole file into a BytesIO; an open handle is
+    # read lazily (seek + read per object), so only the parsed structures stay in memory.
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+
+def _page_text(reader: PyPDF2.PdfReader, index: int) -> str:
+    try:
+        return reader.pages[index].extract_text() or ""
+    except Exception:
+        return ""
+
+
+# -----------------------------
+# Worker process side
+# -----------------------------
+_worker_reader: Optional[PyPDF2.PdfReader] = None
+
+
+def _init_worker(source: PdfSource) -> None:
+    """
+    Parses the document once per worker; tasks then only send a page number.
+    Given a path, each worker opens its own handle instead of receiving the bytes.
+    The handle lives as long as the worker process.
+    """
+    global _worker_reader
+    _worker_reader = PyPDF2.PdfReader(_open_source(source))
+
+
+def _extract_page(index: int) -> str:
+    return _page_text(_worker_reader, index)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def extract_pages_serial(reader: PyPDF2.PdfReader) -> List[str]:
+    return [_page_text(reader, i) for i in range(len(reader.pages))]
+
+
+def extract_pages_parallel(source: PdfSource, page_count: int,
+                           workers: int = MAX_WORKERS,
+                           timeout: float = EXTRACT_TIMEOUT_SECONDS) -> List[str]:
+    """
+    Extracts every page in a process pool and returns the texts in page order.
+    All pages share one `timeout`-second deadline; pages still unfinished then are
+    returned as "" and their stuck workers are killed with the pool.
+    Workers are spawned, not forked, so they don't inherit the caller's threads and locks.
+    """
+    workers = max(1, min(workers, page_count))
+    texts = [""] * page_count
+    timed_out = []
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker, initargs=(source,)) as pool:
+        deadline = time.monotonic() + timeout
+        pending = [pool.apply_async(_extract_page, (i,)) for i in range(page_count)]
+        for i, result in enumerate(pending):
+            try:
+                texts[i] = result.get(timeout=max(0.0, deadline - time.monotonic()))
+            except PoolTimeoutError:
+                timed_out.append(i + 1)
+            except Exception as e:
+                logger.warning(f"PDF page {i + 1} failed: {e}")
+        # Leaving the block terminates the pool, including workers stuck on a timed-out page
+
+    if timed_out:
+        logger.warning(f"PDF extraction timed out on page(s) {timed_out}; their text was skipped.")
+    return texts
+
+
+def extract_pdf(source: PdfSource) -> Tuple[str, int]:
+    """
+    (text of every page joined in order, page count) for a file path or PDF bytes.
+    Large documents are split across processes.
+    """
+    with _open_source(source) as stream:
+        reader = PyPDF2.PdfReader(stream)
+        page_count = len(reader.pages)
+
+        try:
+            if page_count >= PARALLEL_MIN_PAGES and MAX_WORKERS > 1:
+                try:
+                    texts = extract_pages_parallel(source, page_count)
+                except (OSError, RuntimeError) as e:  # e.g. no process support in this environment
+                    logger.warning(f"Parallel PDF extraction unavailable ({e}); extracting serially.")
+                    texts = extract_pages_serial(reader)
+            else:
+                texts = extract_pages_serial(reader)
+        finally:
+            # The reader and its pages reference each other, so the objects it parsed (embedded
+            # files included) would otherwise linger until the cyclic GC runs; drop them now
+            reader.resolved_objects.clear()
+    return "\n".join(texts).strip(), page_count
+
+
+def extract_pdf_text(source: PdfSource) -> str:
+    return extract_pdf(source)[0]
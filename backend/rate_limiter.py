@@ -0,0 +1,217 @@
+# backend/rate_limiter.py
+import os
+import re
+import time
+import heapq
+import random
+import asyncio
+import sqlite3
+import logging
+import itertools
+import threading
+from typing import Optional
+
+from utils.data_paths import data_path
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Limits (defaults match the Gemini Flash free tier; override GEMINI_RPM / GEMINI_TPM in .env)
+# -----------------------------
+LIMITER_FILE = data_path("rate_limit.db")
+DEFAULT_RPM = 15
+DEFAULT_TPM = 1_000_000
+# How long a call may keep waiting out 429s before the caller gets the error
+DEFAULT_QUOTA_WAIT_SECONDS = 120
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+RETRY_HINT_PATTERNS = [
+    re.compile(r"retry in\s+([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE),
+    re.compile(r"\"retryDelay\"\s*:\s*\"([\d.]+)s\"", re.IGNORECASE),
+    re.compile(r"retry-after:?\s*([\d.]+)", re.IGNORECASE),
+]
+
+
+def is_quota_error(error: Exception) -> bool:
+    error_str = str(error)
+    return "429" in error_str or "RESOURCE_EXHAUSTED" in error_str or "quota" in error_str.lower()
+
+
+def parse_retry_hint(error: Exception) -> Optional[float]:
+    """Extracts the server's suggested wait (seconds) from a quota error, if it gave one."""
+    hint = getattr(error, "retry_after", None)
+    if hint:
+        try:
+            return float(hint)
+        except (TypeError, ValueError):
+            pass
+    text = str(error)
+    for pattern in RETRY_HINT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt: int, error: Optional[Exception] = None, base: float = 2.0, cap: float = 60.0) -> float:
+    """Server hint when present, otherwise jittered exponential backoff."""
+    hint = parse_retry_hint(error) if error is not None else None
+    if hint is not None:
+        return min(cap, hint) + random.uniform(0, 1.0)
+    return random.uniform(0.5, 1.0) * min(cap, base * (2 ** attempt))
+
+
+class GeminiRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute token buckets shared by every
+    process on the machine (state lives in SQLite; BEGIN IMMEDIATE serialises updates).
+
+    Inside a process, callers wait in a priority queue: the highest-priority
+    waiter is the only one allowed to take from the buckets, so interactive work
+    overtakes queued background work instead of racing it.
+    Must be awaited from the shared Gemini event loop.
+    """
+
+    def __init__(self, path: Optional[str] = None, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        # Read at construction time, after the analyzer has loaded .env
+        path = path or os.getenv("GEMINI_RATE_LIMIT_DB", LIMITER_FILE)
+        self.path = path
+        self.rpm = rpm or float(os.getenv("GEMINI_RPM", DEFAULT_RPM))
+        self.tpm = tpm or float(os.getenv("GEMINI_TPM", DEFAULT_TPM))
+        self.quota_wait_seconds = float(os.getenv("GEMINI_QUOTA_WAIT_SECONDS", DEFAULT_QUOTA_WAIT_SECONDS))
+
+        limiter_dir = os.path.dirname(path)
+        if limiter_dir:
+            os.makedirs(limiter_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_buckets (
+            name TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_state (
+            key TEXT PRIMARY KEY,
+            value REAL NOT NULL
+        )
+        """)
+        self._db_lock = threading.Lock()
+
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond: Optional[asyncio.Condition] = None
+
+    # -----------------------------
+    # Shared bucket state
+    # -----------------------------
+    def _refill(self, name: str, capacity: float, now: float) -> float:
+        row = self._conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return capacity
+        tokens, updated_at = row
+        return min(capacity, tokens + max(0.0, now - updated_at) * capacity / 60.0)
+
+    def _try_acquire(self, tokens: float) -> float:
+        """Takes one request + `tokens` from the buckets. Returns 0 on success, else seconds to wait."""
+        tokens = min(tokens, self.tpm)
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT value FROM rate_state WHERE key = 'blocked_until'").fetchone()
+                blocked_until = row[0] if row else 0.0
+                if blocked_until > now:
+                    self._conn.execute("COMMIT")
+                    return blocked_until - now
+
+                req_tokens = self._refill("requests", self.rpm, now)
+                tok_tokens = self._refill("tokens", self.tpm, now)
+                if req_tokens >= 1 and tok_tokens >= tokens:
+                    req_tokens -= 1
+                    tok_tokens -= tokens
+                    wait = 0.0
+                else:
+                    wait = max(
+                        (1 - req_tokens) * 60.0 / self.rpm if req_tokens < 1 else 0.0,
+                        (tokens - tok_tokens) * 60.0 / self.tpm if tok_tokens < tokens else 0.0,
+                    )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    [("requests", req_tokens, now), ("tokens", tok_tokens, now)],
+                )
+                self._conn.execute("COMMIT")
+                return wait
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def penalize(self, delay: float) -> None:
+        """Pauses every caller in every process for `delay` seconds (used after a 429)."""
+        until = time.time() + delay
+        with self._db_lock:
+            self._conn.execute(
+                """
+                INSERT INTO rate_state (key, value) VALUES ('blocked_until', ?)
+                ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+                """,
+                (until,),
+            )
+        logger.warning(f"Gemini quota hit; pausing all callers for {delay:.1f}s.")
+
+    # -----------------------------
+    # Priority queue
+    # -----------------------------
+    async def acquire(self, tokens: float, priority: int = PRIORITY_INTERACTIVE) -> None:
+        """Waits until this caller is first in line and both buckets have room."""
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        loop = asyncio.get_running_loop()
+        entry = (priority, next(self._seq))
+
+        async with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        wait = await loop.run_in_executor(None, self._try_acquire, tokens)
+                        if wait <= 0:
+                            return
+                        # Re-check periodically: a higher-priority caller may arrive meanwhile
+                        timeout = min(wait, 1.0)
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+
+# -----------------------------
+# Process-wide instance
+# -----------------------------
+_limiter: Optional[GeminiRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[GeminiRateLimiter]:
+    """Returns the shared limiter, or None if its state file cannot be opened (no limiting then)."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                try:
+                    _limiter = GeminiRateLimiter()
+                except sqlite3.Error as e:
+                    logger.warning(f"Rate limiter unavailable: {e}")
+                    return None
+    return _limiter
@@ -1,69 +1,134 @@
 # backend/resume_parser.py
 import os
 import io
+import hashlib
+import logging
 from datetime import datetime
+from typing import Optional, Tuple
 
-import PyPDF2
 import docx
+import PyPDF2
+
+from backend.pdf_extract import extract_pdf, PdfSource
 
+from utils.data_paths import data_path
 from utils.database import (
     update_user,
     save_resume_analysis,
     get_resume_analysis_by_user,
     delete_resume_analysis,
+    get_cached_resume_text,
+    save_resume_text,
+    prune_resume_texts,
 )
 
+logger = logging.getLogger(__name__)
 
-RESUME_DIR = os.path.join("data", "resumes")
+RESUME_DIR = data_path("resumes")
 os.makedirs(RESUME_DIR, exist_ok=True)
 
+# Part of every text-cache entry. Bump the revision whenever extraction output
+# changes; a PyPDF2 upgrade changes the version (and so invalidates the cache) on its own.
+PARSER_REVISION = 2
+PARSER_VERSION = f"{PARSER_REVISION}:pypdf2-{PyPDF2.__version__}"
+
+# Uploads are copied to disk (and hashed) this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+# -----------------------------
+# Streaming save
+# -----------------------------
+def save_upload_stream(uploaded_file, file_path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """
+    Copies a file-like upload to `file_path` chunk by chunk, hashing as it goes,
+    so no full extra copy of the file is made. Writes to a temporary name and
+    renames at the end, so a failed upload never leaves a partial resume behind.
+    Returns the SHA-256 hex digest of the content.
+    """
+    digest = hashlib.sha256()
+    tmp_path = f"{file_path}.part"
+    uploaded_file.seek(0)
+    try:
+        with open(tmp_path, "wb") as f:
+            while True:
+                chunk = uploaded_file.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest.hexdigest()
+
 
 # -----------------------------
 # Low-level text extraction
 # -----------------------------
-def _extract_from_pdf(file_bytes: bytes) -> str:
-    reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-    text_parts = []
-    for page in reader.pages:
-        try:
-            page_text = page.extract_text() or ""
-        except Exception:
-            page_text = ""
-        text_parts.append(page_text)
-    return "\n".join(text_parts).strip()
+def _extract_from_pdf(source: PdfSource) -> Tuple[str, int]:
+    # Serial for short resumes; a process pool with per-page timeouts for long PDFs
+    return extract_pdf(source)
 
 
-def _extract_from_docx(file_bytes: bytes) -> str:
-    document = docx.Document(io.BytesIO(file_bytes))
+def _extract_from_docx(source: PdfSource) -> Tuple[str, Optional[int]]:
+    # python-docx reads members from the zip on demand when given a path
+    document = docx.Document(io.BytesIO(source) if isinstance(source, bytes) else source)
     paragraphs = [p.text for p in document.paragraphs if p.text]
-    return "\n".join(paragraphs).strip()
+    # DOCX has no fixed pagination until it is rendered
+    return "\n".join(paragraphs).strip(), None
 
 
-def extract_resume_text(file_bytes: bytes, filename: str) -> str:
+def extract_resume_text_and_pages(source: PdfSource, filename: str) -> Tuple[str, Optional[int]]:
     """
-    Detects extension and extracts text accordingly.
+    Detects extension and extracts text accordingly from a file path (preferred,
+    parsed from a file handle) or the file's bytes. Returns (text, page count or None).
     """
     _, ext = os.path.splitext(filename.lower())
 
     if ext == ".pdf":
-        return _extract_from_pdf(file_bytes)
+        return _extract_from_pdf(source)
     elif ext == ".docx":
-        return _extract_from_docx(file_bytes)
+        return _extract_from_docx(source)
     else:
         raise ValueError("Unsupported file type. Please upload a PDF or DOCX.")
 
 
+def extract_resume_text(source: PdfSource, filename: str) -> str:
+    return extract_resume_text_and_pages(source, filename)[0]
+
+
+def extract_resume_text_cached(file_path: str, content_hash: str) -> dict:
+    """
+    Looks the saved file up by the SHA-256 of its content and only parses it on a
+    miss (or when the cached entry came from another PARSER_VERSION).
+    Returns {"content_hash", "extracted_text", "page_count", "cached"}.
+    """
+    cached = get_cached_resume_text(content_hash, PARSER_VERSION)
+    if cached is not None:
+        logger.debug(f"Resume text cache hit for {content_hash[:12]}")
+        return {**cached, "cached": True}
+
+    extracted_text, page_count = extract_resume_text_and_pages(file_path, file_path)
+    save_resume_text(content_hash, extracted_text, page_count, PARSER_VERSION)
+    return {
+        "content_hash": content_hash,
+        "extracted_text": extracted_text,
+        "page_count": page_count,
+        "cached": False,
+    }
+
+
 # -----------------------------
 # High-level upload handler
 # -----------------------------
-def handle_resume_upload(user_id: int, uploaded_file) -> dict:
+def save_resume_file(user_id: int, uploaded_file) -> dict:
     """
-    - Saves the uploaded file under data/resumes/
-    - Extracts text
-    - Updates users.resume_file_path
-    - Creates a basic resume_analysis entry
-
-    uploaded_file is a Streamlit UploadedFile object.
+    Validates the extension and streams the upload to data/resumes/.
+    Fast (no parsing), so pages call it directly and queue the rest.
+    Returns {"success", "file_path", "content_hash"}.
     """
     original_name = uploaded_file.name
     _, ext = os.path.splitext(original_name.lower())
@@ -76,24 +141,36 @@ def handle_resume_upload(user_id: int, uploaded_file) -> dict:
     new_filename = f"user_{user_id}_{timestamp}{ext}"
     file_path = os.path.join(RESUME_DIR, new_filename)
 
-    # Save file to disk
-    file_bytes = uploaded_file.getvalue()
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
+    # Stream the file to disk, hashing it on the way
+    try:
+        content_hash = save_upload_stream(uploaded_file, file_path)
+    except OSError as e:
+        return {"success": False, "error": f"Failed to save resume: {e}"}
+
+    return {"success": True, "file_path": file_path, "content_hash": content_hash}
+
 
-    # Extract text
+def process_saved_resume(user_id: int, file_path: str, content_hash: str) -> dict:
+    """
+    - Extracts text (skipped when the same file was parsed before)
+    - Updates users.resume_file_path
+    - Creates a basic resume_analysis entry
+
+    Runs in a background worker (the "extract" task) or inline.
+    """
     try:
-        extracted_text = extract_resume_text(file_bytes, original_name)
+        extraction = extract_resume_text_cached(file_path, content_hash)
     except Exception as e:
         return {"success": False, "error": f"Failed to read resume: {e}"}
+    extracted_text = extraction["extracted_text"]
 
     # Update user with resume path
     update_user(user_id, resume_file_path=file_path)
 
-    # Save basic analysis record (for now only extracted text)
+    # Save basic analysis record; the text itself lives in the cache, referenced by hash
     analysis_result = save_resume_analysis(
         user_id=user_id,
-        extracted_text=extracted_text,
+        resume_hash=extraction["content_hash"],
         analysis_scores={},
         strengths=[],
         weaknesses=[],
@@ -104,11 +181,25 @@ def handle_resume_upload(user_id: int, uploaded_file) -> dict:
     return {
         "success": True,
         "file_path": file_path,
+        "content_hash": extraction["content_hash"],
         "extracted_text": extracted_text,
+        "page_count": extraction["page_count"],
         "analysis_id": analysis_result.get("analysis_id"),
     }
 
 
+def handle_resume_upload(user_id: int, uploaded_file) -> dict:
+    """
+    Saves and processes an upload in one blocking call.
+
+    uploaded_file is a Streamlit UploadedFile object.
+    """
+    saved = save_resume_file(user_id, uploaded_file)
+    if not saved["success"]:
+        return saved
+    return process_saved_resume(user_id, saved["file_path"], saved["content_hash"])
+
+
 # -----------------------------
 # Delete resume & related analysis
 # -----------------------------
@@ -117,6 +208,7 @@ def delete_resume_for_user(user_id: int, resume_path: str | None) -> dict:
     - Deletes resume file from disk (if exists)
     - Clears users.resume_file_path
     - Deletes all resume_analysis rows for this user
+    - Drops cached resume text no longer referenced by any analysis
     """
     # 1) Delete file from disk
     if resume_path and os.path.exists(resume_path):
@@ -133,5 +225,6 @@ def delete_resume_for_user(user_id: int, resume_path: str | None) -> dict:
     analyses = get_resume_analysis_by_user(user_id)
     for a in analyses:
         delete_resume_analysis(a["analysis_id"])
+    prune_resume_texts()
 
     return {"success": True}
@@ -6,15 +6,18 @@ import json
 from datetime import datetime, timedelta
 import re
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
 from backend.llm_analyzer import LLMAnalyzer
+from backend.driver_pool import get_driver_pool, is_invalid_session
+from backend import http_scraper
+from backend.http_scraper import HttpScrapeUnavailable
+from backend.host_budget import get_host_budget
+from backend.detail_fetcher import ParallelDetailFetcher, DETAIL_FETCH_WORKERS
+from utils.database import get_catalog_job, save_catalog_job
+from utils.job_index import html_to_text
 
 # Configure logging
 logging.basicConfig(
@@ -23,55 +26,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fields parse_job_details adds to a job
+PARSED_FIELDS = ("salary_range", "required_skills", "job_type")
+
+# How pages are loaded:
+#   "http"     - plain HTTP against LinkedIn's public guest endpoints, no browser
+#   "selenium" - a pooled Chrome WebDriver
+#   "auto"     - HTTP first, the browser only when HTTP is refused or the page can't be read
+SCRAPER_MODES = ("auto", "http", "selenium")
+SCRAPER_MODE = os.getenv("SCRAPER_MODE", "auto").lower()
+# Longest wait for a job page's description to render in the browser
+DETAIL_PAGE_TIMEOUT_SECONDS = float(os.getenv("DETAIL_PAGE_TIMEOUT_SECONDS", "10"))
+
 class LinkedInScraper:
-    def __init__(self, headless=False):
+    def __init__(self, headless=True, mode=None, fetch_only=False):
         """
         Initialize the LinkedIn Scraper.
         
         Args:
-            headless (bool): Run browser in headless mode if True.
+            headless (bool): Lease headless browsers if True (visible ones otherwise).
+            mode (str): Default page loader, one of SCRAPER_MODES (SCRAPER_MODE env if None).
+                Every scraping method also takes a mode to override it per call.
+            fetch_only (bool): Page loading only, for detail fetch workers: skips the .env
+                reload, the credential check and the LLM analyzer (parse_job_details is unavailable).
         """
-        load_dotenv()
+        if not fetch_only:
+            load_dotenv()
         self.email = os.getenv("LINKEDIN_EMAIL")
         self.password = os.getenv("LINKEDIN_PASSWORD")
         self.headless = headless
+        self.mode = self._resolve_mode(mode or SCRAPER_MODE)
         self.driver = None
-        self.llm_analyzer = LLMAnalyzer()
+        self._lease = None
+        self._search_params = None
+        self._search_page_loaded = False
+        self.llm_analyzer = None if fetch_only else LLMAnalyzer()
         
-        if not self.email or not self.password:
+        if not fetch_only and (not self.email or not self.password):
             logger.warning("LinkedIn credentials not found in environment variables.")
 
     def setup_driver(self):
-        """Sets up the Chrome WebDriver with options."""
-        chrome_options = Options()
-        if self.headless:
-            # chrome_options.add_argument("--headless") # Commented out for now to see what's happening if needed, or re-enable
-            pass
-        
-        # Anti-detection options
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("window-size=1920,1080")
-        chrome_options.add_argument("--start-maximized")
-        
-        # Random user agent
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36"
-        ]
-        chrome_options.add_argument(f"user-agent={random.choice(user_agents)}")
-        
+        """Leases a warm WebDriver from the shared pool (a no-op if this scraper holds one)."""
+        if self._lease is not None:
+            return
+        self._lease = get_driver_pool(self.headless).lease()
+        self.driver = self._lease.driver
+
+    def _release_driver(self, broken=False):
+        if self._lease is not None:
+            get_driver_pool(self.headless).release(self._lease, broken=broken)
+        self._lease = None
+        self.driver = None
+
+    def _navigate(self, url):
+        """
+        driver.get through the lease, within the host's politeness budget;
+        a dead session is swapped for a fresh driver and retried once.
+        """
+        if self._lease is None:
+            self.setup_driver()
         try:
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=chrome_options
-            )
-            logger.info("WebDriver initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to initialize WebDriver: {e}")
-            raise
+            with get_host_budget().slot(url):
+                self._lease.get(url)
+        except WebDriverException as e:
+            if not is_invalid_session(e):
+                raise
+            logger.warning("Session invalid. Replacing driver...")
+            self._release_driver(broken=True)
+            self.setup_driver()
+            with get_host_budget().slot(url):
+                self._lease.get(url)
+
+    def _resolve_mode(self, mode=None):
+        mode = (mode or self.mode).lower()
+        if mode not in SCRAPER_MODES:
+            raise ValueError(f"Unknown scraper mode '{mode}', expected one of {SCRAPER_MODES}")
+        return mode
 
     def wait_random(self, min_time=2, max_time=5):
         """Waits for a random amount of time to mimic human behavior."""
@@ -108,9 +138,11 @@ class LinkedInScraper:
         except Exception:
             return now.isoformat()
 
-    def search_jobs(self, keywords, location, date_posted=None, experience_level=None, job_type=None, remote=None):
+    def search_jobs(self, keywords, location, date_posted=None, experience_level=None, job_type=None, remote=None,
+                    mode=None):
         """
-        Navigates to LinkedIn jobs page and searches for jobs with filters.
+        Sets up a job search with filters. In selenium mode the browser opens the
+        search page now; otherwise the results are requested by scrape_jobs_listing.
         
         Args:
             keywords (str): Job title or keywords.
@@ -119,61 +151,81 @@ class LinkedInScraper:
             experience_level (str): 'internship', 'entry', 'associate', 'mid-senior', 'director'.
             job_type (str): 'full-time', 'part-time', 'contract', 'temp'.
             remote (bool): True for remote only.
+            mode (str): Overrides the scraper's mode for this search.
         """
-        if not self.driver:
-            self.setup_driver()
-
         logger.info(f"Searching for: {keywords} in {location}")
         
-        base_url = "https://www.linkedin.com/jobs/search/?"
-        params = [
-            f"keywords={keywords}",
-            f"location={location}",
-            "generateRedirectToLinkedInUrl=true"
-        ]
+        params = {
+            "keywords": keywords,
+            "location": location,
+        }
         
         # Map filters to LinkedIn URL params
         if date_posted:
             mapping = {'24h': 'r86400', 'week': 'r604800', 'month': 'r2592000'}
             if val := mapping.get(date_posted.lower()):
-                params.append(f"f_TPR={val}")
+                params["f_TPR"] = val
                 
         if experience_level:
             # Simplified mapping
             mapping = {'internship': '1', 'entry': '2', 'associate': '3', 'mid-senior': '4', 'director': '5'}
             if val := mapping.get(experience_level.lower()):
-                params.append(f"f_E={val}")
+                params["f_E"] = val
         
         if job_type:
             mapping = {'full-time': 'F', 'part-time': 'P', 'contract': 'C', 'temp': 'T'}
             if val := mapping.get(job_type.lower()):
-                params.append(f"f_JT={val}")
+                params["f_JT"] = val
                 
         if remote:
-             params.append("f_WT=2")
+             params["f_WT"] = "2"
              
+        self._search_params = params
+        self._search_page_loaded = False
+        if self._resolve_mode(mode) == "selenium":
+            self._open_search_page()
+        
+        return True
+
+    def _open_search_page(self):
+        base_url = "https://www.linkedin.com/jobs/search/?"
+        params = [f"{key}={value}" for key, value in self._search_params.items()]
+        params.append("generateRedirectToLinkedInUrl=true")
         search_url = base_url + "&".join(params)
         logger.info(f"Navigating to: {search_url}")
         
-        try:
-            self.driver.get(search_url)
-            self.wait_random(3, 5)
-        except Exception as e:
-            if "invalid session id" in str(e).lower():
-                logger.warning("Session invalid. Re-initializing driver...")
-                self.setup_driver()
-                self.driver.get(search_url)
-                self.wait_random(3, 5)
-            else:
-                raise e
-        
-        return True
+        self._navigate(search_url)
+        self.wait_random(3, 5)
+        self._search_page_loaded = True
 
-    def scrape_jobs_listing(self, limit_pages=3):
+    def scrape_jobs_listing(self, limit_pages=3, mode=None):
         """
-        Scrapes job cards handling infinite scroll and pagination.
+        Scrapes job cards for the last search_jobs call, page by page.
         Returns a list of dictionaries with basic job info.
         """
+        mode = self._resolve_mode(mode)
+        if mode != "selenium":
+            if self._search_params is None:
+                logger.warning("scrape_jobs_listing called before search_jobs.")
+                return []
+            try:
+                job_data = http_scraper.fetch_job_cards(self._search_params, limit_pages, self.convert_posted_date)
+                logger.info(f"Total unique jobs found over HTTP: {len(job_data)}")
+                return job_data
+            except HttpScrapeUnavailable as e:
+                if mode == "http":
+                    logger.error(f"HTTP job search failed: {e}")
+                    return []
+                logger.warning(f"{e} Falling back to the browser.")
+
+        if not self._search_page_loaded and self._search_params is not None:
+            self._open_search_page()
+        return self._scrape_jobs_listing_browser(limit_pages)
+
+    def _scrape_jobs_listing_browser(self, limit_pages):
+        """
+        Scrapes job cards from the open search page, handling infinite scroll and pagination.
+        """
         logger.info(f"Scraping job listings (Limit: {limit_pages} pages/scrolls)...")
         job_data = []
         seen_urls = set()
@@ -287,25 +339,51 @@ class LinkedInScraper:
         logger.info(f"Total unique jobs found: {len(job_data)}")
         return job_data
 
-    def get_job_details_and_parse(self, job_url):
+    def fetch_job_details(self, job_url, mode=None):
         """
-        Navigates to a specific job URL, extracts details, and parses with LLM.
+        Loads a specific job URL and extracts the raw details (no LLM).
+        Returns (details, description_text) or (None, "") on failure.
         """
+        mode = self._resolve_mode(mode)
+        if mode != "selenium":
+            logger.info(f"Getting details over HTTP for: {job_url}")
+            try:
+                details, description_text = http_scraper.fetch_job_details(job_url)
+                if details is not None:
+                    return details, description_text
+                problem = "No job description in the page."
+            except HttpScrapeUnavailable as e:
+                problem = str(e)
+            except Exception as e:
+                logger.error(f"Error processing job {job_url}: {e}")
+                return None, ""
+            if mode == "http":
+                logger.warning(f"Failed to extract basic details for {job_url}: {problem}")
+                return None, ""
+            logger.warning(f"{problem} Falling back to the browser for {job_url}.")
+        return self._fetch_job_details_browser(job_url)
+
+    def _fetch_job_details_browser(self, job_url):
         logger.info(f"Getting details for: {job_url}")
         try:
-            self.driver.get(job_url)
-            self.wait_random(2, 4)
+            self._navigate(job_url)
             
             details = {}
             
             # --- Extraction ---
             try:
-                # Public job page selector
-                # Click "Show more" if description is collapsed
+                # Public job page selector; continue as soon as the description is in the page
+                try:
+                    WebDriverWait(self.driver, DETAIL_PAGE_TIMEOUT_SECONDS).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, ".show-more-less-html__markup"))
+                    )
+                except TimeoutException:
+                    pass  # find_element below reports it
+
+                # Click "Show more" if description is collapsed (the markup is complete either way)
                 try:
                     show_more_btn = self.driver.find_element(By.CSS_SELECTOR, "button.show-more-less-html__button--more")
                     show_more_btn.click()
-                    self.wait_random(1, 2)
                 except:
                     pass
 
@@ -324,31 +402,96 @@ class LinkedInScraper:
                     
             except Exception as e:
                 logger.warning(f"Failed to extract basic details: {e}")
-                return None # Critical failure
-            
-            # --- LLM Parsing ---
-            logger.info("Parsing description with LLM...")
-            parsed_data = self.llm_analyzer.parse_job_description(description_text[:2000]) # Limit chars for API
+                return None, "" # Critical failure
             
-            if parsed_data and "error" not in parsed_data:
-                details["salary_range"] = parsed_data.get("salary_range")
-                details["required_skills"] = parsed_data.get("required_skills", [])
-                details["job_type"] = parsed_data.get("job_type")
-                # details["experience_level"] = parsed_data.get("experience_level")
-            else:
-                logger.warning("LLM parsing failed or returned error.")
-                
-            return details
+            return details, description_text
             
+        except Exception as e:
+            logger.error(f"Error processing job {job_url}: {e}")
+            return None, ""
+
+    def parse_job_details(self, description_text):
+        """
+        Parses a job description with the LLM (no browser access, safe to run in parallel).
+        Returns the structured fields to merge into the job details.
+        """
+        parsed = {}
+        logger.info("Parsing description with LLM...")
+        parsed_data = self.llm_analyzer.parse_job_description(description_text[:2000]) # Limit chars for API
+        
+        if parsed_data and "error" not in parsed_data:
+            parsed["salary_range"] = parsed_data.get("salary_range")
+            parsed["required_skills"] = parsed_data.get("required_skills", [])
+            parsed["job_type"] = parsed_data.get("job_type")
+            # parsed["experience_level"] = parsed_data.get("experience_level")
+        else:
+            logger.warning("LLM parsing failed or returned error.")
+        return parsed
+
+    def fetch_job_details_cached(self, job_url, mode=None):
+        """
+        fetch_job_details, served from the shared job catalog when any user's search
+        scraped this posting recently; fresh scrapes are stored there.
+        Returns (details, description_text, parsed): parsed holds the stored
+        parse_job_details fields, or is None if the description still needs parsing.
+        """
+        cached = get_catalog_job(job_url)
+        if cached:
+            logger.info(f"Job details from catalog: {job_url}")
+            details = {"job_description": cached["job_description"], "applicants_count": cached["applicants_count"]}
+            parsed = {field: cached[field] for field in PARSED_FIELDS} if cached["parsed_at"] else None
+            return details, html_to_text(cached["job_description"]).strip(), parsed
+
+        details, description_text = self.fetch_job_details(job_url, mode)
+        if details is not None:
+            save_catalog_job(job_url, details)
+        return details, description_text, None
+
+    def parse_job_details_cached(self, job_url, description_text):
+        """parse_job_details, storing a successful parse in the catalog for the next user."""
+        parsed = self.parse_job_details(description_text)
+        if parsed:
+            save_catalog_job(job_url, parsed, parsed=True)
+        return parsed
+
+    def get_job_details_and_parse(self, job_url, mode=None):
+        """
+        Loads a specific job URL, extracts details, and parses with LLM.
+        Both steps are skipped when the catalog already has them.
+        """
+        details, description_text, parsed = self.fetch_job_details_cached(job_url, mode)
+        if details is None:
+            return None
+        try:
+            details.update(parsed if parsed is not None else self.parse_job_details_cached(job_url, description_text))
         except Exception as e:
             logger.error(f"Error processing job {job_url}: {e}")
             return None
+        return details
+
+    def detail_fetcher(self, workers=DETAIL_FETCH_WORKERS):
+        """
+        A ParallelDetailFetcher whose workers are scrapers configured like this one
+        (same mode and headless setting), for loading many job pages at once.
+        The workers only load pages, so they are built without an LLM analyzer.
+        """
+        return ParallelDetailFetcher(lambda: LinkedInScraper(headless=self.headless, mode=self.mode, fetch_only=True),
+                                     workers)
+
+    def fetch_job_details_parallel(self, job_urls, workers=DETAIL_FETCH_WORKERS):
+        """
+        fetch_job_details_cached for many URLs concurrently.
+        Yields (job_url, (details, description_text, parsed) or None, error or None)
+        in completion order; a failed page yields an error and the rest continue.
+        """
+        with self.detail_fetcher(workers) as fetcher:
+            yield from fetcher.fetch_all(job_urls)
 
     def close(self):
-        """Closes the browser instance."""
-        if self.driver:
-            self.driver.quit()
-            logger.info("Browser closed.")
+        """Returns the browser to the pool, still running, for the next search."""
+        if self._lease is not None:
+            self._release_driver()
+            logger.info("Browser returned to pool.")
 
 def generate_search_query(user_profile: dict, resume_keywords: list = None) -> str:
     """
@@ -379,8 +522,6 @@ if __name__ == "__main__":
     # Test Script
     scraper = LinkedInScraper(headless=True) # Visible for testing
     try:
-        scraper.setup_driver()
-        
         # 1. Search
         scraper.search_jobs("Python Developer", "New York")
         
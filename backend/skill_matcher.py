@@ -0,0 +1,350 @@
+# backend/skill_matcher.py
+import re
+import math
+import html
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+# -----------------------------
+# Skill taxonomy (canonical name -> aliases)
+# -----------------------------
+SKILL_TAXONOMY = {
+    # Languages
+    "Python": ["python", "python3"],
+    "Java": ["java", "java8", "java 8", "java 11", "java 17"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6"],
+    "TypeScript": ["typescript"],
+    "C": ["c language", "ansi c"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rust"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "PHP": ["php"],
+    "Ruby": ["ruby"],
+    "Scala": ["scala"],
+    "R": ["r programming", "r language"],
+    "SQL": ["sql", "t-sql", "pl/sql", "plsql"],
+    "Bash": ["bash", "shell scripting", "shell script", "unix shell"],
+    # Web / frameworks
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "sass", "scss"],
+    "React": ["react", "react.js", "reactjs"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Node.js": ["node", "node.js", "nodejs"],
+    "Express": ["express.js", "expressjs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring Boot": ["spring boot", "springboot", "spring framework", "spring mvc"],
+    ".NET": [".net", "dotnet", "asp.net", ".net core"],
+    "Streamlit": ["streamlit"],
+    "REST APIs": ["rest api", "rest apis", "restful", "restful apis"],
+    "GraphQL": ["graphql"],
+    "Microservices": ["microservices", "microservice", "micro services"],
+    # Data / ML
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning", "neural networks"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision", "opencv"],
+    "LLMs": ["llm", "llms", "large language models", "generative ai", "genai", "langchain"],
+    "TensorFlow": ["tensorflow", "keras"],
+    "PyTorch": ["pytorch", "torch"],
+    "Scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Data Analysis": ["data analysis", "data analytics", "analytics"],
+    "Data Visualization": ["data visualization", "tableau", "power bi", "powerbi", "matplotlib", "plotly"],
+    "Statistics": ["statistics", "statistical analysis"],
+    "Spark": ["spark", "pyspark", "apache spark"],
+    "Hadoop": ["hadoop"],
+    "ETL": ["etl", "data pipelines", "data pipeline"],
+    "Excel": ["excel", "ms excel", "microsoft excel"],
+    # Databases
+    "MySQL": ["mysql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MongoDB": ["mongodb", "mongo"],
+    "SQLite": ["sqlite"],
+    "Redis": ["redis"],
+    "Oracle": ["oracle", "oracle db"],
+    "NoSQL": ["nosql"],
+    # Cloud / DevOps
+    "AWS": ["aws", "amazon web services", "ec2", "aws lambda", "amazon s3", "aws s3"],
+    "Azure": ["azure", "microsoft azure"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker", "containers", "containerization"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "CI/CD": ["ci/cd", "ci cd", "continuous integration", "jenkins", "github actions", "gitlab ci"],
+    "Linux": ["linux", "unix"],
+    "Git": ["git", "github", "gitlab", "bitbucket", "version control"],
+    # Practices / CS fundamentals
+    "Data Structures": ["data structures", "dsa"],
+    "Algorithms": ["algorithms", "algorithm design"],
+    "System Design": ["system design", "distributed systems", "scalable systems"],
+    "OOP": ["oop", "object oriented", "object-oriented programming", "object oriented programming"],
+    "Testing": ["testing", "unit testing", "pytest", "junit", "selenium", "test automation", "tdd"],
+    "Agile": ["agile", "scrum", "kanban"],
+    "Web Scraping": ["web scraping", "scraping", "beautifulsoup", "scrapy"],
+    # Soft skills
+    "Communication": ["communication", "communication skills"],
+    "Teamwork": ["teamwork", "collaboration", "team player"],
+    "Leadership": ["leadership", "mentoring", "team lead"],
+    "Problem Solving": ["problem solving", "problem-solving", "analytical skills"],
+}
+
+# Canonical names that are also ordinary words or letters ("go to market", "plan C",
+# "R&D", "express delivery"); these skills are only recognised through their aliases
+AMBIGUOUS_SKILL_NAMES = {"C", "Go", "R", "Express"}
+
+DEGREE_LEVELS = {
+    4: ["phd", "ph.d", "doctorate"],
+    3: ["master", "masters", "m.tech", "mtech", "m.sc", "msc", "m.s", "mca", "mba", "m.e"],
+    2: ["bachelor", "bachelors", "b.tech", "btech", "b.e", "b.sc", "bsc", "b.s", "bca", "b.com", "undergraduate", "graduate degree"],
+    1: ["diploma", "associate degree"],
+}
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in is it its of on or our that the their this to
+was we were will with you your they them who what which when where how all any each more most other some
+such than too very into over under about also both only own same so not no nor do does did able must should
+would could may might etc per via using use used work working team role job candidate candidates experience
+years year strong good excellent knowledge skills skill ability including include includes new well plus
+""".split())
+
+WEIGHTS = {"skills": 50, "experience": 25, "education": 15, "responsibility": 10}
+
+TOKEN_RE = re.compile(r"\.net|[a-z0-9][a-z0-9+#./-]*")
+TAG_RE = re.compile(r"<[^>]+>")
+YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-|to|–)?\s*(?:\d{1,2}\s*)?\+?\s*(?:years|yrs|year)", re.IGNORECASE)
+YEAR_RANGE_RE = re.compile(r"\b((?:19|20)\d{2})\s*(?:-|–|to)\s*((?:19|20)\d{2}|present|current|now)\b", re.IGNORECASE)
+# Resume section headings: date ranges only count as experience under the first kind
+EXPERIENCE_HEADING_RE = re.compile(
+    r"^\s*(?:work |professional |relevant )?(?:experience|employment(?: history)?|work history|internships?)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE)
+OTHER_HEADING_RE = re.compile(
+    r"^\s*(?:education|academic.*|(?:academic |personal )?projects?|(?:technical )?skills|certifications?|achievements|"
+    r"awards|publications|summary|profile|objective|languages|interests|hobbies|references|volunteering)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE)
+
+
+def _tokenize(text: str) -> List[str]:
+    tokens = []
+    for tok in TOKEN_RE.findall(text.lower()):
+        tok = tok.rstrip(".-/")
+        if tok:
+            tokens.append(tok)
+    return tokens
+
+
+def _build_alias_index(taxonomy: Dict[str, List[str]]) -> Tuple[Dict[Tuple[str, ...], str], int]:
+    index = {}
+    for canonical, aliases in taxonomy.items():
+        names = aliases if canonical in AMBIGUOUS_SKILL_NAMES else [canonical] + aliases
+        for alias in names:
+            key = tuple(_tokenize(alias))
+            if key:
+                index.setdefault(key, canonical)
+    return index, max(len(k) for k in index)
+
+
+def _build_degree_index() -> Dict[Tuple[str, ...], int]:
+    index = {}
+    for level, names in DEGREE_LEVELS.items():
+        for name in names:
+            index[tuple(_tokenize(name))] = level
+    return index
+
+
+_ALIAS_INDEX, _MAX_NGRAM = _build_alias_index(SKILL_TAXONOMY)
+_DEGREE_INDEX = _build_degree_index()
+
+
+def experience_sections(text: str) -> List[str]:
+    """The parts of a resume under an experience heading, each up to the next known heading."""
+    sections = []
+    for heading in EXPERIENCE_HEADING_RE.finditer(text):
+        start = heading.end()
+        following = [m.start() for m in (EXPERIENCE_HEADING_RE.search(text, start), OTHER_HEADING_RE.search(text, start)) if m]
+        sections.append(text[start:min(following, default=len(text))])
+    return sections
+
+
+def strip_html(text: str) -> str:
+    """Removes tags/entities from scraped job descriptions."""
+    if not text or "<" not in text:
+        return html.unescape(text or "")
+    return html.unescape(TAG_RE.sub(" ", text))
+
+
+class TextProfile:
+    """Pre-computed features of one document (resume or JD), reusable across many comparisons."""
+    __slots__ = ("skills", "content_words", "degree_levels", "years_mentioned", "year_span")
+
+    def __init__(self, text: str):
+        text = strip_html(text)
+        tokens = _tokenize(text)
+
+        self.skills: Dict[str, int] = {}
+        self.degree_levels = set()
+        i, n = 0, len(tokens)
+        while i < n:
+            matched = 1
+            for size in range(min(_MAX_NGRAM, n - i), 0, -1):
+                gram = tuple(tokens[i:i + size])
+                canonical = _ALIAS_INDEX.get(gram)
+                if canonical:
+                    self.skills[canonical] = self.skills.get(canonical, 0) + 1
+                    matched = size
+                    break
+                level = _DEGREE_INDEX.get(gram)
+                if level:
+                    self.degree_levels.add(level)
+                    matched = size
+                    break
+            i += matched
+
+        self.content_words = {t for t in tokens if len(t) > 2 and t not in STOPWORDS and not t.isdigit()}
+        self.years_mentioned = [int(m) for m in YEARS_RE.findall(text) if int(m) <= 40]
+
+        # Date ranges under education or projects are not work experience
+        span = 0
+        for start, end in YEAR_RANGE_RE.findall("\n".join(experience_sections(text))):
+            end_year = 2100 if not end[:1].isdigit() else int(end)
+            span += max(0, min(end_year, datetime.now().year) - int(start))
+        self.year_span = min(span, 40)
+
+    @property
+    def candidate_years(self) -> float:
+        return max(self.years_mentioned + [self.year_span] or [0])
+
+    @property
+    def required_years(self) -> Optional[int]:
+        return min(self.years_mentioned) if self.years_mentioned else None
+
+
+class SkillMatcher:
+    """
+    Deterministic, network-free resume/job scorer.
+
+    Produces the same fields as backend.models.WeightedMatch (as a dict):
+    skills (50) + experience (25) + education (15) + responsibility (10).
+    """
+
+    def __init__(self):
+        self._profile_cache: Dict[str, TextProfile] = {}
+        self._cache_lock = threading.Lock()  # pipeline workers share one matcher
+
+    def profile(self, text: str) -> TextProfile:
+        """Profiles are cached per text so one resume is tokenized once for a whole ranking run."""
+        text = text or ""
+        with self._cache_lock:
+            prof = self._profile_cache.get(text)
+        if prof is None:
+            prof = TextProfile(text)  # built outside the lock; a racing duplicate is harmless
+            with self._cache_lock:
+                if len(self._profile_cache) > 64:
+                    self._profile_cache.clear()
+                prof = self._profile_cache.setdefault(text, prof)
+        return prof
+
+    def score(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+        return self.score_profiles(self.profile(resume_text), TextProfile(job_description or ""))
+
+    def score_profiles(self, resume: TextProfile, job: TextProfile) -> Dict[str, Any]:
+        # Responsibility: how much of the JD vocabulary the resume covers
+        coverage = len(job.content_words & resume.content_words) / len(job.content_words) if job.content_words else 0.0
+
+        # Skills: weighted overlap; skills repeated in the JD count more
+        if job.skills:
+            total = matched = 0.0
+            for skill, count in job.skills.items():
+                weight = 1.0 + math.log(count)
+                total += weight
+                if skill in resume.skills:
+                    matched += weight
+            skills_ratio = matched / total
+        else:
+            skills_ratio = min(1.0, coverage * 2)
+
+        # Experience: candidate years vs. minimum years asked for
+        required = job.required_years
+        candidate = resume.candidate_years
+        if required is None:
+            exp_ratio = 1.0 if candidate > 0 else 0.7
+        else:
+            exp_ratio = min(1.0, candidate / required) if required else 1.0
+
+        # Education: highest resume degree vs. lowest degree mentioned in the JD
+        resume_level = max(resume.degree_levels, default=0)
+        if not job.degree_levels:
+            edu_ratio = 1.0 if resume_level else 0.7
+        else:
+            required_level = min(job.degree_levels)
+            if resume_level >= required_level:
+                edu_ratio = 1.0
+            elif resume_level == required_level - 1:
+                edu_ratio = 0.5
+            else:
+                edu_ratio = 0.2
+
+        resp_ratio = min(1.0, coverage / 0.5)
+
+        component_scores = {
+            "skills": round(WEIGHTS["skills"] * skills_ratio),
+            "experience": round(WEIGHTS["experience"] * exp_ratio),
+            "education": round(WEIGHTS["education"] * edu_ratio),
+            "responsibility": round(WEIGHTS["responsibility"] * resp_ratio),
+        }
+        matching = [s for s in job.skills if s in resume.skills]
+        missing = [s for s in job.skills if s not in resume.skills]
+
+        return {
+            "match_score": sum(component_scores.values()),
+            "component_scores": component_scores,
+            "matching_skills": matching,
+            "missing_skills": missing,
+            "analysis_summary": (
+                f"Local estimate: {len(matching)}/{len(job.skills)} listed skills matched"
+                + (f", {required}+ years requested" if required else "")
+                + "."
+            ),
+        }
+
+    def rank_jobs(self, resume_text: str, jobs: List[Dict[str, Any]], top_k: Optional[int] = None,
+                  text_fields: Tuple[str, ...] = ("job_title", "job_description", "required_skills")) -> List[Dict[str, Any]]:
+        """
+        Orders job dicts (scraped cards or full jobs) by local match score, best first.
+        Ties keep the original order. Each returned job gets a "local_match_score" key.
+        """
+        resume = self.profile(resume_text)
+        scored = []
+        for pos, job in enumerate(jobs):
+            parts = []
+            for field in text_fields:
+                value = job.get(field)
+                if isinstance(value, list):
+                    parts.append(" , ".join(map(str, value)))
+                elif value:
+                    parts.append(str(value))
+            result = self.score_profiles(resume, TextProfile(" \n ".join(parts)))
+            scored.append((-result["match_score"], pos, {**job, "local_match_score": result["match_score"]}))
+        scored.sort(key=lambda x: (x[0], x[1]))
+        ranked = [job for _, _, job in scored]
+        return ranked[:top_k] if top_k else ranked
+
+
+_default_matcher = SkillMatcher()
+
+
+def score_match(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """Convenience wrapper around a shared SkillMatcher."""
+    return _default_matcher.score(resume_text, job_description)
+
+
+def rank_jobs(resume_text: str, jobs: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    return _default_matcher.rank_jobs(resume_text, jobs, top_k=top_k)
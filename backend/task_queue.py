@@ -0,0 +1,465 @@
+# backend/task_queue.py
+import os
+import sys
+import json
+import time
+import atexit
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+import subprocess
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.rate_limiter import backoff_delay
+from utils.data_paths import data_path
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Defaults (overridable via .env)
+# -----------------------------
+QUEUE_FILE = data_path("task_queue.db")
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ATTEMPTS = 3
+# How often an idle worker looks for new tasks, and how often pages re-check a task
+POLL_SECONDS = 0.5
+# A running task that has not reported for this long is assumed orphaned and re-queued
+LEASE_SECONDS = 300
+# Finished tasks are kept this long so pages can still read their results
+KEEP_FINISHED_SECONDS = 24 * 3600
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class TaskError(Exception):
+    """A failure retrying cannot fix (bad input, unreadable file): the task fails immediately."""
+
+
+class LeaseLost(Exception):
+    """The task was re-queued or handed to another worker while this one was still running it."""
+
+
+def make_dedup_key(kind: str, *parts: str) -> str:
+    """SHA-256 over the task kind and its identifying inputs (length-prefixed, like the LLM cache key)."""
+    h = hashlib.sha256()
+    for part in (kind, *parts):
+        data = str(part).encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def _loads(value: Optional[str]) -> Any:
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return None
+
+
+class TaskQueue:
+    """
+    Persistent task queue in SQLite, shared by the Streamlit process (which
+    enqueues and polls) and the worker processes (which claim and run tasks).
+
+    - A task with a dedup key is enqueued at most once while it is queued or running;
+      enqueueing it again returns the existing task id.
+    - Failed attempts are retried with backoff until max_attempts is reached.
+    - Workers report progress, a status message and partial results while running.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.getenv("TASK_QUEUE_DB", QUEUE_FILE)
+        self.path = path
+        self._lock = threading.Lock()
+
+        queue_dir = os.path.dirname(path)
+        if queue_dir:
+            os.makedirs(queue_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            dedup_key TEXT,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            partial TEXT,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            locked_by TEXT,
+            locked_at REAL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """)
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_dedup_active ON tasks(dedup_key) "
+            "WHERE dedup_key IS NOT NULL AND status IN ('queued', 'running')"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks(status, run_after)")
+
+    # -----------------------------
+    # Producer side (pages)
+    # -----------------------------
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedup_key: Optional[str] = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """Adds a task and returns its id (or the id of the identical task already pending)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if dedup_key:
+                    row = self._conn.execute(
+                        "SELECT task_id FROM tasks WHERE dedup_key = ? AND status IN (?, ?)",
+                        (dedup_key, STATUS_QUEUED, STATUS_RUNNING),
+                    ).fetchone()
+                    if row:
+                        self._conn.execute("COMMIT")
+                        return row[0]
+                cursor = self._conn.execute(
+                    """
+                    INSERT INTO tasks (kind, dedup_key, payload, status, max_attempts, run_after, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (kind, dedup_key, json.dumps(payload), STATUS_QUEUED, max_attempts, now, now, now),
+                )
+                self._conn.execute("COMMIT")
+                return cursor.lastrowid
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT task_id, kind, status, progress, message, partial, result, error,
+                       attempts, max_attempts, created_at, updated_at
+                FROM tasks WHERE task_id = ?
+                """,
+                (task_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "task_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "progress": row[3],
+            "message": row[4],
+            "partial": _loads(row[5]) or {},
+            "result": _loads(row[6]),
+            "error": row[7],
+            "attempts": row[8],
+            "max_attempts": row[9],
+            "created_at": row[10],
+            "updated_at": row[11],
+        }
+
+    # -----------------------------
+    # Worker side
+    # -----------------------------
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Marks the oldest runnable task as running for `worker_id` and returns it (None when idle)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Tasks whose worker died mid-run: retry them, or give up once out of attempts
+                self._conn.execute(
+                    """
+                    UPDATE tasks
+                    SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END,
+                        error = COALESCE(error, 'Worker stopped responding'),
+                        locked_by = NULL, updated_at = ?
+                    WHERE status = ? AND locked_at < ?
+                    """,
+                    (STATUS_QUEUED, STATUS_FAILED, now, STATUS_RUNNING, now - LEASE_SECONDS),
+                )
+                row = self._conn.execute(
+                    """
+                    SELECT task_id, kind, payload, attempts FROM tasks
+                    WHERE status = ? AND run_after <= ?
+                    ORDER BY run_after, task_id LIMIT 1
+                    """,
+                    (STATUS_QUEUED, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    """
+                    UPDATE tasks SET status = ?, attempts = attempts + 1, locked_by = ?,
+                           locked_at = ?, updated_at = ?
+                    WHERE task_id = ?
+                    """,
+                    (STATUS_RUNNING, worker_id, now, now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"task_id": row[0], "kind": row[1], "payload": _loads(row[2]) or {}, "attempt": row[3] + 1}
+
+    # Updates below only apply while `worker_id` still holds the task's lease: once the
+    # lease expired and the task was re-queued or re-claimed, a late worker must not touch it.
+    def report(self, task_id: int, worker_id: str, progress: Optional[float] = None, message: Optional[str] = None,
+               partial: Optional[Dict[str, Any]] = None) -> bool:
+        """Progress update from a running task; also renews the task's lease. Returns False if the lease was lost."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE tasks SET progress = COALESCE(?, progress), message = COALESCE(?, message),
+                       partial = COALESCE(?, partial), locked_at = ?, updated_at = ?
+                WHERE task_id = ? AND locked_by = ? AND status = ?
+                """,
+                (progress, message, json.dumps(partial) if partial is not None else None, now, now,
+                 task_id, worker_id, STATUS_RUNNING),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, task_id: int, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Stores the result. Returns False (and stores nothing) if the lease was lost."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE tasks SET status = ?, progress = 1, result = ?, error = NULL,
+                       locked_by = NULL, updated_at = ?
+                WHERE task_id = ? AND locked_by = ? AND status = ?
+                """,
+                (STATUS_DONE, json.dumps(result), now, task_id, worker_id, STATUS_RUNNING),
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, task_id: int, worker_id: str, error: Exception, retry: bool = True) -> bool:
+        """
+        Records a failed attempt. Returns True if the task was re-queued for another attempt;
+        False if it failed for good or the lease was lost (then nothing is recorded).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM tasks WHERE task_id = ? AND locked_by = ? AND status = ?",
+                (task_id, worker_id, STATUS_RUNNING),
+            ).fetchone()
+            if row is None:
+                logger.warning(f"Task {task_id} is no longer leased to {worker_id}; its failure was not recorded.")
+                return False
+            attempts, max_attempts = row
+            if retry and attempts < max_attempts:
+                self._conn.execute(
+                    """
+                    UPDATE tasks SET status = ?, error = ?, run_after = ?, locked_by = NULL, updated_at = ?
+                    WHERE task_id = ?
+                    """,
+                    (STATUS_QUEUED, str(error), now + backoff_delay(attempts - 1, error), now, task_id),
+                )
+                return True
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, locked_by = NULL, updated_at = ? WHERE task_id = ?",
+                (STATUS_FAILED, str(error), now, task_id),
+            )
+            return False
+
+    def purge(self, older_than: float = KEEP_FINISHED_SECONDS) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM tasks WHERE status IN (?, ?) AND updated_at < ?",
+                (STATUS_DONE, STATUS_FAILED, time.time() - older_than),
+            )
+        return cursor.rowcount
+
+
+# -----------------------------
+# Process-wide instance
+# -----------------------------
+_shared_queue: Optional[TaskQueue] = None
+_shared_lock = threading.Lock()
+
+
+def get_task_queue() -> TaskQueue:
+    global _shared_queue
+    if _shared_queue is None:
+        with _shared_lock:
+            if _shared_queue is None:
+                _shared_queue = TaskQueue()
+    return _shared_queue
+
+
+# -----------------------------
+# Task handlers
+# -----------------------------
+# handler(payload, report) -> JSON-serialisable result
+# report(progress, message=None, partial=None) updates the task while it runs.
+# Handlers import app modules lazily so the pages importing this module stay light.
+TaskHandler = Callable[[Dict[str, Any], Callable[..., None]], Dict[str, Any]]
+HANDLERS: Dict[str, TaskHandler] = {}
+
+
+def task_handler(kind: str):
+    def register(func: TaskHandler) -> TaskHandler:
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+@task_handler("extract")
+def _run_extract(payload: Dict[str, Any], report: Callable[..., None]) -> Dict[str, Any]:
+    from backend.resume_parser import process_saved_resume
+
+    report(0.1, "Extracting text from your resume...")
+    result = process_saved_resume(payload["user_id"], payload["file_path"], payload["content_hash"])
+    if not result["success"]:
+        raise TaskError(result["error"])
+    return result
+
+
+@task_handler("analyze_comprehensive")
+def _run_analyze_comprehensive(payload: Dict[str, Any], report: Callable[..., None]) -> Dict[str, Any]:
+    from backend.llm_analyzer import LLMAnalyzer, COMPREHENSIVE_ANALYSIS_SCHEMA, COMPREHENSIVE_PROMPT_VERSION
+    from backend.models import ResumeAnalysis
+    from utils.database import store_analysis_result
+
+    analyzer = LLMAnalyzer()
+    analyzer.mock_mode = analyzer.mock_mode or payload.get("mock", False)
+    report(0.05, "Waiting for the AI engine...")
+
+    # Partial fields are published as they stream in so the page can draw finished sections
+    fields: Dict[str, Any] = {}
+    for key, value in analyzer.stream_resume_comprehensive(payload["resume_text"]):
+        if key == "error":
+            raise TaskError(value)
+        fields[key] = value
+        report(0.05 + 0.9 * len(fields) / len(COMPREHENSIVE_ANALYSIS_SCHEMA), f"Received {key.replace('_', ' ')}", fields)
+
+    analysis = ResumeAnalysis.from_dict(fields)
+    # Persist complete, real answers so later sessions load them instead of calling Gemini again.
+    # A stream that broke off is marked provisional; the key check guards any other partial answer.
+    complete = all(key in fields for key in COMPREHENSIVE_ANALYSIS_SCHEMA)
+    if payload.get("resume_hash") and complete and not analysis.provisional:
+        store_analysis_result(
+            payload["user_id"], payload["resume_hash"], COMPREHENSIVE_PROMPT_VERSION, **analysis.to_db_fields()
+        )
+    return analysis.to_dict()
+
+
+@task_handler("skills_gap")
+def _run_skills_gap(payload: Dict[str, Any], report: Callable[..., None]) -> Dict[str, Any]:
+    from backend.llm_analyzer import LLMAnalyzer
+
+    analyzer = LLMAnalyzer()
+    analyzer.mock_mode = analyzer.mock_mode or payload.get("mock", False)
+    report(0.1, f"Comparing your resume with {payload['target_role']}...")
+    result = analyzer.analyze_skills_gap(payload["resume_text"], payload["target_role"], payload["experience_level"])
+    if result.error:
+        raise TaskError(result.error)
+    return result.to_dict()
+
+
+# -----------------------------
+# Worker processes
+# -----------------------------
+def run_worker(worker_id: str, parent_pid: Optional[int] = None, queue: Optional[TaskQueue] = None) -> None:
+    """Claims and runs tasks until the parent process (if given) goes away."""
+    queue = queue or get_task_queue()
+    queue.purge()
+    logger.info(f"Task worker {worker_id} started.")
+
+    while parent_pid is None or os.getppid() == parent_pid:
+        task = queue.claim(worker_id)
+        if task is None:
+            time.sleep(POLL_SECONDS)
+            continue
+
+        task_id, kind = task["task_id"], task["kind"]
+        handler = HANDLERS.get(kind)
+        logger.info(f"Worker {worker_id} running task {task_id} ({kind}, attempt {task['attempt']})")
+        if handler is None:
+            queue.fail(task_id, worker_id, TaskError(f"Unknown task kind: {kind}"), retry=False)
+            continue
+
+        def report(progress=None, message=None, partial=None, _task_id=task_id):
+            # Stops the handler once the task has been handed to someone else
+            if not queue.report(_task_id, worker_id, progress, message, partial):
+                raise LeaseLost(f"Task {_task_id} is no longer leased to {worker_id}")
+
+        try:
+            result = handler(task["payload"], report)
+        except LeaseLost as e:
+            logger.warning(f"{e}; abandoning it.")
+        except TaskError as e:
+            queue.fail(task_id, worker_id, e, retry=False)
+        except Exception as e:
+            logger.exception(f"Task {task_id} ({kind}) failed")
+            queue.fail(task_id, worker_id, e)
+        else:
+            if not queue.complete(task_id, worker_id, result):
+                logger.warning(f"Task {task_id} is no longer leased to {worker_id}; its result was discarded.")
+
+
+_workers: List[subprocess.Popen] = []
+_workers_lock = threading.Lock()
+
+
+def _stop_workers() -> None:
+    for proc in _workers:
+        if proc.poll() is None:
+            proc.terminate()
+
+
+def ensure_workers(count: Optional[int] = None) -> None:
+    """
+    Starts the worker processes for this server (once; dead workers are replaced).
+    Workers are separate interpreters running `python -m backend.task_queue`, so an
+    LLM call or a slow PDF never blocks a Streamlit session. They exit with the server.
+    """
+    count = count or int(os.getenv("TASK_WORKERS", DEFAULT_WORKERS))
+    with _workers_lock:
+        _workers[:] = [p for p in _workers if p.poll() is None]
+        if len(_workers) >= count:
+            return
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+        if not _workers:
+            atexit.register(_stop_workers)
+        for _ in range(count - len(_workers)):
+            _workers.append(subprocess.Popen(
+                [sys.executable, "-m", "backend.task_queue", "--parent-pid", str(os.getpid())],
+                env=env,
+            ))
+
+
+def submit_task(kind: str, payload: Dict[str, Any], dedup_key: Optional[str] = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+    """Enqueues a task, making sure workers are running to pick it up."""
+    ensure_workers()
+    return get_task_queue().enqueue(kind, payload, dedup_key=dedup_key, max_attempts=max_attempts)
+
+
+if __name__ == "__main__":
+    # Also usable standalone: python -m backend.task_queue
+    parser = argparse.ArgumentParser(description="Run a background task worker.")
+    parser.add_argument("--parent-pid", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        run_worker(f"worker-{os.getpid()}", parent_pid=args.parent_pid)
+    except KeyboardInterrupt:
+        pass
@@ -1,9 +1,12 @@
+import os
 import streamlit as st
 import plotly.graph_objects as go
-from backend.llm_analyzer import LLMAnalyzer
+from backend.llm_analyzer import LLMAnalyzer, COMPREHENSIVE_PROMPT_VERSION
+from backend.models import ResumeAnalysis
 from backend.auth import require_login
-from utils.database import get_resume_analysis_by_user
-import time
+from backend.task_queue import submit_task, make_dedup_key, STATUS_DONE
+from frontend.task_status import get_tracked_task, is_pending, show_task_progress, poll_again
+from utils.database import get_resume_analysis_by_user, get_latest_resume, get_stored_analysis
 from datetime import datetime
 
 def render_analysis():
@@ -38,6 +41,14 @@ def render_analysis():
     </style>
     """, unsafe_allow_html=True)
     
+    # New session (or browser refresh): pick the resume up from the database
+    if "resume_text" not in st.session_state and user.get("resume_file_path"):
+        latest = get_latest_resume(user["user_id"])
+        if latest and latest["extracted_resume_text"]:
+            st.session_state["resume_text"] = latest["extracted_resume_text"]
+            st.session_state["resume_hash"] = latest["resume_hash"]
+            st.session_state.setdefault("uploaded_filename", os.path.basename(user["resume_file_path"]))
+
     if "resume_text" not in st.session_state:
         st.warning("⚠️ No resume found. Please upload one to begin analysis.")
         if st.button("📂 Upload Resume Now"):
@@ -72,39 +83,7 @@ def render_analysis():
                                  analysis_options,
                                  index=default_index)
 
-    if st.button("Run Analysis"):
-        if not analyzer:
-             st.error("AI Engine fatal error.")
-        else:
-             if use_demo:
-                 analyzer.mock_mode = True
-                 
-             with st.spinner("Analyzing... (This may take a few seconds)"):
-                if analyzer.mock_mode:
-                    st.warning("⚠️ **Running in MOCK MODE**")
-                    st.info("To get real AI analysis, get an API key from [Google AI Studio](https://aistudio.google.com/app/apikey) and put it in `.env`.")
-                    time.sleep(1.5) # Simulate work
-                    
-                    # Run generic mock analysis
-                    results = analyzer.analyze_resume_comprehensive(st.session_state["resume_text"])
-                    st.session_state["analysis_results"] = results
-                    st.success("Mock Analysis Complete!")
-                    
-                # Skip explicit connection check to prefer the retry logic in the actual analysis call
-                # elif not analyzer.check_connection():
-                #     st.error("Failed to connect to AI Service. Check your network or API Key.")
-                else:
-                    # Run the analysis
-                    results = analyzer.analyze_resume_comprehensive(st.session_state["resume_text"])
-                    if "error" in results:
-                        st.error(f"Analysis Failed: {results['error']}")
-                    else:
-                        st.session_state["analysis_results"] = results
-                        st.success("Analysis Complete!")
-
-    st.markdown("---")
-    
-    # Custom CSS for Report View
+    # Custom CSS for Report View (defined before the report can start streaming in)
     st.markdown("""
     <style>
     /* Report Container */
@@ -204,10 +183,57 @@ def render_analysis():
     
     </style>
     """, unsafe_allow_html=True)
+
+    analysis_task = get_tracked_task("analysis_task_id")
+
+    # Serve the stored analysis of this resume (same prompt version) instead of calling Gemini again
+    resume_hash = st.session_state.get("resume_hash")
+    if "analysis_results" not in st.session_state and resume_hash and analysis_task is None:
+        stored = get_stored_analysis(user["user_id"], resume_hash, COMPREHENSIVE_PROMPT_VERSION)
+        if stored:
+            st.session_state["analysis_results"] = ResumeAnalysis.from_db_row(stored)
+            st.session_state["analysis_loaded_at"] = stored["analysis_timestamp"]
+
+    if st.button("Run Analysis", disabled=is_pending(analysis_task)):
+        if not analyzer:
+             st.error("AI Engine fatal error.")
+        else:
+             mock = use_demo or analyzer.mock_mode
+             if mock:
+                 st.warning("⚠️ **Running in MOCK MODE**")
+                 st.info("To get real AI analysis, get an API key from [Google AI Studio](https://aistudio.google.com/app/apikey) and put it in `.env`.")
+
+             # The analysis runs in a background worker; this page polls it
+             resume_text = st.session_state["resume_text"]
+             st.session_state["analysis_task_id"] = submit_task(
+                 "analyze_comprehensive",
+                 {"resume_text": resume_text, "mock": mock, "user_id": user["user_id"], "resume_hash": resume_hash},
+                 dedup_key=make_dedup_key("analyze_comprehensive", user["user_id"], resume_text, mock),
+             )
+             st.session_state.pop("analysis_results", None)
+             st.session_state.pop("analysis_loaded_at", None)
+             analysis_task = get_tracked_task("analysis_task_id")
+
+    if is_pending(analysis_task):
+        show_task_progress(analysis_task)
+        if current_page != "Resume Scoring":
+            # Report view: draw each section as soon as its part of the answer has arrived
+            render_partial_report(analysis_task["partial"])
+        poll_again()
+    elif analysis_task is not None:
+        if analysis_task["status"] == STATUS_DONE:
+            st.session_state["analysis_results"] = ResumeAnalysis.from_dict(analysis_task["result"])
+            st.toast("Analysis Complete!")
+        else:
+            st.error(f"Analysis Failed: {analysis_task['error']}")
+
+    st.markdown("---")
     
     # Check if we have results to display
     if "analysis_results" in st.session_state:
         results = st.session_state["analysis_results"]
+        if st.session_state.get("analysis_loaded_at"):
+            st.caption(f"Saved analysis from {st.session_state['analysis_loaded_at'][:16].replace('T', ' ')}. Click 'Run Analysis' to refresh it.")
         
         # Determine view mode: Score vs Report
         if current_page == "Resume Scoring":
@@ -219,7 +245,7 @@ def render_analysis():
 
 def render_scoring_dashboard(results, user_id):
     st.subheader("📊 Scoring Dashboard")
-    score = results.get("score", 0)
+    score = results.score
     
     col1, col2 = st.columns([1, 1])
     
@@ -286,15 +312,14 @@ def render_scoring_dashboard(results, user_id):
     st.markdown("---")
     
     # Section Breakdown
-    if "section_analysis" in results:
-        sections_data = results["section_analysis"]
+    if results.section_analysis:
         categories = ["Summary", "Experience", "Projects", "Skills", "Education"]
         r = [
-            sections_data.get("summary_section", {}).get("score", 0),
-            sections_data.get("experience_section", {}).get("score", 0),
-            sections_data.get("projects_section", {}).get("score", 0),
-            sections_data.get("skills_section", {}).get("score", 0),
-            sections_data.get("education_section", {}).get("score", 0)
+            results.section("summary_section").score,
+            results.section("experience_section").score,
+            results.section("projects_section").score,
+            results.section("skills_section").score,
+            results.section("education_section").score
         ]
         
         fig_radar = go.Figure(go.Scatterpolar(r=r, theta=categories, fill='toself', name='Section Score'))
@@ -306,11 +331,27 @@ def render_scoring_dashboard(results, user_id):
 def render_full_report(results):
     # Main Title
     st.markdown('<div class="section-header">📊 Full Resume Analysis Report</div>', unsafe_allow_html=True)
-    
+    for _, render_section in REPORT_SECTIONS:
+        render_section(results)
+
+def render_partial_report(fields):
+    """
+    Draws the sections of a still-running analysis whose fields have all arrived.
+    `fields` are the partial results the analysis task has published so far.
+    """
+    ready = [render for needed, render in REPORT_SECTIONS if needed <= fields.keys()]
+    if not ready:
+        return
+    st.markdown('<div class="section-header">📊 Full Resume Analysis Report</div>', unsafe_allow_html=True)
+    partial = ResumeAnalysis.from_dict(fields)
+    for render_section in ready:
+        render_section(partial)
+
+def render_candidate_details(results):
     # 1. Candidate Details
-    name = results.get("candidate_name", "Not Found")
-    email = results.get("candidate_email", "Not Found")
-    phone = results.get("candidate_phone", "Not Found")
+    name = results.candidate_name
+    email = results.candidate_email
+    phone = results.candidate_phone
     
     st.markdown("### 👤 Candidate Details")
     st.markdown(f"""
@@ -321,10 +362,11 @@ def render_full_report(results):
     </div>
     """, unsafe_allow_html=True)
 
+def render_score_overview(results):
     # 1.5 Overall Score Gauge & Grid Analysis (New Requirement)
     st.markdown("### 🎯 Score & Breakdown")
     
-    score = results.get("score", 0)
+    score = results.score
     
     # Top Row: Gauge + Summary
     gc1, gc2 = st.columns([1, 2])
@@ -356,17 +398,16 @@ def render_full_report(results):
             <div>
                 <h4 style="margin:0; color:#f8fafc;">Executive Summary</h4>
                 <p style="color:#cbd5e1; font-size:0.95rem; margin-top:5px;">
-                    {results.get('summary', 'No summary available.')}
+                    {results.summary}
                 </p>
             </div>
         </div>
         """, unsafe_allow_html=True)
 
-   
+def render_section_grid(results):
     # Section Breakdown Grid
-    if "section_analysis" in results:
+    if results.section_analysis:
         st.markdown("#### 🧩 Section Analysis (Grid View)")
-        sections = results["section_analysis"]
         
         # Grid Definition
         sec_map = {
@@ -380,9 +421,9 @@ def render_full_report(results):
         cols = st.columns(3)
         
         for i, (key, title) in enumerate(sec_map.items()):
-            data = sections.get(key, {})
-            sec_score = data.get("score", 0)
-            sec_feedback = data.get("feedback", ["No feedback"])[0] if data.get("feedback") else "No feedback"
+            data = results.section(key)
+            sec_score = data.score
+            sec_feedback = data.feedback[0] if data.feedback else "No feedback"
             
             # Determine color
             if sec_score >= 8: color = "#22c55e" # Green
@@ -401,9 +442,10 @@ def render_full_report(results):
                 </div>
                 """, unsafe_allow_html=True)
 
+def render_strengths(results):
     # 2. Key Strengths
     st.markdown("### 🟢 Key Strengths")
-    strengths = results.get("strengths", [])
+    strengths = results.strengths
     if not strengths:
         st.info("No key strengths identified.")
     
@@ -418,9 +460,10 @@ def render_full_report(results):
         </div>
         """, unsafe_allow_html=True)
 
+def render_weaknesses(results):
     # 3. Key Weaknesses
     st.markdown("### 🔴 Key Weaknesses")
-    weaknesses = results.get("weaknesses", [])
+    weaknesses = results.weaknesses
     if not weaknesses:
         st.info("No critical weaknesses detected.")
 
@@ -439,16 +482,17 @@ def render_full_report(results):
         </div>
         """, unsafe_allow_html=True)
 
+def render_improvement_plan(results):
     # 4. Improvement Suggestions
     st.markdown("### 🚀 Strategic Improvement Plan")
-    suggestions = results.get("improvement_suggestions", [])
+    suggestions = results.improvement_suggestions
     
     if not suggestions:
         st.info("No specific improvements suggested.")
     
     for i, item in enumerate(suggestions):
-        impact = item.get('impact', 'Medium')
-        suggestion = item.get('suggestion', 'No details available.')
+        impact = item.impact
+        suggestion = item.suggestion
         
         # Determine styling based on impact
         if "High" in impact:
@@ -478,3 +522,12 @@ def render_full_report(results):
         </div>
         """, unsafe_allow_html=True)
 
+# (fields needed, renderer) in page order; render_partial_report draws each one once its fields are complete
+REPORT_SECTIONS = [
+    ({"candidate_name", "candidate_email", "candidate_phone"}, render_candidate_details),
+    ({"score", "summary"}, render_score_overview),
+    ({"section_analysis"}, render_section_grid),
+    ({"strengths"}, render_strengths),
+    ({"weaknesses"}, render_weaknesses),
+    ({"improvement_suggestions"}, render_improvement_plan),
+]
@@ -3,8 +3,8 @@ import streamlit as st
 
 from backend.auth import require_login
 from utils.database import (
-    get_resume_analysis_by_user,
-    get_recommended_jobs,
+    count_resume_analyses,
+    count_recommended_jobs,
 )
 
 
@@ -13,11 +13,10 @@ def render_dashboard():
     
     # Check status
     resume_uploaded = bool(user.get("resume_file_path"))
-    analyses = get_resume_analysis_by_user(user["user_id"])
-    jobs = get_recommended_jobs(user["user_id"], min_match=0.0)
+    analyses = count_resume_analyses(user["user_id"])
+    job_match_count = count_recommended_jobs(user["user_id"])
     
     last_analysis_status = "Completed" if analyses else "Pending"
-    job_match_count = len(jobs)
     
     # --- Header ---
     st.markdown(f"# Welcome, {user['name']} 👋")
@@ -112,7 +111,7 @@ def render_dashboard():
 """
 
     # Item 3: Job Suggestions
-    if jobs:
+    if job_match_count:
         activity_html += """
 <div style="display: flex; align-items: center;">
     <span style="font-weight: bold; margin-right: 10px;">•</span> 💼 Job suggestions opened
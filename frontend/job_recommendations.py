@@ -3,7 +3,23 @@ import time
 import json
 from backend.scraper import LinkedInScraper, generate_search_query
 from backend.llm_analyzer import LLMAnalyzer
-from utils.database import save_job_recommendation, get_recommended_jobs, update_job_status, delete_job_recommendation
+from backend.job_pipeline import JobMatchPipeline
+from backend.skill_matcher import rank_jobs
+from backend.models import WeightedMatch
+from utils.database import (
+    save_job_recommendations_bulk, query_recommended_jobs, count_recommended_jobs,
+    update_job_status, delete_job_recommendation, search_jobs,
+)
+
+# What the result cards and the Saved tab show (job_description is never rendered)
+CARD_COLUMNS = (
+    "job_title", "company_name", "location", "posted_date", "applicants_count", "salary_range",
+    "job_url", "match_percentage", "component_scores", "matching_skills", "missing_skills",
+    "analysis_summary", "status",
+)
+SAVED_COLUMNS = ("job_title", "company_name", "location", "match_percentage", "missing_skills", "posted_date", "status")
+SAVED_STATUSES = ("saved", "applied")
+SAVED_PAGE_SIZE = 20
 
 def render_job_recommendations():
     st.title("💼 Intelligent Job Recommendations")
@@ -126,12 +142,11 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
         else:
             status_box = st.status("Initializing Job Agent...", expanded=True)
             try:
-                scraper = LinkedInScraper(headless=False)
+                scraper = LinkedInScraper(headless=True)
                 analyzer = LLMAnalyzer()
                 
                 # 1. Search
                 status_box.write("🌐 Connecting to LinkedIn...")
-                scraper.setup_driver()
                 scraper.search_jobs(
                     keywords, 
                     location, 
@@ -143,6 +158,7 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
                 # 2. Scrape
                 status_box.write("📥 Fetching job cards...")
                 jobs = scraper.scrape_jobs_listing(limit_pages=1)
+                scraper.close()  # detail pages are loaded by the pipeline's own fetch workers
                 
                 if not jobs:
                     status_box.update(label="No jobs found!", state="error")
@@ -150,48 +166,55 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
                 else:
                     status_box.write(f"found {len(jobs)} jobs. Analyzing top 5 matches...")
                     
+                    # Pre-rank every card locally so the LLM only sees the most promising ones
+                    jobs = rank_jobs(resume_text, jobs)
+                    
                     # 3. Analyze Top 5
                     results_for_display = []
                     
                     progress_bar = status_box.progress(0)
                     top_jobs = jobs[:5] # Analyze top 5
-                    
-                    for i, job in enumerate(top_jobs):
+                    for job in top_jobs:
                         status_box.write(f"🧠 AI Analyzing: {job['job_title']} at {job['company_name']}...")
-                        
-                        # Get full details
-                        details = scraper.get_job_details_and_parse(job['job_url'])
-                        
-                        if details:
-                            # AI Weighted Match
-                            match_data = analyzer.analyze_match_weighted(resume_text, details.get("job_description", ""))
-                            
-                            # Merge Data
-                            full_job_data = {**job, **details, **match_data}
+                    
+                    # Fetch, parse and score concurrently; results stream in as each job finishes
+                    pipeline = JobMatchPipeline(scraper, analyzer, resume_text)
+                    jobs_to_save = []
+                    for i, (job, full_job_data, error) in enumerate(pipeline.run(top_jobs)):
+                        if full_job_data:
                             results_for_display.append(full_job_data)
+                            match = full_job_data["match"]
+                            status_box.write(f"✅ {job['job_title']}: {match.match_score}% match")
                             
-                            # Save to DB
-                            save_job_recommendation(
-                                user_id=user_id,
-                                job_title=full_job_data.get('job_title'),
-                                company_name=full_job_data.get('company_name'),
-                                location=full_job_data.get('location'),
-                                job_description=full_job_data.get('job_description'),
-                                job_url=full_job_data.get('job_url'),
-                                match_percentage=full_job_data.get('match_score', 0),
-                                posted_date=full_job_data.get('posted_date'),
-                                salary_range=full_job_data.get('salary_range'),
-                                applicants_count=full_job_data.get('applicants_count'),
-                                required_skills=full_job_data.get('required_skills'),
-                                job_type=full_job_data.get('job_type'),
-                                matching_skills=full_job_data.get('matching_skills'),
-                                missing_skills=full_job_data.get('missing_skills'),
-                                analysis_summary=full_job_data.get('analysis_summary'),
-                                component_scores=full_job_data.get('component_scores')
-                            )
+                            jobs_to_save.append({
+                                "job_title": full_job_data.get('job_title'),
+                                "company_name": full_job_data.get('company_name'),
+                                "location": full_job_data.get('location'),
+                                "job_description": full_job_data.get('job_description'),
+                                "job_url": full_job_data.get('job_url'),
+                                "posted_date": full_job_data.get('posted_date'),
+                                "salary_range": full_job_data.get('salary_range'),
+                                "applicants_count": full_job_data.get('applicants_count'),
+                                "required_skills": full_job_data.get('required_skills'),
+                                "job_type": full_job_data.get('job_type'),
+                                **match.to_db_fields()
+                            })
+                        else:
+                            status_box.write(f"⚠️ Skipped {job['job_title']}: {error}")
                         
                         progress_bar.progress((i + 1) / len(top_jobs))
                     
+                    # Save to DB in one transaction
+                    if jobs_to_save:
+                        saved = save_job_recommendations_bulk(user_id, jobs_to_save)
+                        # jobs_to_save and results_for_display are appended together, so positions line up
+                        for position, job_id in enumerate(saved.get("job_ids", [])):
+                            results_for_display[position]["job_id"] = job_id
+                        if not saved.get("success", True) and saved.get("error"):
+                            status_box.write(f"⚠️ Jobs not saved: {saved['error']}")
+                        for position, message in saved.get("errors", {}).items():
+                            status_box.write(f"⚠️ Not saved: {jobs_to_save[position]['job_title']} ({message})")
+                    
                     st.session_state["analyzed_jobs"] = results_for_display
                     status_box.update(label="Analysis Complete!", state="complete")
                     
@@ -210,12 +233,17 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
     display_jobs = st.session_state.get("analyzed_jobs", [])
     if not display_jobs and user_id != 999:
         # Fallback: Load recent from DB
-        display_jobs = get_recommended_jobs(user_id, min_match=0)
+        display_jobs = query_recommended_jobs(user_id, columns=CARD_COLUMNS)
+
+    # Typed match per job; fresh search results already carry the one built by the pipeline
+    for job in display_jobs:
+        if "match" not in job:
+            job["match"] = WeightedMatch.from_dict(job)
 
     # Sorting Logic (Client side for session data)
     if display_jobs:
         if sort_by == "Best Match":
-            display_jobs.sort(key=lambda x: x.get('match_percentage') or 0, reverse=True)
+            display_jobs.sort(key=lambda x: x["match"].match_score, reverse=True)
         elif sort_by == "Applicants Count":
             # Simple parsing for sorting
             def parse_applicants(x):
@@ -228,7 +256,8 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
         st.subheader(f"Results ({len(display_jobs)})")
         
         for i, job in enumerate(display_jobs):
-            score = job.get('match_percentage') or job.get('match_score') or 0
+            match = job["match"]
+            score = match.match_score
             
             # Badge Color
             if score >= 85: 
@@ -242,11 +271,11 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
                 badge_text = "Fair Match"
                 
             # Component Scores
-            comps = job.get('component_scores', {})
-            s_skill = comps.get('skills', 0) # Max 50
-            s_exp = comps.get('experience', 0) # Max 25
-            s_edu = comps.get('education', 0) # Max 15
-            s_resp = comps.get('responsibility', 0) # Max 10
+            comps = match.component_scores
+            s_skill = comps['skills'] # Max 50
+            s_exp = comps['experience'] # Max 25
+            s_edu = comps['education'] # Max 15
+            s_resp = comps['responsibility'] # Max 10
             
             # Helper for progress bars
             def render_bar(val, max_val, color="#3b82f6"):
@@ -254,8 +283,8 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
                 return f"""<div class="score-bar-container"><div class="score-bar-fill" style="width:{pct}%; background-color:{color};"></div></div>"""
 
             # Skills HTML
-            matching = job.get('matching_skills', [])
-            missing = job.get('missing_skills', [])
+            matching = match.matching_skills
+            missing = match.missing_skills
             
             matching_html = "".join([f'<span class="skill-badge badge-check">✓ {s}</span>' for s in matching[:5]])
             missing_html = "".join([f'<span class="skill-badge badge-missing">✗ {s}</span>' for s in missing[:5]])
@@ -321,7 +350,7 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
 
 <!-- AI Analysis -->
 <div style="margin-bottom:10px; font-style:italic; color:#e2e8f0;">
-     " {job.get('analysis_summary', 'No summary available.')} "
+     " {match.analysis_summary or 'No summary available.'} "
 </div>
 
 <div style="display:flex; gap:20px;">
@@ -343,15 +372,28 @@ def render_search_tab(user_id, resume_text, keywords, location, date_posted, job
 def render_saved_jobs_tab(user_id):
     st.markdown("### 🔖 Saved Applications")
     
-    # Get all jobs and filter in python (since get_recommended_jobs gets all matching)
-    # Ideally should add status filter to SQL, but for now filtering here
-    all_jobs = get_recommended_jobs(user_id)
-    saved_jobs = [j for j in all_jobs if j.get('status') in ['saved', 'applied']]
-    
-    if not saved_jobs:
+    total = count_recommended_jobs(user_id, statuses=SAVED_STATUSES)
+    if not total:
         st.info("No saved jobs yet. Go to 'Find Jobs' and save some!")
         return
 
+    search = st.text_input("🔍 Search saved jobs", placeholder="Title, company, location or skills", key="saved_jobs_search")
+    if search.strip():
+        saved_jobs = search_jobs(user_id, search, limit=SAVED_PAGE_SIZE, statuses=SAVED_STATUSES, columns=SAVED_COLUMNS)
+        if not saved_jobs:
+            st.info(f"No saved jobs match '{search}'.")
+            return
+        st.caption(f"Top {len(saved_jobs)} matches for '{search}'")
+    else:
+        pages = (total + SAVED_PAGE_SIZE - 1) // SAVED_PAGE_SIZE
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key="saved_jobs_page")
+        saved_jobs = query_recommended_jobs(
+            user_id, columns=SAVED_COLUMNS, statuses=SAVED_STATUSES,
+            limit=SAVED_PAGE_SIZE, offset=(page - 1) * SAVED_PAGE_SIZE,
+        )
+
     for i, job in enumerate(saved_jobs):
         status = job.get('status', 'saved')
         border_color = "#4ade80" if status == 'applied' else "#3b82f6"
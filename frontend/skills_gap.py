@@ -2,8 +2,10 @@
 import streamlit as st
 import plotly.graph_objects as go
 from backend.auth import require_login
-from backend.llm_analyzer import LLMAnalyzer
-from utils.database import get_resume_analysis_by_user
+from backend.models import SkillsGap
+from backend.task_queue import submit_task, make_dedup_key, STATUS_DONE
+from frontend.task_status import get_tracked_task, is_pending, show_task_progress, poll_again
+from utils.database import count_resume_analyses, get_latest_resume_text
 
 def render_skills_gap():
     user = require_login()
@@ -14,7 +16,7 @@ def render_skills_gap():
     # --- Check for Resume ---
     # We can check if file path exists or if there is past analysis
     resume_path = user.get("resume_file_path")
-    analyses = get_resume_analysis_by_user(user["user_id"])
+    analyses = count_resume_analyses(user["user_id"])
     
     # If no resume analysis found, we might need text from file (not implemented fully to read raw file here yet)
     # So we prefer using the latest analysis text if available
@@ -25,8 +27,7 @@ def render_skills_gap():
             st.rerun()
         return
 
-    latest_analysis = analyses[0]
-    resume_text = latest_analysis["extracted_resume_text"]
+    resume_text = get_latest_resume_text(user["user_id"])
     
     if not resume_text:
         st.error("Could not retrieve resume text. Please re-upload your resume.")
@@ -60,7 +61,9 @@ def render_skills_gap():
                 ["Fresher (0-1 years)", "Junior (1-3 years)", "Mid-Level (3-5 years)", "Senior (5+ years)", "Lead/Principal"]
             )
             
-        analyze_btn = st.button("Analyze Skills Gap", type="primary", use_container_width=True)
+        gap_task = get_tracked_task("skills_gap_task_id")
+        analyze_btn = st.button("Analyze Skills Gap", type="primary", use_container_width=True,
+                                disabled=is_pending(gap_task))
         
         # demo mode toggle
         use_demo = st.sidebar.checkbox("Enable Demo Mode", value=False, help="Use mock data for instant results.")
@@ -73,17 +76,23 @@ def render_skills_gap():
         if not target_role:
              st.error("Please specify a target role.")
         else:
-            with st.spinner("Consulting AI expert..."):
-                analyzer = LLMAnalyzer()
-                if use_demo:
-                    analyzer.mock_mode = True
-                    
-                result = analyzer.analyze_skills_gap(resume_text, target_role, experience_level)
-                
-                if "error" in result:
-                    st.error(f"Analysis failed: {result['error']}")
-                else:
-                    st.session_state["skills_gap_result"] = result
+            # Runs in a background worker; the page polls it below
+            st.session_state["skills_gap_task_id"] = submit_task(
+                "skills_gap",
+                {"resume_text": resume_text, "target_role": target_role,
+                 "experience_level": experience_level, "mock": use_demo},
+                dedup_key=make_dedup_key("skills_gap", resume_text, target_role, experience_level, use_demo),
+            )
+            gap_task = get_tracked_task("skills_gap_task_id")
+
+    if is_pending(gap_task):
+        show_task_progress(gap_task)
+        poll_again()
+    elif gap_task is not None:
+        if gap_task["status"] == STATUS_DONE:
+            st.session_state["skills_gap_result"] = SkillsGap.from_dict(gap_task["result"])
+        else:
+            st.error(f"Analysis failed: {gap_task['error']}")
 
     # --- Display Results ---
     result = st.session_state["skills_gap_result"]
@@ -95,7 +104,7 @@ def render_skills_gap():
         
         # Match Score
         # Match Score Gauge
-        score = result.get("match_score", 0)
+        score = result.match_score
         
         fig = go.Figure(go.Indicator(
             mode = "gauge+number",
@@ -121,25 +130,25 @@ def render_skills_gap():
         ))
         fig.update_layout(height=300, margin=dict(l=20, r=20, t=30, b=20), paper_bgcolor="rgba(0,0,0,0)", font={'color': "white"})
         st.plotly_chart(fig, use_container_width=True)
-        st.info(result.get('summary', ''))
+        st.info(result.summary)
 
         # Matched vs Missing (Must Have)
         st.markdown("#### 🔑 Critical Skills (Must Have)")
         c1, c2 = st.columns(2)
-        must_have = result.get("must_have", {})
+        must_have = result.must_have
         
         with c1:
             st.markdown("**✅ Matched**")
-            if must_have.get("matched"):
-                for s in must_have["matched"]:
+            if must_have.matched:
+                for s in must_have.matched:
                     st.success(s)
             else:
                 st.caption("No critical matches found.")
                 
         with c2:
             st.markdown("**🚫 Missing**")
-            if must_have.get("missing"):
-                for s in must_have["missing"]:
+            if must_have.missing:
+                for s in must_have.missing:
                     st.error(s)
             else:
                 st.caption("No critical gaps!")
@@ -149,20 +158,20 @@ def render_skills_gap():
         # Nice to Have (Advanced)
         st.markdown("#### 🌟 Bonus Skills (Nice to Have)")
         nc1, nc2 = st.columns(2)
-        nice_have = result.get("nice_to_have", {})
+        nice_have = result.nice_to_have
         
         with nc1:
             st.markdown("**✅ Matched**")
-            if nice_have.get("matched"):
-                for s in nice_have["matched"]:
+            if nice_have.matched:
+                for s in nice_have.matched:
                     st.info(s)
             else:
                 st.caption("No bonus matches.")
         
         with nc2:
             st.markdown("**🚫 To Learn**")
-            if nice_have.get("missing"):
-                for s in nice_have["missing"]:
+            if nice_have.missing:
+                for s in nice_have.missing:
                     st.warning(s)
             else:
                 st.caption("All bonus skills covered.")
@@ -171,7 +180,7 @@ def render_skills_gap():
 
         # Recommendations / Learning Path (Page 9 Style)
         st.markdown("### 🎓 Learning Recommendations")
-        recs = result.get("recommendations", [])
+        recs = result.recommendations
         
         if not recs:
             st.info("No specific recommendations generated.")
@@ -179,11 +188,11 @@ def render_skills_gap():
             for i, rec in enumerate(recs):
                 st.markdown(f"""
                 <div style="background:rgba(255,255,255,0.05); padding:15px; border-radius:10px; margin-bottom:10px; border-left: 4px solid #3b82f6;">
-                    <h4 style="margin:0 0 5px 0;">{i+1}. {rec.get('skill', 'Skill')}</h4>
-                    <p style="margin:0 0 8px 0; font-size:0.95rem; color:#cbd5e1;"><em>{rec.get('why_important', '')}</em></p>
+                    <h4 style="margin:0 0 5px 0;">{i+1}. {rec.skill}</h4>
+                    <p style="margin:0 0 8px 0; font-size:0.95rem; color:#cbd5e1;"><em>{rec.why_important}</em></p>
                     <div style="font-size:0.9rem;">
                         <strong>📚 Resources:</strong> 
-                        {' | '.join([f'<a href="https://www.google.com/search?q={r.replace(" ", "+")}" target="_blank" style="color:#60a5fa; text-decoration:none;">{r}</a>' for r in rec.get('learning_resources', [])])}
+                        {' | '.join([f'<a href="https://www.google.com/search?q={r.replace(" ", "+")}" target="_blank" style="color:#60a5fa; text-decoration:none;">{r}</a>' for r in rec.learning_resources])}
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
@@ -192,5 +201,5 @@ def render_skills_gap():
         
         # Page 6: Data Processing View
         with st.expander("🔍 View Raw Analysis Data (Page 6 Mode)"):
-            st.json(result)
+            st.json(result.to_dict())
 
@@ -0,0 +1,38 @@
+# frontend/task_status.py
+import time
+
+import streamlit as st
+
+from backend.task_queue import get_task_queue, POLL_SECONDS, STATUS_QUEUED, STATUS_RUNNING
+
+
+def get_tracked_task(session_key: str):
+    """
+    The background task whose id is stored in st.session_state[session_key], or None.
+    Finished tasks (done/failed) are returned once and then forgotten.
+    """
+    task_id = st.session_state.get(session_key)
+    if task_id is None:
+        return None
+    task = get_task_queue().get(task_id)
+    if task is None or task["status"] not in (STATUS_QUEUED, STATUS_RUNNING):
+        del st.session_state[session_key]
+    return task
+
+
+def is_pending(task) -> bool:
+    return task is not None and task["status"] in (STATUS_QUEUED, STATUS_RUNNING)
+
+
+def show_task_progress(task, queued_text: str = "Waiting for a free worker..."):
+    if task["status"] == STATUS_QUEUED:
+        text = queued_text if not task["error"] else f"Retrying after an error: {task['error']}"
+        st.progress(0.0, text=text)
+    else:
+        st.progress(min(1.0, max(0.0, task["progress"])), text=task["message"] or "Working...")
+
+
+def poll_again():
+    """Re-runs the page shortly so a pending task's progress keeps updating."""
+    time.sleep(POLL_SECONDS)
+    st.rerun()
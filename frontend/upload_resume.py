@@ -2,7 +2,9 @@
 import streamlit as st
 
 from backend.auth import require_login
-from backend.resume_parser import handle_resume_upload, delete_resume_for_user
+from backend.resume_parser import save_resume_file, delete_resume_for_user
+from backend.task_queue import submit_task, make_dedup_key, STATUS_DONE
+from frontend.task_status import get_tracked_task, is_pending, show_task_progress, poll_again
 
 
 def render_upload_resume():
@@ -38,6 +40,8 @@ def render_upload_resume():
                         del st.session_state["resume_text"]
                     if "uploaded_filename" in st.session_state:
                         del st.session_state["uploaded_filename"]
+                    st.session_state.pop("resume_hash", None)
+                    st.session_state.pop("analysis_results", None)
                     
                     st.success("Resume deleted successfully.")
                     st.rerun()
@@ -55,29 +59,43 @@ def render_upload_resume():
         st.write(f"Selected file: `{uploaded_file.name}`")
         st.write(f"Size: {uploaded_file.size / 1024:.2f} KB")
 
-    if st.button("⬆ Upload & Analyze", disabled=uploaded_file is None):
+    upload_task = get_tracked_task("upload_task_id")
+
+    if st.button("⬆ Upload & Analyze", disabled=uploaded_file is None or is_pending(upload_task)):
         if uploaded_file is None:
             st.error("Please select a file first.")
             return
 
-        with st.spinner("Uploading and analyzing your resume..."):
-            result = handle_resume_upload(user_id=user["user_id"], uploaded_file=uploaded_file)
-            
-            # Simulation of processing time for effect
-            import time
-            time.sleep(1)
+        # Saving is a quick chunked copy; extraction runs in a background worker
+        saved = save_resume_file(user_id=user["user_id"], uploaded_file=uploaded_file)
+        if not saved["success"]:
+            st.error(saved["error"])
+            return
+        st.session_state["upload_task_id"] = submit_task(
+            "extract",
+            {"user_id": user["user_id"], "file_path": saved["file_path"], "content_hash": saved["content_hash"]},
+            dedup_key=make_dedup_key("extract", user["user_id"], saved["content_hash"]),
+        )
+        st.session_state["uploaded_filename"] = uploaded_file.name
+        st.rerun()
+
+    if upload_task is None:
+        return
+    if is_pending(upload_task):
+        show_task_progress(upload_task)
+        poll_again()
+    elif upload_task["status"] != STATUS_DONE:
+        st.error(upload_task["error"] or "Failed to process resume.")
+    else:
+        result = upload_task["result"]
+        # Update session user resume_file_path
+        st.session_state["user"]["resume_file_path"] = result["file_path"]
 
-        if not result["success"]:
-            st.error(result["error"])
-        else:
-            # Update session user resume_file_path
-            st.session_state["user"]["resume_file_path"] = result["file_path"]
-            
-            # Save text for the Analysis page
-            st.session_state["resume_text"] = result["extracted_text"]
-            st.session_state["uploaded_filename"] = uploaded_file.name
+        # Save text for the Analysis page
+        st.session_state["resume_text"] = result["extracted_text"]
+        st.session_state["resume_hash"] = result["content_hash"]
+        st.session_state.pop("analysis_results", None)
 
-            st.success("Resume processed! Redirecting to analysis...")
-            time.sleep(1)
-            st.session_state["current_page"] = "AI Analysis"
-            st.rerun()
+        st.success("Resume processed! Redirecting to analysis...")
+        st.session_state["current_page"] = "AI Analysis"
+        st.rerun()
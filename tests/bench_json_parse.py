@@ -0,0 +1,106 @@
+import sys
+import os
+import re
+import ast
+import json
+import timeit
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.json_extract import parse_llm_json
+
+logging.disable(logging.CRITICAL)
+
+
+# -----------------------------
+# Previous implementation (LLMAnalyzer._clean_and_parse_json before the single-pass parser)
+# -----------------------------
+def legacy_parse(text):
+    if not text:
+        return {"error": "Empty response from LLM"}
+    text = text.strip()
+    if "```" in text:
+        if "```json" in text:
+            try:
+                text = text.split("```json")[1].split("```")[0].strip()
+            except IndexError:
+                pass
+        else:
+            try:
+                text = text.split("```")[1].split("```")[0].strip()
+            except IndexError:
+                pass
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        match = re.search(r"(\{.*\})", text, re.DOTALL)
+        if match:
+            return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        pass
+    try:
+        start = text.find("{")
+        end = text.rfind("}")
+        if start != -1 and end != -1:
+            return ast.literal_eval(text[start:end + 1])
+    except (ValueError, SyntaxError, RecursionError, MemoryError):
+        pass
+    return {"error": "Invalid JSON response from LLM"}
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+ANALYSIS = {
+    "candidate_name": "Jane Doe",
+    "candidate_email": "jane.doe@example.com",
+    "candidate_phone": "+1 555 010 2030",
+    "score": 78,
+    "summary": "Full-stack developer with strong academic record; no internship experience yet.",
+    "section_analysis": {
+        s: {"score": 7, "feedback": [f"Feedback for {s} " * 4]}
+        for s in ("summary_section", "experience_section", "projects_section", "skills_section", "education_section")
+    },
+    "strengths": ["Strong Academic Record", "Full Stack Projects", "Modern tech stack (React, Node, AWS)"],
+    "weaknesses": ["Missing Internship Experience", "Lack of DSA/Competitive Programming evidence"],
+    "skills_found": ["Python", "JavaScript", "React", "Node.js", "SQL", "Docker", "Git"] * 3,
+    "missing_skills": ["Kubernetes", "Testing", "CI/CD"],
+    "improvement_suggestions": [
+        {"impact": "High", "suggestion": "Focus on DSA questions on LeetCode"},
+        {"impact": "High", "suggestion": "Apply for internships"},
+        {"impact": "Medium", "suggestion": "Add a cloud certification"},
+    ],
+}
+VALID = json.dumps(ANALYSIS, indent=4)
+
+CORPUS = {
+    "valid": VALID,
+    "fenced": f"```json\n{VALID}\n```",
+    "preamble + prose": f"Sure! Here is the analysis you asked for:\n{VALID}\nLet me know if you need anything else.",
+    "trailing commas": VALID.replace("\n    }", ",\n    }").replace("\n    ]", ",\n    ]"),
+    "single quotes": str(ANALYSIS),
+    "raw newlines": VALID.replace("Full-stack developer with", "Full-stack developer\nwith"),
+    "python literals": VALID.replace('"score": 78', '"score": 78, "verified": True, "notes": None'),
+    "truncated": VALID[: len(VALID) * 2 // 3],
+    "large prose (200KB, braces)": ("Some {curly} text that is not JSON. " * 5500) + VALID,
+    "deep nesting": "{" + '"a": [' * 3000 + "1" + "]" * 3000 + "}",
+}
+
+
+def main():
+    print(f"{'case':<30} {'legacy ms':>10} {'new ms':>10}  legacy ok  new ok")
+    for name, text in CORPUS.items():
+        legacy_ok = "error" not in legacy_parse(text)
+        new_ok = "error" not in parse_llm_json(text)
+        runs = 20 if len(text) > 50_000 else 200
+        legacy_ms = min(timeit.repeat(lambda: legacy_parse(text), number=runs, repeat=3)) / runs * 1000
+        new_ms = min(timeit.repeat(lambda: parse_llm_json(text), number=runs, repeat=3)) / runs * 1000
+        print(f"{name:<30} {legacy_ms:>10.3f} {new_ms:>10.3f}  {str(legacy_ok):<9}  {new_ok}")
+
+
+if __name__ == "__main__":
+    main()
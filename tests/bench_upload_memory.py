@@ -0,0 +1,103 @@
+import sys
+import os
+import io
+import json
+import shutil
+import resource
+import tempfile
+import subprocess
+
+# Add project root to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import PyPDF2
+
+PAGES = 40
+PAYLOAD_MB = 40
+UPLOADS = 3  # uploads handled one after another in the same process
+
+
+# -----------------------------
+# Sample document
+# -----------------------------
+def build_pdf(path: str) -> None:
+    """A PDF with PAGES pages and an incompressible attachment, so the file is mostly raw bytes."""
+    writer = PyPDF2.PdfWriter()
+    for _ in range(PAGES):
+        writer.add_blank_page(width=612, height=792)
+    writer.add_attachment("payload.bin", os.urandom(PAYLOAD_MB * 1024 * 1024))
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+# -----------------------------
+# Upload handlers under test (run in a fresh child process each)
+# -----------------------------
+def legacy_upload(uploaded_file, file_path: str) -> str:
+    """handle_resume_upload before streaming: getvalue(), write, then parse a BytesIO copy."""
+    file_bytes = uploaded_file.getvalue()
+    with open(file_path, "wb") as f:
+        f.write(file_bytes)
+    reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def streaming_upload(uploaded_file, file_path: str) -> str:
+    from backend.resume_parser import save_upload_stream, extract_resume_text
+    save_upload_stream(uploaded_file, file_path)
+    return extract_resume_text(file_path, file_path)
+
+
+def child(mode: str, pdf_path: str, workdir: str) -> None:
+    os.chdir(workdir)  # the app keeps its data in ./data unless APP_DB_PATH says otherwise
+    os.environ["PDF_MAX_WORKERS"] = "1"  # keep extraction in this process so its RSS is measured
+    handler = legacy_upload if mode == "legacy" else streaming_upload
+    if mode != "legacy":
+        import backend.resume_parser  # noqa: F401  (import cost is not part of the measurement)
+
+    # Streamlit's UploadedFile is a BytesIO over the received bytes
+    uploads = []
+    for _ in range(UPLOADS):
+        with open(pdf_path, "rb") as f:
+            uploads.append(io.BytesIO(f.read()))
+    base_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    for i, upload in enumerate(uploads):
+        handler(upload, os.path.join(workdir, f"upload_{i}.pdf"))
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"base_kb": base_kb, "peak_kb": peak_kb}))
+
+
+def measure(mode: str, pdf_path: str) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"bench_{mode}_")
+    try:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, pdf_path, workdir],
+            check=True, stdout=subprocess.PIPE, text=True, cwd=ROOT,
+        ).stdout
+        return json.loads(out.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="bench_upload_")
+    try:
+        pdf_path = os.path.join(tmp, "resume.pdf")
+        build_pdf(pdf_path)
+        size_mb = os.path.getsize(pdf_path) / 1024 / 1024
+        print(f"File: {size_mb:.1f} MB, {PAGES} pages, {UPLOADS} uploads per run")
+        print(f"{'mode':<12} {'peak RSS MB':>12} {'over baseline MB':>18}")
+        for mode in ("legacy", "streaming"):
+            r = measure(mode, pdf_path)
+            print(f"{mode:<12} {r['peak_kb'] / 1024:>12.1f} {(r['peak_kb'] - r['base_kb']) / 1024:>18.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        child(*sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,18 @@
+# tests/conftest.py
+# Run from the repository root: python -m pytest
+import os
+import tempfile
+
+# -----------------------------
+# Isolated data directory
+# -----------------------------
+# Paths and settings are read when the app modules are imported, so they are set here,
+# before any test module imports them: the database, job index, task queue, rate limiter
+# and LLM cache all land in a throwaway directory instead of ./data.
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="resume-app-tests-")
+os.environ["APP_DB_PATH"] = os.path.join(TEST_DATA_DIR, "app.db")
+for name in ("JOB_INDEX_DIR", "TASK_QUEUE_DB", "GEMINI_RATE_LIMIT_DB", "LLM_CACHE_PATH"):
+    os.environ.pop(name, None)
+
+# No politeness delay between requests to the local stand-in server
+os.environ["SCRAPE_HOST_MIN_INTERVAL_SECONDS"] = "0"
@@ -0,0 +1,15 @@
+# tests/test_backend.py
+from backend.llm_analyzer import LLMAnalyzer
+
+# Long enough to pass the empty/unreadable resume check
+RESUME_TEXT = "Jane Doe - Python developer with five years of Django, PostgreSQL and AWS experience."
+
+
+def test_mock_response():
+    analyzer = LLMAnalyzer()
+    analyzer.mock_mode = True
+
+    results = analyzer.analyze_resume_comprehensive(RESUME_TEXT).to_dict()
+
+    expected_keys = ["candidate_name", "candidate_email", "candidate_phone", "strengths", "weaknesses"]
+    assert [k for k in expected_keys if k not in results] == []
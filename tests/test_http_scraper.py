@@ -0,0 +1,152 @@
+# tests/test_http_scraper.py
+"""
+Offline check of the HTTP scraping mode: saved LinkedIn guest-API pages are
+served from a local stand-in server and scraped through LinkedInScraper(mode="http").
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from backend import http_scraper
+from backend.scraper import LinkedInScraper
+
+# -----------------------------
+# Fixtures (trimmed copies of real guest-API responses)
+# -----------------------------
+CARD = """
+<li>
+  <div class="base-card relative job-search-card" data-entity-urn="urn:li:jobPosting:{job_id}">
+    <a class="base-card__full-link" href="{base}/jobs/view/{slug}-{job_id}?refId=abc&amp;trackingId=xyz">
+      <span class="sr-only">{title}</span>
+    </a>
+    <div class="base-search-card__info">
+      <h3 class="base-search-card__title">{title}</h3>
+      <h4 class="base-search-card__subtitle"><a href="#">{company}</a></h4>
+      <div class="base-search-card__metadata">
+        <span class="job-search-card__location">{location}</span>
+        <time class="job-search-card__listdate" datetime="2024-05-01">2 weeks ago</time>
+      </div>
+    </div>
+  </div>
+</li>
+"""
+
+JOBS = {
+    "3900000001": ("python-developer", "Python Developer", "Acme", "New York, NY"),
+    "3900000002": ("data-engineer", "Data Engineer", "Globex", "Remote"),
+    "3900000003": ("backend-engineer", "Backend Engineer", "Initech", "Austin, TX"),
+}
+# start offset -> job ids on that page (the second page repeats one card, as LinkedIn does)
+SEARCH_PAGES = {0: ["3900000001", "3900000002"], 2: ["3900000002", "3900000003"]}
+
+DETAIL = """
+<section class="core-section-container">
+  <div class="description__text description__text--rich">
+    <section class="show-more-less-html">
+      <div class="show-more-less-html__markup">
+        <p><strong>{title}</strong> at {company}.</p>
+        <ul><li>Python</li><li>SQL</li></ul>
+      </div>
+      <button class="show-more-less-html__button show-more-less-html__button--more">Show more</button>
+    </section>
+  </div>
+  <figcaption class="num-applicants__caption">Over 200 applicants</figcaption>
+</section>
+"""
+MISSING_DETAIL_ID = "3900000003"  # 404 from the guest API and the posting page
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    base = ""
+    blocked = False
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if StandInHandler.blocked:
+            return self._send(999, "")
+
+        if parts.path == "/jobs-guest/jobs/api/seeMoreJobPostings/search":
+            query = parse_qs(parts.query)
+            if query.get("keywords") != ["Python Developer"] or query.get("f_TPR") != ["r604800"]:
+                return self._send(400, "bad search parameters")
+            ids = SEARCH_PAGES.get(int(query["start"][0]), [])
+            body = "".join(CARD.format(base=self.base, job_id=job_id, slug=JOBS[job_id][0], title=JOBS[job_id][1],
+                                       company=JOBS[job_id][2], location=JOBS[job_id][3]) for job_id in ids)
+            return self._send(200, body)
+
+        if parts.path.startswith("/jobs-guest/jobs/api/jobPosting/"):
+            job_id = parts.path.rsplit("/", 1)[1]
+            if job_id in JOBS and job_id != MISSING_DETAIL_ID:
+                return self._send(200, DETAIL.format(title=JOBS[job_id][1], company=JOBS[job_id][2]))
+        return self._send(404, "")
+
+    def _send(self, status, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    StandInHandler.base = f"http://127.0.0.1:{server.server_address[1]}"
+    StandInHandler.blocked = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Point the guest endpoints at the stand-in server
+    monkeypatch.setattr(http_scraper, "LINKEDIN_BASE_URL", StandInHandler.base)
+
+    scraper = LinkedInScraper(mode="http")
+    yield scraper
+    scraper.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _search(scraper):
+    scraper.search_jobs("Python Developer", "New York", date_posted="week")
+    return scraper.scrape_jobs_listing(limit_pages=3)
+
+
+# -----------------------------
+# Tests
+# -----------------------------
+def test_job_search(scraper):
+    jobs = _search(scraper)
+    assert [job["job_title"] for job in jobs] == ["Python Developer", "Data Engineer", "Backend Engineer"]
+    assert all("?" not in job["job_url"] for job in jobs)  # tracking parameters stripped
+    assert (jobs[0]["company_name"], jobs[0]["location"]) == ("Acme", "New York, NY")
+    assert jobs[0]["posted_date"].startswith("20")
+    assert scraper.driver is None  # no browser leased
+
+
+def test_job_details(scraper):
+    jobs = _search(scraper)
+    details, text = scraper.fetch_job_details(jobs[0]["job_url"])
+    assert "<li>Python</li>" in details["job_description"]
+    assert "Python Developer at Acme." in " ".join(text.split())
+    assert details["applicants_count"] == "Over 200 applicants"
+    assert scraper.fetch_job_details(jobs[2]["job_url"]) == (None, "")
+
+
+def test_parallel_job_details(scraper):
+    jobs = _search(scraper)
+    results = {url: (result, error) for url, result, error in
+               scraper.fetch_job_details_parallel([job["job_url"] for job in jobs], workers=3)}
+    assert sorted(results) == sorted(job["job_url"] for job in jobs)  # every URL reported once
+    assert all(results[job["job_url"]][1] is None for job in jobs[:2])
+    assert results[jobs[2]["job_url"]][1] is not None  # failed page reported without aborting the batch
+
+
+def test_blocked_guest_access(scraper):
+    jobs = _search(scraper)
+    StandInHandler.blocked = True
+    assert scraper.scrape_jobs_listing(limit_pages=1) == []
+    assert scraper.fetch_job_details(jobs[0]["job_url"]) == (None, "")
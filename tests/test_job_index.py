@@ -0,0 +1,68 @@
+# tests/test_job_index.py
+from utils.job_index import JobVectorIndex, html_to_text
+
+PYTHON_JOB = "Senior Python developer building Django REST APIs with PostgreSQL"
+DATA_JOB = "Data engineer with Spark, Airflow and SQL pipelines"
+FRONTEND_JOB = "Frontend engineer, React and TypeScript"
+
+
+def _index(tmp_path):
+    index = JobVectorIndex(str(tmp_path / "job_index"))
+    index.add(1, 10, PYTHON_JOB)
+    index.add(2, 10, DATA_JOB)
+    index.add(3, 20, FRONTEND_JOB)
+    return index
+
+
+def test_add_and_query(tmp_path):
+    index = _index(tmp_path)
+    results = index.query("python django developer")
+    assert results[0][0] == 1
+    assert all(score > 0 for _, score in results)
+
+
+def test_query_by_user(tmp_path):
+    index = _index(tmp_path)
+    assert [job_id for job_id, _ in index.query("engineer", user_id=20)] == [3]
+
+
+def test_added_jobs_persist(tmp_path):
+    _index(tmp_path)
+    reopened = JobVectorIndex(str(tmp_path / "job_index"))
+    assert reopened.query("spark airflow")[0][0] == 2
+
+
+def test_removed_jobs_are_tombstoned(tmp_path):
+    index = _index(tmp_path)
+    index.remove_many([1, 1, 99])
+    assert 1 not in [job_id for job_id, _ in index.query("python django developer")]
+
+    # Tombstones are on disk, so another process opening the index skips the job too
+    reopened = JobVectorIndex(str(tmp_path / "job_index"))
+    assert 1 not in [job_id for job_id, _ in reopened.query("python django developer")]
+
+
+def test_tombstones_seen_by_other_instances(tmp_path):
+    index = _index(tmp_path)
+    other = JobVectorIndex(str(tmp_path / "job_index"))
+    other.remove(2)
+    assert 2 not in [job_id for job_id, _ in index.query("spark airflow")]
+
+
+def test_re_adding_clears_tombstone(tmp_path):
+    index = _index(tmp_path)
+    index.remove(3)
+    index.add(3, 20, FRONTEND_JOB)
+    assert index.query("react typescript")[0][0] == 3
+
+
+def test_rebuild_drops_tombstones(tmp_path):
+    index = _index(tmp_path)
+    index.remove(1)
+    assert index.rebuild([(1, 10, PYTHON_JOB), (4, 10, "Go developer, Kubernetes")]) == 2
+    assert index.query("python django developer")[0][0] == 1
+    assert index.query("react typescript") == []
+
+
+def test_html_to_text():
+    assert " ".join(html_to_text("<p>Python &amp; <b>SQL</b></p>").split()) == "Python & SQL"
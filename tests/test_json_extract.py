@@ -0,0 +1,52 @@
+# tests/test_json_extract.py
+from backend.json_extract import parse_llm_json, repair_json_object, validate_schema
+
+
+# -----------------------------
+# parse_llm_json
+# -----------------------------
+def test_fenced_answer_with_surrounding_prose():
+    text = 'Here you go:\n```json\n{"score": 80, "skills": ["Python", "SQL"]}\n```\nHope this helps! {placeholder}'
+    assert parse_llm_json(text) == {"score": 80, "skills": ["Python", "SQL"]}
+
+
+def test_truncated_answer_is_closed():
+    text = '{"score": 80, "summary": "Strong backend dev", "skills": ["Python", "SQ'
+    assert parse_llm_json(text) == {"score": 80, "summary": "Strong backend dev", "skills": ["Python", "SQ"]}
+
+
+def test_truncated_inside_nested_object():
+    text = '```json\n{"section_analysis": {"skills_section": {"score": 7, "feedback": "Add cl'
+    assert parse_llm_json(text) == {"section_analysis": {"skills_section": {"score": 7, "feedback": "Add cl"}}}
+
+
+def test_python_style_literals_and_quotes():
+    text = "{'name': 'Master's degree', 'ok': True, 'n': None, // note\n 'x': [1, 2,],}"
+    assert parse_llm_json(text) == {"name": "Master's degree", "ok": True, "n": None, "x": [1, 2]}
+
+
+def test_raw_control_characters_and_bad_escapes():
+    assert parse_llm_json('{"a": "line1\nline2", "b": "C:\\path"}') == {"a": "line1\nline2", "b": "C:\\path"}
+
+
+def test_no_object_reports_error():
+    assert parse_llm_json("no json here")["error"] == "Invalid JSON response from LLM"
+    assert parse_llm_json("")["error"] == "Empty response from LLM"
+
+
+def test_repair_stops_at_closing_brace():
+    assert repair_json_object('{"a": 1} trailing {"b": 2}') == '{"a": 1}'
+
+
+# -----------------------------
+# validate_schema
+# -----------------------------
+def test_validate_schema_coerces_and_drops():
+    cleaned, problems = validate_schema(
+        {"score": "85", "strengths": "Clear writing", "rank": "high"},
+        {"score": int, "strengths": [str], "rank": int},
+    )
+    assert cleaned["score"] == 85
+    assert cleaned["strengths"] == ["Clear writing"]
+    assert "rank" not in cleaned
+    assert problems
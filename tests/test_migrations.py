@@ -0,0 +1,149 @@
+# tests/test_migrations.py
+import sqlite3
+
+import pytest
+
+from utils import database
+from utils.job_index import html_to_text
+
+# -----------------------------
+# Schema the app created before versioned migrations (no user_version)
+# -----------------------------
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    hashed_password TEXT NOT NULL,
+    registration_date TEXT NOT NULL,
+    resume_file_path TEXT,
+    college_name TEXT,
+    course TEXT,
+    graduation_year TEXT
+);
+CREATE TABLE resume_analysis (
+    analysis_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    extracted_resume_text TEXT,
+    analysis_scores TEXT,
+    strengths TEXT,
+    weaknesses TEXT,
+    identified_skills TEXT,
+    recommended_skills TEXT,
+    analysis_timestamp TEXT,
+    FOREIGN KEY (user_id) REFERENCES users(user_id)
+);
+CREATE TABLE job_recommendations (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    job_title TEXT,
+    company_name TEXT,
+    location TEXT,
+    job_description TEXT,
+    job_url TEXT,
+    match_percentage REAL,
+    scraping_date TEXT,
+    posted_date TEXT,
+    salary_range TEXT,
+    applicants_count TEXT,
+    required_skills TEXT,
+    job_type TEXT,
+    status TEXT DEFAULT 'new',
+    FOREIGN KEY (user_id) REFERENCES users(user_id)
+);
+CREATE INDEX idx_user_email ON users(email);
+CREATE INDEX idx_resume_user ON resume_analysis(user_id);
+CREATE INDEX idx_jobs_user ON job_recommendations(user_id);
+"""
+
+JOB_INSERT = """
+INSERT INTO job_recommendations
+(user_id, job_title, company_name, location, job_description, job_url, match_percentage, scraping_date, required_skills, status)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / "app.db"), isolation_level=None)
+    connection.create_function("html_to_text", 1, html_to_text, deterministic=True)
+    connection.executescript(BASELINE_SCHEMA)
+    connection.execute(
+        "INSERT INTO users (name, email, hashed_password, registration_date) VALUES ('A', 'a@example.com', 'x', '2024-01-01')"
+    )
+    rows = [
+        # The same posting scraped twice (tracking parameters differ); the user saved the older copy
+        (1, "Python Developer", "Acme", "Remote", "<p>Python and <b>Django</b></p>",
+         "https://www.linkedin.com/jobs/view/python-developer-111/?refId=a", 70, "2024-01-01T10:00:00", '["Python"]', "saved"),
+        (1, "Python Developer", "Acme", "Remote", "<p>Python and <b>Django</b> (updated)</p>",
+         "https://www.linkedin.com/jobs/view/111/?trackingId=b", 72, "2024-01-02T10:00:00", "[]", "new"),
+        (1, "Data Engineer", "Globex", "Austin", "<p>Spark pipelines</p>",
+         "https://www.linkedin.com/jobs/view/222/", 60, None, None, None),
+        (1, "Manual entry", "Initech", "NYC", "Notes only", None, 50, "2024-01-03T10:00:00", None, "new"),
+    ]
+    for row in rows:
+        connection.execute(JOB_INSERT, row)
+    connection.execute(
+        "INSERT INTO resume_analysis (user_id, extracted_resume_text, analysis_scores, analysis_timestamp) "
+        "VALUES (1, 'Experienced Kubernetes administrator', '{}', '2024-01-01T09:00:00')"
+    )
+    yield connection
+    connection.close()
+
+
+def test_migrates_to_current_version(baseline_db):
+    assert database.run_migrations(baseline_db) == database.SCHEMA_VERSION
+    assert baseline_db.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+    applied = [row[0] for row in baseline_db.execute("SELECT version FROM schema_version ORDER BY version")]
+    assert applied == [number for number, _, _ in database.SCHEMA_MIGRATIONS]
+
+
+def test_up_to_date_database_is_left_alone(baseline_db):
+    database.run_migrations(baseline_db)
+    before = baseline_db.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+    assert database.run_migrations(baseline_db) == database.SCHEMA_VERSION
+    assert baseline_db.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == before
+
+
+def test_jobs_move_into_catalog_and_duplicates_collapse(baseline_db, monkeypatch):
+    removed = []
+    monkeypatch.setattr(database.get_job_index(), "remove_many", lambda job_ids: removed.extend(job_ids))
+    database.run_migrations(baseline_db)
+
+    catalog = baseline_db.execute("SELECT job_url, job_description FROM jobs ORDER BY job_url").fetchall()
+    assert [url for url, _ in catalog] == [
+        "https://www.linkedin.com/jobs/view/111/",
+        "https://www.linkedin.com/jobs/view/222/",
+    ]
+    assert "(updated)" in catalog[0][1]  # the newest copy's fields win
+
+    # One row per (user, posting): the saved copy is kept, the other is tombstoned in the index
+    kept = baseline_db.execute(
+        "SELECT job_id, status FROM job_recommendations WHERE catalog_job_id IS NOT NULL ORDER BY job_id"
+    ).fetchall()
+    assert kept == [(1, "saved"), (3, None)]
+    assert removed == [2]
+
+    # Jobs without a URL stay as they were
+    assert baseline_db.execute("SELECT job_title FROM job_recommendations WHERE job_id = 4").fetchone() == ("Manual entry",)
+
+
+def test_catalog_and_inline_resume_text_are_searchable(baseline_db):
+    database.run_migrations(baseline_db)
+
+    assert baseline_db.execute("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'django'").fetchall()
+    hits = baseline_db.execute(
+        "SELECT rt.content_hash FROM resumes_fts JOIN resume_texts rt ON rt.rowid = resumes_fts.rowid "
+        "WHERE resumes_fts MATCH 'kubernetes'"
+    ).fetchall()
+    analysis = baseline_db.execute("SELECT resume_hash, extracted_resume_text FROM resume_analysis").fetchone()
+    assert hits == [(analysis[0],)]
+    assert analysis[1] is None
+
+
+def test_added_columns_present(baseline_db):
+    database.run_migrations(baseline_db)
+    user_cols = {row[1] for row in baseline_db.execute("PRAGMA table_info(users)")}
+    job_cols = {row[1] for row in baseline_db.execute("PRAGMA table_info(job_recommendations)")}
+    assert {"current_role", "experience_years"} <= user_cols
+    assert {"catalog_job_id", "matching_skills", "component_scores"} <= job_cols
@@ -0,0 +1,121 @@
+# tests/test_task_queue.py
+import pytest
+
+from backend import task_queue
+from backend.task_queue import TaskQueue, TaskError, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TaskQueue(str(tmp_path / "task_queue.db"))
+
+
+@pytest.fixture
+def expired_leases(monkeypatch):
+    """Every running task counts as orphaned at the next claim()."""
+    monkeypatch.setattr(task_queue, "LEASE_SECONDS", -1)
+
+
+def _run_now(queue, task_id):
+    queue._conn.execute("UPDATE tasks SET run_after = 0 WHERE task_id = ?", (task_id,))
+
+
+# -----------------------------
+# Enqueue / claim
+# -----------------------------
+def test_dedup_while_pending(queue):
+    first = queue.enqueue("extract", {"n": 1}, dedup_key="k")
+    assert queue.enqueue("extract", {"n": 2}, dedup_key="k") == first
+    assert queue.enqueue("extract", {"n": 3}) != first
+
+
+def test_claim_and_complete(queue):
+    task_id = queue.enqueue("extract", {"n": 1})
+    task = queue.claim("w1")
+    assert (task["task_id"], task["payload"], task["attempt"]) == (task_id, {"n": 1}, 1)
+    assert queue.claim("w2") is None
+
+    assert queue.report(task_id, "w1", 0.5, "Halfway", {"part": 1})
+    assert queue.get(task_id)["partial"] == {"part": 1}
+    assert queue.complete(task_id, "w1", {"ok": True})
+    assert queue.get(task_id)["status"] == STATUS_DONE
+    assert queue.get(task_id)["result"] == {"ok": True}
+
+
+def test_failed_attempt_is_retried_then_fails(queue):
+    task_id = queue.enqueue("extract", {}, max_attempts=2)
+    queue.claim("w1")
+    assert queue.fail(task_id, "w1", RuntimeError("flaky")) is True
+    assert queue.get(task_id)["status"] == STATUS_QUEUED
+
+    _run_now(queue, task_id)
+    assert queue.claim("w1")["attempt"] == 2
+    assert queue.fail(task_id, "w1", RuntimeError("flaky")) is False
+    assert queue.get(task_id)["status"] == STATUS_FAILED
+
+
+def test_task_error_is_not_retried(queue):
+    task_id = queue.enqueue("extract", {})
+    queue.claim("w1")
+    assert queue.fail(task_id, "w1", TaskError("bad input"), retry=False) is False
+    assert queue.get(task_id)["status"] == STATUS_FAILED
+
+
+# -----------------------------
+# Leases
+# -----------------------------
+def test_expired_lease_is_requeued(queue, expired_leases):
+    task_id = queue.enqueue("extract", {})
+    queue.claim("w1")
+    task = queue.claim("w2")
+    assert (task["task_id"], task["attempt"]) == (task_id, 2)
+    assert queue.get(task_id)["status"] == STATUS_RUNNING
+
+
+def test_expired_lease_out_of_attempts_fails(queue, expired_leases):
+    task_id = queue.enqueue("extract", {}, max_attempts=1)
+    queue.claim("w1")
+    assert queue.claim("w2") is None
+    task = queue.get(task_id)
+    assert (task["status"], task["error"]) == (STATUS_FAILED, "Worker stopped responding")
+
+
+def test_report_renews_lease(queue):
+    task_id = queue.enqueue("extract", {})
+    queue.claim("w1")
+    queue._conn.execute("UPDATE tasks SET locked_at = 0 WHERE task_id = ?", (task_id,))
+    assert queue.report(task_id, "w1", 0.2)
+    assert queue.claim("w2") is None
+
+
+def test_stale_worker_cannot_touch_requeued_task(queue, expired_leases):
+    task_id = queue.enqueue("extract", {})
+    queue.claim("w1")
+    queue.claim("w2")
+
+    assert not queue.report(task_id, "w1", 0.9)
+    assert not queue.complete(task_id, "w1", {"from": "w1"})
+    assert queue.fail(task_id, "w1", RuntimeError("late")) is False
+    assert queue.get(task_id)["status"] == STATUS_RUNNING
+
+    assert queue.complete(task_id, "w2", {"from": "w2"})
+    assert queue.get(task_id)["result"] == {"from": "w2"}
+
+
+def test_worker_abandons_task_after_losing_lease(queue, monkeypatch):
+    # The handler's task is re-claimed by another worker while it runs
+    def handler(payload, report):
+        queue._conn.execute("UPDATE tasks SET locked_by = 'other' WHERE status = ?", (STATUS_RUNNING,))
+        report(0.5, "Still going")
+        return {"never": "stored"}
+
+    monkeypatch.setitem(task_queue.HANDLERS, "test_lost_lease", handler)
+    task_id = queue.enqueue("test_lost_lease", {})
+
+    # The worker loop runs while its parent is alive: let it see the parent once, run one task, and stop
+    parent = iter([0, -1])
+    monkeypatch.setattr(task_queue.os, "getppid", lambda: next(parent, -1))
+    task_queue.run_worker("w1", parent_pid=0, queue=queue)
+
+    task = queue.get(task_id)
+    assert task["status"] == STATUS_RUNNING and task["result"] is None
@@ -0,0 +1,12 @@
+# utils/data_paths.py
+import os
+
+# The app database. The job index, task queue, rate-limit and LLM cache files
+# default to its directory, so moving it with APP_DB_PATH moves them together.
+APP_DB_PATH = os.getenv("APP_DB_PATH", os.path.join("data", "app.db"))
+DATA_DIR = os.path.dirname(APP_DB_PATH)
+
+
+def data_path(*parts: str) -> str:
+    """A path inside the app's data directory."""
+    return os.path.join(DATA_DIR, *parts)
@@ -3,9 +3,23 @@ import sqlite3
 import os
 import re
 import json
-from datetime import datetime
+import queue
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import bcrypt
 
+from utils.data_paths import APP_DB_PATH, DATA_DIR
+from utils.job_index import get_job_index, html_to_text
+from utils.json_row import JsonRow
+
+logger = logging.getLogger(__name__)
+
 # -----------------------------
 # Helpers / Validation
 # -----------------------------
@@ -22,6 +36,29 @@ def is_valid_email(email: str) -> bool:
 def is_valid_url(url: str) -> bool:
     return bool(URL_REGEX.match(url or ""))
 
+LINKEDIN_JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/]*?-)?(\d+)/?$")
+TRACKING_PARAMS = ("utm_", "trk", "refid", "trackingid")
+
+def canonical_job_url(url: str) -> str:
+    """
+    One key per posting, however it was linked: LinkedIn's country hosts and
+    title slugs collapse to https://www.linkedin.com/jobs/view/<id>/; elsewhere
+    the fragment and tracking parameters are dropped.
+    """
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        match = LINKEDIN_JOB_ID_RE.search(parts.path)
+        if match:
+            return f"https://www.linkedin.com/jobs/view/{match.group(1)}/"
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ])
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/") or "/", query, ""))
+
 def iso_now() -> str:
     return datetime.utcnow().isoformat()
 
@@ -40,120 +77,554 @@ def check_password(plain_password: str, hashed: str) -> bool:
 # -----------------------------
 # Create data folder & connect
 # -----------------------------
-DB_DIR = "data"
-DB_FILE = os.path.join(DB_DIR, "app.db")
+DB_FILE = APP_DB_PATH
+DB_DIR = DATA_DIR
 
-if not os.path.exists(DB_DIR):
+if DB_DIR and not os.path.exists(DB_DIR):
     os.makedirs(DB_DIR)
 
-conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-cur = conn.cursor()
+BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+# Upper bound on writes grouped into one commit
+WRITE_BATCH_MAX = 64
+# How long a caller waits for the writer thread before its write is abandoned
+WRITE_TIMEOUT_SECONDS = float(os.getenv("DB_WRITE_TIMEOUT_SECONDS", "60"))
+
+def _connect() -> sqlite3.Connection:
+    # Autocommit mode: reads see the latest committed snapshot, writes manage their own transactions
+    connection = sqlite3.connect(DB_FILE, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000,
+                                 isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")  # readers never block the writer (or each other)
+    connection.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+    connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    # Used by the jobs_fts triggers; a connection without it cannot write to `jobs`
+    connection.create_function("html_to_text", 1, html_to_text, deterministic=True)
+    return connection
+
+
+class _ReadPool:
+    """Up to `size` reader connections, checked out one caller at a time."""
+
+    def __init__(self, size: int):
+        self._idle = queue.LifoQueue()
+        self._slots = threading.Semaphore(size)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = _connect()
+            try:
+                yield connection
+            finally:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+WriteResult = namedtuple("WriteResult", "lastrowid rowcount")
+
+
+class _WriteQueue:
+    """
+    Serialises every write through one thread and connection. Writes queued while
+    a commit is in progress are applied together and committed once (group commit);
+    each runs in its own savepoint, so a failing write rolls back alone and its
+    caller gets the exception while the rest of the batch commits.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, timeout: float = WRITE_TIMEOUT_SECONDS):
+        """
+        Runs fn(connection) on the writer connection and returns its result once committed.
+        Raises sqlite3.OperationalError if the writer has not finished it within `timeout`
+        seconds; a write that had not started by then is dropped.
+        """
+        if threading.current_thread() is self._thread:
+            return fn(self._conn)  # nested write from inside a transaction() callable
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((fn, future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            if not future.cancel():
+                # Already running: it is inside SQLite's busy timeout, so give it one more window
+                try:
+                    return future.result(timeout=timeout)
+                except TimeoutError:
+                    pass
+            raise sqlite3.OperationalError(f"Database writer did not respond within {timeout:g}s") from None
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        self._conn = _connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._apply(batch)
+
+    def _apply(self, batch):
+        """
+        Commits one batch and resolves its futures. Whatever goes wrong (a failed
+        savepoint, COMMIT or ROLLBACK, a callable that ended the transaction itself)
+        every future still gets an outcome and the writer thread keeps running.
+        """
+        try:
+            outcomes = self._commit_batch(batch)
+        except Exception as e:
+            logger.exception("Database write batch failed")
+            self._reset_connection()
+            outcomes = [(future, None, e) for _, future in batch]
+        for future, value, error in outcomes:
+            if future.done():  # cancelled by a caller that stopped waiting
+                continue
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+    def _commit_batch(self, batch):
+        outcomes = []
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:  # e.g. another process held the lock past the busy timeout
+            return [(future, None, e) for _, future in batch]
+
+        for fn, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue  # the caller timed out before this write started
+            self._conn.execute("SAVEPOINT write_op")
+            try:
+                value = fn(self._conn)
+                self._conn.execute("RELEASE write_op")
+                outcomes.append((future, value, None))
+            except Exception as e:
+                self._conn.execute("ROLLBACK TO write_op")
+                self._conn.execute("RELEASE write_op")
+                outcomes.append((future, None, e))
+
+        try:
+            self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self._conn.execute("ROLLBACK")
+            outcomes = [(future, None, e) for future, _, _ in outcomes]
+        return outcomes
+
+    def _reset_connection(self):
+        """Leaves no transaction open after a failed batch; reconnects if even that fails."""
+        try:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+        except sqlite3.Error:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = _connect()
+
+
+_read_pool = _ReadPool(READ_POOL_SIZE)
+_writer = _WriteQueue()
+
+def _read_one(sql: str, params=()):
+    with _read_pool.connection() as connection:
+        return connection.execute(sql, params).fetchone()
+
+def _read_all(sql: str, params=()):
+    with _read_pool.connection() as connection:
+        return connection.execute(sql, params).fetchall()
+
+def _read_dicts(sql: str, params=()):
+    """Rows as dicts keyed by column name (handles schema evolution without positional indexes)."""
+    with _read_pool.connection() as connection:
+        cursor = connection.execute(sql, params)
+        col_names = [description[0] for description in cursor.description]
+        return [dict(zip(col_names, r)) for r in cursor.fetchall()]
+
+def _write(sql: str, params=()) -> WriteResult:
+    """Executes one statement through the writer thread; returns this statement's lastrowid/rowcount."""
+    def execute(connection):
+        cursor = connection.execute(sql, params)
+        return WriteResult(cursor.lastrowid, cursor.rowcount)
+    return _writer.submit(execute)
+
+def _transaction(fn):
+    """Runs fn(connection) atomically on the writer connection (reads inside it see its own writes)."""
+    return _writer.submit(fn)
 
 # -----------------------------
-# Create tables
+# Job catalog SQL (used by migrations and CRUD)
 # -----------------------------
-cur.execute("""
-CREATE TABLE IF NOT EXISTS users (
-    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT UNIQUE NOT NULL,
-    hashed_password TEXT NOT NULL,
-    registration_date TEXT NOT NULL,
-    resume_file_path TEXT,
-    college_name TEXT,
-    course TEXT,
-    graduation_year TEXT
+CATALOG_FIELDS = (
+    "job_title", "company_name", "location", "job_description", "posted_date",
+    "salary_range", "applicants_count", "required_skills", "job_type",
 )
-""")
-# Try to add new columns if upgrading from older DB
-import sqlite3 as _sqlite3  # at top you already imported sqlite3; reuse if needed
-
-for col_def in [
-    "college_name TEXT",
-    "course TEXT",
-    "graduation_year TEXT",
-    "current_role TEXT",
-    "experience_years TEXT"
-]:
-    col_name = col_def.split()[0]
-    try:
-        # Check if column already exists
-        cur.execute("PRAGMA table_info(users)")
-        existing_cols = [r[1] for r in cur.fetchall()]
-        if col_name not in existing_cols:
-            cur.execute(f"ALTER TABLE users ADD COLUMN {col_def}")
-    except _sqlite3.OperationalError:
-        # Ignore if something fails; table will be recreated only in dev
-        pass
-
-for col_def in [
-    "posted_date TEXT",
-    "posted_date TEXT",
-    "salary_range TEXT",
-    "applicants_count TEXT",
-    "required_skills TEXT", 
-    "job_type TEXT",
-    "matching_skills TEXT",
-    "missing_skills TEXT",
-    "analysis_summary TEXT",
-    "component_scores TEXT",
-    "status TEXT"
-]:
-    col_name = col_def.split()[0]
+# Fields passed as NULL keep their stored value, so a partial update (e.g. only the
+# parsed fields) never wipes the rest of the row.
+CATALOG_MERGE_SQL = f"""
+    INSERT INTO jobs (job_url, {", ".join(CATALOG_FIELDS)}, first_scraped_at, scraped_at, parsed_at)
+    VALUES ({", ".join("?" for _ in range(len(CATALOG_FIELDS) + 4))})
+    ON CONFLICT(job_url) DO UPDATE SET
+    {", ".join(f"{name} = COALESCE(excluded.{name}, jobs.{name})" for name in CATALOG_FIELDS)},
+    scraped_at = COALESCE(excluded.scraped_at, jobs.scraped_at),
+    parsed_at = COALESCE(excluded.parsed_at, jobs.parsed_at)
+"""
+
+# -----------------------------
+# Schema migrations
+# -----------------------------
+# Each step runs once, in order, inside the same transaction as the version bump.
+# Steps are idempotent (IF NOT EXISTS, column checks) so databases created before
+# versioning (user_version 0) are adopted by replaying them. To change the schema,
+# append a step; never edit one that has shipped.
+def _add_columns_if_missing(cur, table: str, *col_defs: str):
+    cur.execute(f"PRAGMA table_info({table})")
+    existing_cols = {r[1] for r in cur.fetchall()}
+    for col_def in col_defs:
+        if col_def.split()[0] not in existing_cols:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {col_def}")
+
+def _migration_1_base_tables(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        hashed_password TEXT NOT NULL,
+        registration_date TEXT NOT NULL,
+        resume_file_path TEXT,
+        college_name TEXT,
+        course TEXT,
+        graduation_year TEXT,
+        current_role TEXT,
+        experience_years TEXT
+    )
+    """)
+    _add_columns_if_missing(
+        cur, "users",
+        "college_name TEXT", "course TEXT", "graduation_year TEXT", "current_role TEXT", "experience_years TEXT",
+    )
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS resume_analysis (
+        analysis_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        extracted_resume_text TEXT,
+        analysis_scores TEXT,
+        strengths TEXT,
+        weaknesses TEXT,
+        identified_skills TEXT,
+        recommended_skills TEXT,
+        analysis_timestamp TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )
+    """)
+
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS job_recommendations (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        job_title TEXT,
+        company_name TEXT,
+        location TEXT,
+        job_description TEXT,
+        job_url TEXT,
+        match_percentage REAL,
+        scraping_date TEXT,
+        posted_date TEXT,
+        salary_range TEXT,
+        applicants_count TEXT,
+        required_skills TEXT,
+        job_type TEXT,
+        status TEXT DEFAULT 'new',
+        matching_skills TEXT,
+        missing_skills TEXT,
+        analysis_summary TEXT,
+        component_scores TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    )
+    """)
+    # Unversioned databases could be missing any of these (the old ALTER loop ran
+    # before the table existed, so fresh databases never got them)
+    _add_columns_if_missing(
+        cur, "job_recommendations",
+        "posted_date TEXT", "salary_range TEXT", "applicants_count TEXT", "required_skills TEXT",
+        "job_type TEXT", "matching_skills TEXT", "missing_skills TEXT", "analysis_summary TEXT",
+        "component_scores TEXT", "status TEXT",
+    )
+
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_email ON users(email)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_resume_user ON resume_analysis(user_id)")
+
+def _migration_2_resume_texts(cur):
+    # Extracted resume text, content-addressed by the SHA-256 of the uploaded file.
+    # Analyses point at a row via resume_analysis.resume_hash instead of copying the text.
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS resume_texts (
+        content_hash TEXT PRIMARY KEY,
+        extracted_text TEXT NOT NULL,
+        page_count INTEGER,
+        parser_version TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """)
+    _add_columns_if_missing(cur, "resume_analysis", "resume_hash TEXT", "prompt_version TEXT")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_resume_hash ON resume_analysis(resume_hash)")
+
+def _migration_3_job_catalog(cur):
+    """
+    Shared job catalog: one row per posting (canonical URL) however many users it
+    matched, holding the scraped page and parsed JD fields. Recommendations that
+    stored a full copy of the job move it into the catalog and keep only their match data.
+    """
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS jobs (
+        catalog_job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_url TEXT UNIQUE NOT NULL,
+        job_title TEXT,
+        company_name TEXT,
+        location TEXT,
+        job_description TEXT,
+        posted_date TEXT,
+        salary_range TEXT,
+        applicants_count TEXT,
+        required_skills TEXT,
+        job_type TEXT,
+        first_scraped_at TEXT,
+        scraped_at TEXT,
+        parsed_at TEXT
+    )
+    """)
+    _add_columns_if_missing(cur, "job_recommendations", "catalog_job_id INTEGER REFERENCES jobs(catalog_job_id)")
+
+    cur.execute(f"""
+        SELECT job_id, job_url, {", ".join(CATALOG_FIELDS)}, scraping_date
+        FROM job_recommendations WHERE job_url IS NOT NULL AND catalog_job_id IS NULL
+        ORDER BY scraping_date, job_id
+    """)
+    skills_at = CATALOG_FIELDS.index("required_skills")
+    for job_id, job_url, *fields, scraping_date in cur.fetchall():
+        url = canonical_job_url(job_url)
+        if fields[skills_at] in ("", "[]"):
+            fields[skills_at] = None
+        parsed_at = scraping_date if fields[skills_at] else None
+        # Oldest first, so the newest copy's non-empty fields win
+        cur.execute(CATALOG_MERGE_SQL, (url, *fields, scraping_date, scraping_date, parsed_at))
+        cur.execute(f"""
+            UPDATE job_recommendations
+            SET catalog_job_id = (SELECT catalog_job_id FROM jobs WHERE job_url = ?),
+                job_url = NULL, {", ".join(f"{name} = NULL" for name in CATALOG_FIELDS)}
+            WHERE job_id = ?
+        """, (url, job_id))
+
+    # One row per (user, posting); keep the copy the user acted on (else the newest)
+    cur.execute("""
+    CREATE TEMP TABLE duplicate_jobs AS
+    SELECT job_id FROM (
+        SELECT job_id, ROW_NUMBER() OVER (
+            PARTITION BY user_id, catalog_job_id
+            ORDER BY COALESCE(status, 'new') != 'new' DESC, job_id DESC
+        ) AS rn
+        FROM job_recommendations WHERE catalog_job_id IS NOT NULL
+    ) WHERE rn > 1
+    """)
+    removed = [row[0] for row in cur.execute("SELECT job_id FROM duplicate_jobs")]
+    cur.execute("DELETE FROM job_recommendations WHERE job_id IN (SELECT job_id FROM duplicate_jobs)")
+    cur.execute("DROP TABLE duplicate_jobs")
+    cur.execute("DROP INDEX IF EXISTS idx_jobs_user_url")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_user_catalog ON job_recommendations(user_id, catalog_job_id)")
+    return removed
+
+def _migration_4_job_listing_indexes(cur):
+    # Listing queries: per-status pages (Saved tab) and all-jobs pages, both ranked by score.
+    # They also cover plain user_id lookups, so the single-column index is dropped.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user_status_match ON job_recommendations(user_id, status, match_percentage)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user_match ON job_recommendations(user_id, match_percentage)")
+    cur.execute("DROP INDEX IF EXISTS idx_jobs_user")
+
+def _migration_5_full_text_search(cur):
+    """
+    FTS5 indexes kept in sync by triggers.
+
+    jobs_fts covers the catalog (title, company, location, description as plain
+    text). It is contentless: the stripped description is stored nowhere else, and
+    'delete' replays the same html_to_text() of the old values. Jobs saved without
+    a URL have no catalog row and are not indexed.
+
+    resumes_fts reads its text from resume_texts (external content), one entry per
+    distinct resume file, so snippet() can quote the stored text.
+
+    Searches are prefix queries (see _fts_query); the 2- and 3-character prefix
+    indexes keep short prefixes from expanding into hundreds of term lookups.
+    """
+    cur.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        job_title, company_name, location, description,
+        content='', tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts (rowid, job_title, company_name, location, description)
+        VALUES (new.catalog_job_id, new.job_title, new.company_name, new.location, html_to_text(new.job_description));
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, job_title, company_name, location, description)
+        VALUES ('delete', old.catalog_job_id, old.job_title, old.company_name, old.location, html_to_text(old.job_description));
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF job_title, company_name, location, job_description ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, job_title, company_name, location, description)
+        VALUES ('delete', old.catalog_job_id, old.job_title, old.company_name, old.location, html_to_text(old.job_description));
+        INSERT INTO jobs_fts (rowid, job_title, company_name, location, description)
+        VALUES (new.catalog_job_id, new.job_title, new.company_name, new.location, html_to_text(new.job_description));
+    END
+    """)
+    cur.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('delete-all')")
+    cur.execute("""
+        INSERT INTO jobs_fts (rowid, job_title, company_name, location, description)
+        SELECT catalog_job_id, job_title, company_name, location, html_to_text(job_description) FROM jobs
+    """)
+
+    cur.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5(
+        extracted_text,
+        content='resume_texts', content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resume_texts BEGIN
+        INSERT INTO resumes_fts (rowid, extracted_text) VALUES (new.rowid, new.extracted_text);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resume_texts BEGIN
+        INSERT INTO resumes_fts (resumes_fts, rowid, extracted_text) VALUES ('delete', old.rowid, old.extracted_text);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS resumes_fts_update AFTER UPDATE OF extracted_text ON resume_texts BEGIN
+        INSERT INTO resumes_fts (resumes_fts, rowid, extracted_text) VALUES ('delete', old.rowid, old.extracted_text);
+        INSERT INTO resumes_fts (rowid, extracted_text) VALUES (new.rowid, new.extracted_text);
+    END
+    """)
+    cur.execute("INSERT INTO resumes_fts (resumes_fts) VALUES ('rebuild')")
+
+def _migration_6_inline_resume_texts(cur):
+    """
+    Analyses saved before resume_texts existed keep their text inline in
+    resume_analysis.extracted_resume_text, where resumes_fts cannot see it.
+    Each distinct text moves into resume_texts (its insert trigger indexes it),
+    keyed by the SHA-256 of the text, and the analysis references it by hash.
+    The "legacy-inline" parser version keeps these rows from ever serving as an
+    extraction cache hit.
+    """
+    rows = cur.execute("""
+        SELECT analysis_id, extracted_resume_text FROM resume_analysis
+        WHERE resume_hash IS NULL AND extracted_resume_text IS NOT NULL AND extracted_resume_text != ''
+    """).fetchall()
+    for analysis_id, text in rows:
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        cur.execute(
+            """
+            INSERT INTO resume_texts (content_hash, extracted_text, page_count, parser_version, created_at)
+            VALUES (?, ?, NULL, 'legacy-inline', ?)
+            ON CONFLICT(content_hash) DO NOTHING
+            """,
+            (content_hash, text, iso_now()),
+        )
+        cur.execute(
+            "UPDATE resume_analysis SET resume_hash = ?, extracted_resume_text = NULL WHERE analysis_id = ?",
+            (content_hash, analysis_id),
+        )
+
+# (version, description, step). A step that deletes job_recommendations rows returns
+# their job_ids so run_migrations can drop them from the vector index once committed.
+SCHEMA_MIGRATIONS = [
+    (1, "users, resume_analysis and job_recommendations", _migration_1_base_tables),
+    (2, "content-addressed resume_texts", _migration_2_resume_texts),
+    (3, "shared jobs catalog", _migration_3_job_catalog),
+    (4, "job listing indexes", _migration_4_job_listing_indexes),
+    (5, "full-text search over jobs and resumes", _migration_5_full_text_search),
+    (6, "move inline resume texts into resume_texts", _migration_6_inline_resume_texts),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+def run_migrations(connection) -> int:
+    """
+    Brings the database up to SCHEMA_VERSION and returns the version it is at.
+    PRAGMA user_version holds the current version, so an up-to-date database costs
+    one read; schema_version keeps a record of when each step was applied.
+    """
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return version
+
+    cur = connection.cursor()
+    cur.execute("BEGIN IMMEDIATE")
     try:
-        # Check if column already exists
-        cur.execute("PRAGMA table_info(job_recommendations)")
-        rows = cur.fetchall()
-        # If table doesn't exist yet, fetchall returns empty list, loop won't run, which is fine
-        if rows:
-            existing_cols = [r[1] for r in rows]
-            if col_name not in existing_cols:
-                cur.execute(f"ALTER TABLE job_recommendations ADD COLUMN {col_def}")
-    except _sqlite3.OperationalError:
-        pass
-
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS resume_analysis (
-    analysis_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER NOT NULL,
-    extracted_resume_text TEXT,
-    analysis_scores TEXT,
-    strengths TEXT,
-    weaknesses TEXT,
-    identified_skills TEXT,
-    recommended_skills TEXT,
-    analysis_timestamp TEXT,
-    FOREIGN KEY (user_id) REFERENCES users(user_id)
-)
-""")
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS job_recommendations (
-    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER NOT NULL,
-    job_title TEXT,
-    company_name TEXT,
-    location TEXT,
-    job_description TEXT,
-    job_url TEXT,
-    match_percentage REAL,
-    scraping_date TEXT,
-    posted_date TEXT,
-    salary_range TEXT,
-    applicants_count TEXT,
-    required_skills TEXT,
-    job_type TEXT,
-    status TEXT DEFAULT 'new',
-    FOREIGN KEY (user_id) REFERENCES users(user_id)
-)
-""")
+        # Another process may have migrated while we waited for the lock
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """)
+        removed_job_ids = []
+        for number, description, step in SCHEMA_MIGRATIONS:
+            if number <= version:
+                continue
+            logger.info(f"Applying schema migration {number}: {description}")
+            removed_job_ids.extend(step(cur) or ())
+            cur.execute(
+                "INSERT OR REPLACE INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (number, description, iso_now()),
+            )
+            cur.execute(f"PRAGMA user_version = {number}")
+            version = number
+        cur.execute("COMMIT")
+    except BaseException:
+        cur.execute("ROLLBACK")
+        raise
+    if removed_job_ids:
+        get_job_index().remove_many(removed_job_ids)
+    return version
 
-# Indexes
-cur.execute("CREATE INDEX IF NOT EXISTS idx_user_email ON users(email)")
-cur.execute("CREATE INDEX IF NOT EXISTS idx_resume_user ON resume_analysis(user_id)")
-cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user ON job_recommendations(user_id)")
-conn.commit()
+with _read_pool.connection() as _schema_conn:
+    run_migrations(_schema_conn)
 
 # -----------------------------
 # CRUD: Users
@@ -181,7 +652,7 @@ def create_user(
     hashed = hash_password(plain_password)
 
     try:
-        cur.execute(
+        result = _write(
             """
             INSERT INTO users
             (name, email, hashed_password, registration_date,
@@ -201,13 +672,12 @@ def create_user(
                 (experience_years or "").strip() or None,
             ),
         )
-        conn.commit()
-        return {"success": True, "user_id": cur.lastrowid}
+        return {"success": True, "user_id": result.lastrowid}
     except sqlite3.IntegrityError:
         return {"success": False, "error": "Email already exists."}
 
 def get_user_by_email(email: str):
-    cur.execute(
+    row = _read_one(
         """
         SELECT user_id, name, email, registration_date,
                resume_file_path, college_name, course, graduation_year, current_role, experience_years
@@ -215,7 +685,6 @@ def get_user_by_email(email: str):
         """,
         (email.strip().lower(),),
     )
-    row = cur.fetchone()
     if not row:
         return None
     keys = (
@@ -233,7 +702,7 @@ def get_user_by_email(email: str):
     return dict(zip(keys, row))
 
 def get_user_with_password(email: str):
-    cur.execute(
+    row = _read_one(
         """
         SELECT user_id, name, email, hashed_password,
                registration_date, resume_file_path,
@@ -242,7 +711,6 @@ def get_user_with_password(email: str):
         """,
         (email.strip().lower(),),
     )
-    row = cur.fetchone()
     if not row:
         return None
     keys = (
@@ -278,43 +746,49 @@ def update_user(user_id: int, **fields):
 
     params.append(user_id)
     sql = f"UPDATE users SET {', '.join(updates)} WHERE user_id = ?"
-    cur.execute(sql, tuple(params))
-    conn.commit()
-    return {"success": True, "updated": cur.rowcount}
+    result = _write(sql, tuple(params))
+    return {"success": True, "updated": result.rowcount}
 
 def delete_user(user_id: int):
-    cur.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
-    conn.commit()
-    return {"success": True, "deleted": cur.rowcount}
+    result = _write("DELETE FROM users WHERE user_id = ?", (user_id,))
+    return {"success": True, "deleted": result.rowcount}
 
 # -----------------------------
 # CRUD: Resume Analysis
 # -----------------------------
 def save_resume_analysis(
     user_id: int,
-    extracted_text: str,
+    extracted_text: str = None,
     analysis_scores: dict = None,
     strengths: list = None,
     weaknesses: list = None,
     identified_skills: list = None,
     recommended_skills: list = None,
     analysis_timestamp: str = None,
+    resume_hash: str = None,
+    prompt_version: str = None,
 ) -> dict:
-    cur.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
-    if cur.fetchone() is None:
+    """
+    Pass `resume_hash` (a resume_texts key) instead of `extracted_text` to
+    reference the cached text rather than storing another copy of it.
+    `prompt_version` marks rows holding a completed LLM analysis.
+    """
+    if _read_one("SELECT 1 FROM users WHERE user_id = ?", (user_id,)) is None:
         return {"success": False, "error": "User does not exist."}
 
     analysis_timestamp = analysis_timestamp or iso_now()
-    cur.execute(
+    result = _write(
         """
         INSERT INTO resume_analysis
-        (user_id, extracted_resume_text, analysis_scores, strengths,
+        (user_id, extracted_resume_text, resume_hash, prompt_version, analysis_scores, strengths,
          weaknesses, identified_skills, recommended_skills, analysis_timestamp)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             user_id,
-            extracted_text,
+            None if resume_hash else extracted_text,
+            resume_hash,
+            prompt_version,
             json.dumps(analysis_scores or {}),
             json.dumps(strengths or []),
             json.dumps(weaknesses or []),
@@ -323,35 +797,91 @@ def save_resume_analysis(
             analysis_timestamp,
         ),
     )
-    conn.commit()
-    return {"success": True, "analysis_id": cur.lastrowid}
+    return {"success": True, "analysis_id": result.lastrowid}
+
+# Rows saved before the text cache existed still carry their own copy of the text
+RESUME_ANALYSIS_SELECT = """
+    SELECT ra.analysis_id, ra.user_id,
+           COALESCE(ra.extracted_resume_text, rt.extracted_text),
+           ra.analysis_scores, ra.strengths, ra.weaknesses,
+           ra.identified_skills, ra.recommended_skills, ra.analysis_timestamp,
+           ra.resume_hash, ra.prompt_version
+    FROM resume_analysis ra
+    LEFT JOIN resume_texts rt ON rt.content_hash = ra.resume_hash
+"""
+
+RESUME_JSON_DEFAULTS = {
+    "analysis_scores": dict, "strengths": list, "weaknesses": list,
+    "identified_skills": list, "recommended_skills": list,
+}
+
+def _resume_analysis_row(r) -> JsonRow:
+    # JSON columns are decoded only if the caller reads them
+    return JsonRow({
+        "analysis_id": r[0],
+        "user_id": r[1],
+        "extracted_resume_text": r[2],
+        "analysis_scores": r[3],
+        "strengths": r[4],
+        "weaknesses": r[5],
+        "identified_skills": r[6],
+        "recommended_skills": r[7],
+        "analysis_timestamp": r[8],
+        "resume_hash": r[9],
+        "prompt_version": r[10],
+    }, RESUME_JSON_DEFAULTS)
 
 def get_resume_analysis_by_user(user_id: int):
-    cur.execute(
-        "SELECT * FROM resume_analysis WHERE user_id = ? ORDER BY analysis_timestamp DESC",
+    rows = _read_all(
+        RESUME_ANALYSIS_SELECT + " WHERE ra.user_id = ? ORDER BY ra.analysis_timestamp DESC",
         (user_id,),
     )
-    rows = cur.fetchall()
-    results = []
-    for r in rows:
-        results.append(
-            {
-                "analysis_id": r[0],
-                "user_id": r[1],
-                "extracted_resume_text": r[2],
-                "analysis_scores": json.loads(r[3]) if r[3] else {},
-                "strengths": json.loads(r[4]) if r[4] else [],
-                "weaknesses": json.loads(r[5]) if r[5] else [],
-                "identified_skills": json.loads(r[6]) if r[6] else [],
-                "recommended_skills": json.loads(r[7]) if r[7] else [],
-                "analysis_timestamp": r[8],
-            }
-        )
-    return results
+    return [_resume_analysis_row(r) for r in rows]
+
+def count_resume_analyses(user_id: int) -> int:
+    return _read_one("SELECT COUNT(*) FROM resume_analysis WHERE user_id = ?", (user_id,))[0]
+
+def get_stored_analysis(user_id: int, resume_hash: str, prompt_version: str):
+    """Latest completed analysis of this resume made with this prompt version, or None."""
+    row = _read_one(
+        RESUME_ANALYSIS_SELECT
+        + """
+        WHERE ra.user_id = ? AND ra.resume_hash = ? AND ra.prompt_version = ?
+        ORDER BY ra.analysis_timestamp DESC, ra.analysis_id DESC
+        LIMIT 1
+        """,
+        (user_id, resume_hash, prompt_version),
+    )
+    return _resume_analysis_row(row) if row else None
+
+def store_analysis_result(user_id: int, resume_hash: str, prompt_version: str, **fields) -> dict:
+    """
+    Records a completed analysis keyed by (resume_hash, prompt_version). Fills the
+    still-empty row created at upload when there is one (update_resume_analysis),
+    otherwise adds a row, so re-analyses after a prompt change build up history.
+    """
+    def store(connection):
+        # Inside the write transaction, so two results for the same resume cannot both claim the row
+        row = connection.execute(
+            """
+            SELECT analysis_id FROM resume_analysis
+            WHERE user_id = ? AND resume_hash = ? AND prompt_version IS NULL
+                  AND (analysis_scores IS NULL OR analysis_scores IN ('', '{}'))
+            ORDER BY analysis_id DESC LIMIT 1
+            """,
+            (user_id, resume_hash),
+        ).fetchone()
+        if row is None:
+            return save_resume_analysis(user_id, resume_hash=resume_hash, prompt_version=prompt_version, **fields)
+        result = update_resume_analysis(row[0], prompt_version=prompt_version, analysis_timestamp=iso_now(), **fields)
+        return {**result, "analysis_id": row[0]}
+    return _transaction(store)
 
 def update_resume_analysis(analysis_id: int, **fields):
     allowed = {
         "extracted_resume_text",
+        "resume_hash",
+        "prompt_version",
         "analysis_scores",
         "strengths",
         "weaknesses",
@@ -372,18 +902,244 @@ def update_resume_analysis(analysis_id: int, **fields):
 
     params.append(analysis_id)
     sql = f"UPDATE resume_analysis SET {', '.join(updates)} WHERE analysis_id = ?"
-    cur.execute(sql, tuple(params))
-    conn.commit()
-    return {"success": True, "updated": cur.rowcount}
+    result = _write(sql, tuple(params))
+    return {"success": True, "updated": result.rowcount}
 
 def delete_resume_analysis(analysis_id: int):
-    cur.execute("DELETE FROM resume_analysis WHERE analysis_id = ?", (analysis_id,))
-    conn.commit()
-    return {"success": True, "deleted": cur.rowcount}
+    result = _write("DELETE FROM resume_analysis WHERE analysis_id = ?", (analysis_id,))
+    return {"success": True, "deleted": result.rowcount}
+
+def get_latest_resume(user_id: int):
+    """{"resume_hash", "extracted_resume_text"} of the user's most recent resume, or None."""
+    row = _read_one(
+        """
+        SELECT ra.resume_hash, COALESCE(ra.extracted_resume_text, rt.extracted_text)
+        FROM resume_analysis ra
+        LEFT JOIN resume_texts rt ON rt.content_hash = ra.resume_hash
+        WHERE ra.user_id = ?
+        ORDER BY ra.analysis_timestamp DESC, ra.analysis_id DESC
+        LIMIT 1
+        """,
+        (user_id,),
+    )
+    return {"resume_hash": row[0], "extracted_resume_text": row[1]} if row else None
+
+def get_latest_resume_text(user_id: int):
+    """Text of the user's most recent resume, or None."""
+    latest = get_latest_resume(user_id)
+    return latest["extracted_resume_text"] if latest else None
+
+# -----------------------------
+# Extracted text cache (content-addressed)
+# -----------------------------
+def get_cached_resume_text(content_hash: str, parser_version: str):
+    """
+    Cached extraction for a file hash, or None. Entries written by another
+    parser version count as a miss, so changing the extractor invalidates them.
+    """
+    row = _read_one(
+        "SELECT extracted_text, page_count, parser_version FROM resume_texts WHERE content_hash = ?",
+        (content_hash,),
+    )
+    if row is None or row[2] != parser_version:
+        return None
+    return {"content_hash": content_hash, "extracted_text": row[0], "page_count": row[1]}
+
+def save_resume_text(content_hash: str, extracted_text: str, page_count: int, parser_version: str) -> dict:
+    # Updating in place keeps every analysis that references the hash pointing at the fresh text.
+    # An upsert (not INSERT OR REPLACE) so the resumes_fts update trigger fires.
+    _write(
+        """
+        INSERT INTO resume_texts
+        (content_hash, extracted_text, page_count, parser_version, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(content_hash) DO UPDATE SET
+            extracted_text = excluded.extracted_text,
+            page_count = excluded.page_count,
+            parser_version = excluded.parser_version,
+            created_at = excluded.created_at
+        """,
+        (content_hash, extracted_text, page_count, parser_version, iso_now()),
+    )
+    return {"success": True, "content_hash": content_hash}
+
+def prune_resume_texts() -> dict:
+    """Drops cached texts that no analysis references any more (e.g. after a resume is deleted)."""
+    result = _write(
+        """
+        DELETE FROM resume_texts
+        WHERE content_hash NOT IN (
+            SELECT resume_hash FROM resume_analysis WHERE resume_hash IS NOT NULL
+        )
+        """
+    )
+    return {"success": True, "deleted": result.rowcount}
 
 # -----------------------------
 # CRUD: Job Recommendations
 # -----------------------------
+JOB_FIELDS = (
+    "job_title", "company_name", "location", "job_description", "job_url", "match_percentage",
+    "scraping_date", "posted_date", "salary_range", "applicants_count", "required_skills", "job_type",
+    "matching_skills", "missing_skills", "analysis_summary", "component_scores",
+)
+# What a recommendation keeps for itself once the posting is in the catalog
+MATCH_FIELDS = (
+    "match_percentage", "scraping_date", "matching_skills", "missing_skills",
+    "analysis_summary", "component_scores",
+)
+# A re-scraped listing refreshes the match but keeps the user's status
+JOB_MATCH_UPSERT_SQL = f"""
+    INSERT INTO job_recommendations (user_id, catalog_job_id, {", ".join(MATCH_FIELDS)}, status)
+    VALUES ({", ".join("?" for _ in range(len(MATCH_FIELDS) + 3))})
+    ON CONFLICT(user_id, catalog_job_id) DO UPDATE SET
+    {", ".join(f"{name} = excluded.{name}" for name in MATCH_FIELDS)}
+"""
+# Jobs without a URL have no catalog key and keep every field on their own row
+JOB_INLINE_INSERT_SQL = f"""
+    INSERT INTO job_recommendations (user_id, {", ".join(JOB_FIELDS)}, status)
+    VALUES ({", ".join("?" for _ in range(len(JOB_FIELDS) + 2))})
+"""
+# Output column -> SQL over job_recommendations r LEFT JOIN jobs j
+RECOMMENDED_JOB_COLUMNS = {
+    "job_id": "r.job_id",
+    "user_id": "r.user_id",
+    "catalog_job_id": "r.catalog_job_id",
+    "job_url": "COALESCE(j.job_url, r.job_url)",
+    **{name: f"COALESCE(j.{name}, r.{name})" for name in CATALOG_FIELDS},
+    **{name: f"r.{name}" for name in MATCH_FIELDS},
+    "status": "r.status",
+}
+JOB_JSON_DEFAULTS = {"required_skills": list, "matching_skills": list, "missing_skills": list, "component_scores": dict}
+JOB_FROM = """
+    FROM job_recommendations r
+    LEFT JOIN jobs j ON j.catalog_job_id = r.catalog_job_id
+"""
+RECOMMENDED_JOB_SELECT = (
+    "SELECT " + ", ".join(f"{sql} AS {name}" for name, sql in RECOMMENDED_JOB_COLUMNS.items()) + JOB_FROM
+)
+# order_by name -> (sort column, its SQL); ties break on job_id, newest first.
+# Legacy rows may lack a scraping_date: sorting on '' keeps them (last) in keyset pages,
+# where a NULL would fail every (sort, job_id) < (?, ?) comparison.
+JOB_ORDERS = {
+    "match": ("match_percentage", "r.match_percentage"),
+    "recent": ("scraping_date", "COALESCE(r.scraping_date, '')"),
+}
+# Stay well under SQLite's bound-parameter limit in IN (...) lookups
+LOOKUP_CHUNK = 500
+# A catalog page older than this is scraped again (applicant counts, edits, closed postings)
+CATALOG_MAX_AGE_HOURS = float(os.getenv("JOB_CATALOG_MAX_AGE_HOURS", "72"))
+
+def _normalize_job(job: dict, scraping_date: str) -> dict:
+    """Validates one job dict and returns its JOB_FIELDS as stored. Raises ValueError."""
+    job_url = job.get("job_url")
+    if job_url and not is_valid_url(job_url):
+        raise ValueError("Invalid job URL.")
+
+    match_percentage = job.get("match_percentage")
+    if match_percentage is None:
+        match_percentage = 0.0
+    try:
+        match_percentage = float(match_percentage)
+    except (TypeError, ValueError):
+        raise ValueError("match_percentage must be numeric.")
+
+    required_skills = job.get("required_skills")
+    return {
+        "job_title": job.get("job_title"),
+        "company_name": job.get("company_name"),
+        "location": job.get("location"),
+        "job_description": job.get("job_description"),
+        "job_url": canonical_job_url(job_url) if job_url else None,
+        "match_percentage": match_percentage,
+        "scraping_date": job.get("scraping_date") or scraping_date,
+        "posted_date": job.get("posted_date"),
+        "salary_range": job.get("salary_range"),
+        "applicants_count": job.get("applicants_count"),
+        # None (not "[]") when unknown, so it never overwrites parsed skills in the catalog
+        "required_skills": json.dumps(required_skills) if required_skills else None,
+        "job_type": job.get("job_type"),
+        "matching_skills": json.dumps(job.get("matching_skills") or []),
+        "missing_skills": json.dumps(job.get("missing_skills") or []),
+        "analysis_summary": json.dumps(job.get("analysis_summary") or ""),
+        "component_scores": json.dumps(job.get("component_scores") or {}),
+    }
+
+def _lookup_in(connection, sql: str, params: tuple, keys) -> dict:
+    """Runs `sql` (ending in "IN ({})") over `keys` in chunks; maps column 1 -> column 2."""
+    keys = list(keys)
+    found = {}
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[i:i + LOOKUP_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        found.update(connection.execute(sql.format(placeholders), (*params, *chunk)).fetchall())
+    return found
+
+def save_job_recommendations_bulk(user_id: int, jobs: list) -> dict:
+    """
+    Saves many jobs in one transaction. Each job is a dict of save_job_recommendation's
+    keyword arguments. The posting itself is merged into the shared `jobs` catalog
+    (keyed by canonical URL); the user's row holds the match and status. A job this
+    user already has is updated in place, status kept.
+
+    Returns {"success", "job_ids", "errors"}: job_ids follows the input order (None for a
+    job that failed validation) and errors maps those input positions to a message.
+    """
+    if _read_one("SELECT 1 FROM users WHERE user_id = ?", (user_id,)) is None:
+        return {"success": False, "error": "User does not exist."}
+
+    scraping_date = iso_now()
+    rows, errors = [], {}
+    for position, job in enumerate(jobs):
+        try:
+            rows.append((position, _normalize_job(job, scraping_date)))
+        except ValueError as e:
+            errors[position] = str(e)
+
+    keyed = [(position, job) for position, job in rows if job["job_url"]]
+    unkeyed = [(position, job) for position, job in rows if not job["job_url"]]
+    urls = {job["job_url"] for _, job in keyed}
+
+    def upsert(connection):
+        # Scrape timestamps are left alone: they are set when the page is actually fetched
+        connection.executemany(CATALOG_MERGE_SQL, [
+            (job["job_url"], *(job[name] for name in CATALOG_FIELDS), job["scraping_date"], None, None)
+            for _, job in keyed
+        ])
+        catalog_ids = _lookup_in(connection, "SELECT job_url, catalog_job_id FROM jobs WHERE job_url IN ({})", (), urls)
+
+        match_sql = "SELECT catalog_job_id, job_id FROM job_recommendations WHERE user_id = ? AND catalog_job_id IN ({})"
+        existing = _lookup_in(connection, match_sql, (user_id,), catalog_ids.values())
+        connection.executemany(JOB_MATCH_UPSERT_SQL, [
+            (user_id, catalog_ids[job["job_url"]], *(job[name] for name in MATCH_FIELDS), "new")
+            for _, job in keyed
+        ])
+        match_ids = _lookup_in(connection, match_sql, (user_id,), catalog_ids.values())
+
+        ids = {position: match_ids[catalog_ids[job["job_url"]]] for position, job in keyed}
+        for position, job in unkeyed:
+            params = (user_id, *(job[name] for name in JOB_FIELDS), "new")
+            ids[position] = connection.execute(JOB_INLINE_INSERT_SQL, params).lastrowid
+        return ids, set(existing.values())
+
+    ids, existing_ids = _transaction(upsert)
+
+    # Only new rows go into the similarity index; refreshed rows are already there
+    indexed = set()
+    for position, job in rows:
+        job_id = ids[position]
+        if job_id in existing_ids or job_id in indexed:
+            continue
+        indexed.add(job_id)
+        _index_job(job_id, user_id, job["job_title"], job["company_name"], job["location"],
+                   job["job_description"], jobs[position].get("required_skills"))
+
+    return {
+        "success": True,
+        "job_ids": [ids.get(position) for position in range(len(jobs))],
+        "errors": errors,
+    }
+
 def save_job_recommendation(
     user_id: int,
     job_title: str,
@@ -403,97 +1159,322 @@ def save_job_recommendation(
     analysis_summary: str = None,
     component_scores: dict = None
 ) -> dict:
-    cur.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
-    if cur.fetchone() is None:
-        return {"success": False, "error": "User does not exist."}
+    """Saves (or refreshes, see save_job_recommendations_bulk) a single job."""
+    job = {
+        "job_title": job_title,
+        "company_name": company_name,
+        "location": location,
+        "job_description": job_description,
+        "job_url": job_url,
+        "match_percentage": match_percentage,
+        "scraping_date": scraping_date,
+        "posted_date": posted_date,
+        "salary_range": salary_range,
+        "applicants_count": applicants_count,
+        "required_skills": required_skills,
+        "job_type": job_type,
+        "matching_skills": matching_skills,
+        "missing_skills": missing_skills,
+        "analysis_summary": analysis_summary,
+        "component_scores": component_scores,
+    }
+    result = save_job_recommendations_bulk(user_id, [job])
+    if not result["success"]:
+        return result
+    if result["errors"]:
+        return {"success": False, "error": result["errors"][0]}
+    return {"success": True, "job_id": result["job_ids"][0]}
 
-    if job_url and not is_valid_url(job_url):
+def _decode_job_row(row_dict: dict) -> JsonRow:
+    # JSON fields are parsed safely on first access
+    return JsonRow(row_dict, JOB_JSON_DEFAULTS)
+
+def _job_filters(user_id: int, statuses=None, min_match: float = 0.0, max_match: float = None,
+                 since: str = None, until: str = None):
+    """WHERE clause and parameters shared by query_recommended_jobs and count_recommended_jobs."""
+    clauses, params = ["r.user_id = ?"], [user_id]
+    if statuses:
+        statuses = [statuses] if isinstance(statuses, str) else list(statuses)
+        clauses.append(f"r.status IN ({', '.join('?' for _ in statuses)})")
+        params.extend(statuses)
+    if min_match:
+        clauses.append("r.match_percentage >= ?")
+        params.append(float(min_match))
+    if max_match is not None:
+        clauses.append("r.match_percentage <= ?")
+        params.append(float(max_match))
+    # scraping_date is ISO-8601, so string comparison orders it correctly
+    if since:
+        clauses.append("r.scraping_date >= ?")
+        params.append(since)
+    if until:
+        clauses.append("r.scraping_date < ?")
+        params.append(until)
+    return " AND ".join(clauses), params
+
+def query_recommended_jobs(
+    user_id: int,
+    columns=None,
+    statuses=None,
+    min_match: float = 0.0,
+    max_match: float = None,
+    since: str = None,
+    until: str = None,
+    order_by: str = "match",
+    limit: int = None,
+    offset: int = 0,
+    after: tuple = None,
+) -> list:
+    """
+    A user's jobs with filtering, ordering and paging done in SQL.
+
+    columns: names from RECOMMENDED_JOB_COLUMNS to return (default: all). job_id and
+        the sort column are always included; leaving out job_description skips the
+        largest field.
+    statuses: one status or several ("saved", "applied", ...).
+    since / until: ISO timestamps bounding scraping_date (until is exclusive).
+    order_by: "match" (best first) or "recent" (newest first).
+    limit / offset: plain pages. For deep pages prefer `after`, the
+        job_cursor() of the last row seen, which seeks instead of skipping rows.
+    """
+    if order_by not in JOB_ORDERS:
+        raise ValueError(f"order_by must be one of {sorted(JOB_ORDERS)}")
+    sort_name, sort_sql = JOB_ORDERS[order_by]
+
+    names = list(RECOMMENDED_JOB_COLUMNS) if columns is None else list(dict.fromkeys(["job_id", sort_name, *columns]))
+    unknown = [name for name in names if name not in RECOMMENDED_JOB_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown job columns: {unknown}")
+
+    where, params = _job_filters(user_id, statuses, min_match, max_match, since, until)
+    if after is not None:
+        where += f" AND ({sort_sql}, r.job_id) < (?, ?)"
+        params.extend(after)
+
+    sql = "SELECT " + ", ".join(f"{RECOMMENDED_JOB_COLUMNS[name]} AS {name}" for name in names)
+    # The catalog join is only needed when a catalog column is selected
+    if any(name == "job_url" or name in CATALOG_FIELDS for name in names):
+        sql += JOB_FROM
+    else:
+        sql += " FROM job_recommendations r "
+    sql += f"WHERE {where} ORDER BY {sort_sql} DESC, r.job_id DESC"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([int(limit), int(offset)])
+    elif offset:
+        sql += " LIMIT -1 OFFSET ?"
+        params.append(int(offset))
+
+    return [_decode_job_row(row) for row in _read_dicts(sql, params)]
+
+def job_cursor(job: dict, order_by: str = "match") -> tuple:
+    """Keyset cursor for query_recommended_jobs(after=...) continuing after `job`."""
+    value = job[JOB_ORDERS[order_by][0]]
+    return ("" if value is None else value), job["job_id"]
+
+def count_recommended_jobs(user_id: int, statuses=None, min_match: float = 0.0, max_match: float = None,
+                           since: str = None, until: str = None) -> int:
+    """Number of jobs query_recommended_jobs would return, counted from the index alone."""
+    where, params = _job_filters(user_id, statuses, min_match, max_match, since, until)
+    return _read_one(f"SELECT COUNT(*) FROM job_recommendations r WHERE {where}", params)[0]
+
+def get_recommended_jobs(user_id: int, min_match: float = 0.0):
+    """Every column of every job at or above min_match, best match first."""
+    return query_recommended_jobs(user_id, min_match=min_match)
+
+def update_job_status(job_id: int, status: str):
+    _write("UPDATE job_recommendations SET status = ? WHERE job_id = ?", (status, job_id))
+    return {"success": True}
+
+def delete_job_recommendation(job_id: int):
+    result = _write("DELETE FROM job_recommendations WHERE job_id = ?", (job_id,))
+    try:
+        get_job_index().remove(job_id)
+    except Exception:
+        pass  # index is a cache; a stale entry is filtered out on lookup
+    return {"success": True, "deleted": result.rowcount}
+
+# -----------------------------
+# Job catalog (shared across users)
+# -----------------------------
+def get_catalog_job(job_url: str, max_age_hours: float = CATALOG_MAX_AGE_HOURS):
+    """
+    The catalog row for this posting if its page was scraped within `max_age_hours`,
+    else None. `parsed_at` is set once the JD fields (salary_range, required_skills,
+    job_type) have been parsed from it.
+    """
+    rows = _read_dicts("SELECT * FROM jobs WHERE job_url = ?", (canonical_job_url(job_url),))
+    if not rows or not rows[0]["job_description"] or not rows[0]["scraped_at"]:
+        return None
+    row = rows[0]
+    if datetime.fromisoformat(row["scraped_at"]) < datetime.utcnow() - timedelta(hours=max_age_hours):
+        return None
+    return _decode_job_row(row)
+
+def save_catalog_job(job_url: str, fields: dict, parsed: bool = False) -> dict:
+    """
+    Merges freshly scraped page fields (job_description, applicants_count, ...) or,
+    with parsed=True, the parsed JD fields into the catalog. Missing fields keep
+    their stored values.
+    """
+    if not job_url or not is_valid_url(job_url):
         return {"success": False, "error": "Invalid job URL."}
 
-    if match_percentage is None:
-        match_percentage = 0.0
+    now = iso_now()
+    values = [fields.get(name) for name in CATALOG_FIELDS]
+    skills_at = CATALOG_FIELDS.index("required_skills")
+    values[skills_at] = json.dumps(values[skills_at]) if values[skills_at] else None
+    scraped_at = now if fields.get("job_description") else None
+    _write(CATALOG_MERGE_SQL, (canonical_job_url(job_url), *values, now, scraped_at, now if parsed else None))
+    return {"success": True}
+
+# -----------------------------
+# Similarity search (vector index over job descriptions)
+# -----------------------------
+def _job_index_text(job_title, company_name, location, job_description, required_skills) -> str:
+    skills = " ".join(required_skills) if isinstance(required_skills, list) else (required_skills or "")
+    return " ".join([job_title or "", company_name or "", location or "", html_to_text(job_description), skills])
+
+def _index_job(job_id, user_id, job_title, company_name, location, job_description, required_skills):
     try:
-        match_percentage = float(match_percentage)
-    except ValueError:
-        return {"success": False, "error": "match_percentage must be numeric."}
+        get_job_index().add(
+            job_id, user_id,
+            _job_index_text(job_title, company_name, location, job_description, required_skills),
+        )
+    except Exception as e:
+        # Never fail a save because of the index; rebuild_job_index() can catch it up
+        logger.warning(f"Failed to index job {job_id}: {e}")
 
-    scraping_date = scraping_date or iso_now()
-    cur.execute(
+def rebuild_job_index() -> dict:
+    """Re-vectorises every stored job (e.g. after upgrading an existing database)."""
+    rows = _read_all(
+        """
+        SELECT r.job_id, r.user_id,
+               COALESCE(j.job_title, r.job_title), COALESCE(j.company_name, r.company_name),
+               COALESCE(j.location, r.location), COALESCE(j.job_description, r.job_description),
+               COALESCE(j.required_skills, r.required_skills)
+        FROM job_recommendations r
+        LEFT JOIN jobs j ON j.catalog_job_id = r.catalog_job_id
         """
-        INSERT INTO job_recommendations
-        (user_id, job_title, company_name, location, job_description,
-         job_url, match_percentage, scraping_date, posted_date, salary_range, 
-         applicants_count, required_skills, job_type, matching_skills, 
-         missing_skills, analysis_summary, component_scores, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            user_id,
-            job_title,
-            company_name,
-            location,
-            job_description,
-            job_url,
-            match_percentage,
-            scraping_date,
-            posted_date,
-            salary_range,
-            applicants_count,
-            json.dumps(required_skills or []),
-            job_type,
-            json.dumps(matching_skills or []),
-            json.dumps(missing_skills or []),
-            json.dumps(analysis_summary or ""),
-            json.dumps(component_scores or {}),
-            "new"
-        ),
     )
-    conn.commit()
-    return {"success": True, "job_id": cur.lastrowid}
 
-def get_recommended_jobs(user_id: int, min_match: float = 0.0):
-    cur.execute(
-        """
-        SELECT * FROM job_recommendations
-        WHERE user_id = ? AND match_percentage >= ?
-        ORDER BY match_percentage DESC
-        """,
-        (user_id, float(min_match)),
+    def jobs():
+        for job_id, user_id, title, company, location, description, skills in rows:
+            try:
+                skills = json.loads(skills) if skills else []
+            except Exception:
+                skills = []
+            yield job_id, user_id, _job_index_text(title, company, location, description, skills)
+
+    count = get_job_index().rebuild(jobs())
+    return {"success": True, "indexed": count}
+
+def get_similar_jobs(user_id: int, text: str, top_k: int = 10):
+    """
+    Stored jobs of this user ranked by cosine similarity to `text` (e.g. the resume).
+    Each row is the get_recommended_jobs dict plus a "similarity" score in [0, 1].
+    """
+    index = get_job_index()
+    if not len(index):
+        rebuild_job_index()  # first use on a database created before the index existed
+    hits = index.query(text, top_k=top_k, user_id=user_id)
+    if not hits:
+        return []
+
+    scores = dict(hits)
+    placeholders = ", ".join("?" for _ in hits)
+    rows = _read_dicts(
+        RECOMMENDED_JOB_SELECT + f"WHERE r.user_id = ? AND r.job_id IN ({placeholders})",
+        (user_id, *scores.keys()),
     )
-    rows = cur.fetchall()
-    results = []
-    
-    # Get column names dynamically to handle schema evolution safer
-    col_names = [description[0] for description in cur.description]
-    
-    for r in rows:
-        row_dict = dict(zip(col_names, r))
-        
-        # Parse JSON fields safely
-        for json_field in ['required_skills', 'matching_skills', 'missing_skills', 'component_scores']:
-            if row_dict.get(json_field):
-                try:
-                    row_dict[json_field] = json.loads(row_dict[json_field])
-                except Exception:
-                    row_dict[json_field] = [] if json_field != 'component_scores' else {}
-            else:
-                 row_dict[json_field] = [] if json_field != 'component_scores' else {}
 
-        results.append(row_dict)
-    return results
+    rows = [_decode_job_row(row_dict) for row_dict in rows]
+    for row in rows:
+        row["similarity"] = scores[row["job_id"]]
 
-def update_job_status(job_id: int, status: str):
-    cur.execute("UPDATE job_recommendations SET status = ? WHERE job_id = ?", (status, job_id))
-    conn.commit()
-    return {"success": True}
+    rows.sort(key=lambda r: r["similarity"], reverse=True)
+    return rows
 
-def delete_job_recommendation(job_id: int):
-    cur.execute("DELETE FROM job_recommendations WHERE job_id = ?", (job_id,))
-    conn.commit()
-    return {"success": True, "deleted": cur.rowcount}
+# -----------------------------
+# Full-text search (FTS5)
+# -----------------------------
+FTS_TOKEN_RE = re.compile(r"\w+")
+# bm25 column weights for jobs_fts: title, company, location, description
+JOB_FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+def _fts_query(text: str) -> str:
+    """
+    User input as an FTS5 query: every word must appear, each as a prefix
+    ("pyth" finds "python"). Quoting each word keeps operators and punctuation
+    in the input from being parsed as query syntax.
+    """
+    return " ".join(f'"{token}"*' for token in FTS_TOKEN_RE.findall(text or ""))
+
+def search_jobs(user_id: int, query: str, limit: int = 20, statuses=None, columns=None) -> list:
+    """
+    This user's jobs matching `query` in title, company, location or description,
+    best match first (bm25, title weighted highest). Rows are query_recommended_jobs
+    rows (`columns` projects them the same way) plus a "rank" (lower is better).
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+
+    names = list(RECOMMENDED_JOB_COLUMNS) if columns is None else list(dict.fromkeys(["job_id", *columns]))
+    unknown = [name for name in names if name not in RECOMMENDED_JOB_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown job columns: {unknown}")
+
+    params = [match, user_id]
+    status_clause = ""
+    if statuses:
+        statuses = [statuses] if isinstance(statuses, str) else list(statuses)
+        status_clause = f"AND r.status IN ({', '.join('?' for _ in statuses)})"
+        params.extend(statuses)
+    params.append(int(limit))
+
+    rows = _read_dicts(
+        "SELECT " + ", ".join(f"{RECOMMENDED_JOB_COLUMNS[name]} AS {name}" for name in names)
+        + f""", bm25(jobs_fts, {", ".join(map(str, JOB_FTS_WEIGHTS))}) AS rank
+        FROM jobs_fts
+        JOIN jobs j ON j.catalog_job_id = jobs_fts.rowid
+        JOIN job_recommendations r ON r.catalog_job_id = j.catalog_job_id
+        WHERE jobs_fts MATCH ? AND r.user_id = ? {status_clause}
+        ORDER BY rank
+        LIMIT ?
+        """,
+        params,
+    )
+    return [_decode_job_row(row) for row in rows]
+
+def search_resumes(user_id: int, query: str, limit: int = 10) -> list:
+    """
+    This user's uploaded resumes whose text matches `query`, best match first:
+    [{"content_hash", "snippet", "last_analyzed", "rank"}]. Matches are marked
+    [like this] in the snippet.
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+    return _read_dicts(
+        """
+        SELECT rt.content_hash,
+               snippet(resumes_fts, 0, '[', ']', ' ... ', 16) AS snippet,
+               (SELECT MAX(ra.analysis_timestamp) FROM resume_analysis ra
+                WHERE ra.resume_hash = rt.content_hash AND ra.user_id = ?) AS last_analyzed,
+               bm25(resumes_fts) AS rank
+        FROM resumes_fts
+        JOIN resume_texts rt ON rt.rowid = resumes_fts.rowid
+        WHERE resumes_fts MATCH ?
+          AND EXISTS (SELECT 1 FROM resume_analysis ra WHERE ra.resume_hash = rt.content_hash AND ra.user_id = ?)
+        ORDER BY rank
+        LIMIT ?
+        """,
+        (user_id, match, user_id, int(limit)),
+    )
 
 # -----------------------------
 # Close connection helper
 # -----------------------------
 def close_db():
-    conn.close()
+    _read_pool.close()
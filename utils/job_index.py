@@ -0,0 +1,302 @@
+# utils/job_index.py
+import os
+import re
+import html
+import math
+import zlib
+import threading
+from collections import Counter
+from typing import List, Tuple, Optional, Iterable
+
+import numpy as np
+
+from utils.data_paths import data_path
+
+try:  # POSIX only; on Windows a single app process is assumed
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# -----------------------------
+# Settings
+# -----------------------------
+# Lives next to the app database: its rows are that database's job_ids
+INDEX_DIR = os.getenv("JOB_INDEX_DIR", data_path("job_index"))
+N_FEATURES = 1 << 18
+# Recently added jobs are scanned brute-force until they exceed this many non-zeros
+MAX_PENDING_NNZ = 50_000
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+TAG_RE = re.compile(r"<[^>]+>")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or that the this to was we were will with you
+your our their they all any can may must should would about also into over more other such than not
+""".split())
+
+
+def html_to_text(text: str) -> str:
+    if not text:
+        return ""
+    return html.unescape(TAG_RE.sub(" ", text))
+
+
+def vectorize(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Sublinear-TF hashed features, L2-normalised. Returns (feature_ids int32, weights float32)."""
+    # crc32 is stable across processes (str hash() is salted per interpreter)
+    counts = Counter(
+        zlib.crc32(tok.encode("utf-8")) % N_FEATURES
+        for tok in TOKEN_RE.findall(text.lower()) if tok not in STOPWORDS
+    )
+    if not counts:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    cols = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    vals = np.fromiter((1.0 + math.log(c) for c in counts.values()), dtype=np.float32, count=len(counts))
+    vals /= np.linalg.norm(vals)
+    return cols, vals
+
+
+class JobVectorIndex:
+    """
+    Sparse matrix of job vectors (one row per stored job), persisted as flat binary files:
+
+        docs.bin     int64 pairs (job_id, user_id), one per row
+        rows.bin     int32 row number of each non-zero
+        cols.bin     int32 feature id of each non-zero
+        vals.bin     float32 weight of each non-zero
+        deleted.bin  int64 job_ids removed since the last rebuild
+
+    Adding a job appends a few hundred bytes. In memory the matrix is kept column-major
+    (CSC), so a query is one sparse matrix-vector product that only touches the
+    columns present in the query. IDF comes from the stored document frequencies
+    and is applied on the query side.
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        self.index_dir = index_dir
+        os.makedirs(index_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._load()
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _read(self, name: str, dtype) -> np.ndarray:
+        path = self._path(name)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=dtype)
+        return np.fromfile(path, dtype=dtype)
+
+    def _size(self, name: str) -> int:
+        path = self._path(name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def _file_lock(self):
+        handle = open(self._path(".lock"), "a")
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _load(self) -> None:
+        docs = self._read("docs.bin", np.int64)
+        docs = docs[: len(docs) // 2 * 2].reshape(-1, 2)
+        rows = self._read("rows.bin", np.int32)
+        cols = self._read("cols.bin", np.int32)
+        vals = self._read("vals.bin", np.float32)
+
+        # A crash mid-append can leave the files different lengths; keep the consistent prefix
+        nnz = min(len(rows), len(cols), len(vals))
+        keep = rows[:nnz] < len(docs)
+        rows, cols, vals = rows[:nnz][keep], cols[:nnz][keep], vals[:nnz][keep]
+
+        self._docs = docs
+        self._disk_nnz = len(rows)
+        self._build_csc(rows, cols, vals)
+        self._pending = []
+        self._load_deleted()
+
+    def _load_deleted(self) -> None:
+        self._deleted = set(self._read("deleted.bin", np.int64).tolist())
+        self._deleted_bytes = self._size("deleted.bin")
+
+    def _build_csc(self, rows: np.ndarray, cols: np.ndarray, vals: np.ndarray) -> None:
+        order = np.argsort(cols, kind="stable")
+        self._csc_rows = rows[order]
+        self._csc_vals = vals[order]
+        self._df = np.bincount(cols, minlength=N_FEATURES)
+        self._col_ptr = np.zeros(N_FEATURES + 1, dtype=np.int64)
+        np.cumsum(self._df, out=self._col_ptr[1:])
+
+    def _merge_pending(self) -> None:
+        """Folds recently added jobs into the CSC arrays."""
+        cols = np.repeat(np.arange(N_FEATURES, dtype=np.int32), self._df)
+        self._docs = np.concatenate([self._docs] + [p[0] for p in self._pending])
+        self._build_csc(
+            np.concatenate([self._csc_rows] + [p[1] for p in self._pending]),
+            np.concatenate([cols] + [p[2] for p in self._pending]),
+            np.concatenate([self._csc_vals] + [p[3] for p in self._pending]),
+        )
+        self._pending = []
+
+    def _mem_doc_count(self) -> int:
+        return len(self._docs) + len(self._pending)
+
+    def _refresh(self) -> None:
+        """Picks up appends/deletes made by other processes."""
+        if self._size("docs.bin") // 16 != self._mem_doc_count():
+            self._load()
+        elif self._size("deleted.bin") != self._deleted_bytes:
+            self._load_deleted()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._mem_doc_count()
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def add(self, job_id: int, user_id: int, text: str) -> None:
+        """Vectorises one job and appends it to the index (memory + disk)."""
+        cols, vals = vectorize(text)
+        with self._lock:
+            lock_handle = self._file_lock()
+            try:
+                self._refresh()
+                # Drop any half-written tail so it cannot be attributed to this row
+                for name in ("rows.bin", "cols.bin", "vals.bin"):
+                    if self._size(name) > self._disk_nnz * 4:
+                        os.truncate(self._path(name), self._disk_nnz * 4)
+
+                rows = np.full(len(cols), self._mem_doc_count(), dtype=np.int32)
+                doc = np.array([[job_id, user_id]], dtype=np.int64)
+
+                # Non-zeros first, doc entry last, so a partial write is dropped on load
+                for name, arr in (("rows.bin", rows), ("cols.bin", cols), ("vals.bin", vals), ("docs.bin", doc)):
+                    with open(self._path(name), "ab") as f:
+                        arr.tofile(f)
+
+                self._disk_nnz += len(cols)
+                self._pending.append((doc, rows, cols, vals))
+                self._deleted.discard(job_id)
+            finally:
+                lock_handle.close()
+
+    def remove(self, job_id: int) -> None:
+        self.remove_many([job_id])
+
+    def remove_many(self, job_ids: Iterable[int]) -> None:
+        """Tombstones jobs until the next rebuild (memory + disk)."""
+        with self._lock:
+            lock_handle = self._file_lock()
+            try:
+                # A rebuild in another process may have reset deleted.bin since we last looked
+                self._refresh()
+                new_ids = [job_id for job_id in dict.fromkeys(job_ids) if job_id not in self._deleted]
+                if not new_ids:
+                    return
+                with open(self._path("deleted.bin"), "ab") as f:
+                    np.array(new_ids, dtype=np.int64).tofile(f)
+                self._deleted.update(new_ids)
+                self._deleted_bytes = self._size("deleted.bin")
+            finally:
+                lock_handle.close()
+
+    def rebuild(self, jobs: Iterable[Tuple[int, int, str]]) -> int:
+        """Replaces the whole index with (job_id, user_id, text) tuples. Returns the job count."""
+        docs, rows, cols, vals = [], [], [], []
+        for row, (job_id, user_id, text) in enumerate(jobs):
+            c, v = vectorize(text)
+            docs.append((job_id, user_id))
+            rows.append(np.full(len(c), row, dtype=np.int32))
+            cols.append(c)
+            vals.append(v)
+
+        with self._lock:
+            lock_handle = self._file_lock()
+            try:
+                np.array(docs, dtype=np.int64).reshape(-1, 2).tofile(self._path("docs.bin"))
+                (np.concatenate(rows) if rows else np.empty(0, np.int32)).tofile(self._path("rows.bin"))
+                (np.concatenate(cols) if cols else np.empty(0, np.int32)).tofile(self._path("cols.bin"))
+                (np.concatenate(vals) if vals else np.empty(0, np.float32)).tofile(self._path("vals.bin"))
+                np.empty(0, np.int64).tofile(self._path("deleted.bin"))
+                self._load()
+            finally:
+                lock_handle.close()
+        return len(docs)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def query(self, text: str, top_k: int = 10, user_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Top-k (job_id, cosine score) for `text`, optionally restricted to one user's jobs."""
+        q_cols, q_vals = vectorize(text)
+        if not len(q_cols):
+            return []
+
+        with self._lock:
+            self._refresh()
+            if sum(len(p[1]) for p in self._pending) > MAX_PENDING_NNZ:
+                self._merge_pending()
+            docs = self._docs
+            pending = bool(self._pending)
+            if pending:
+                docs = np.concatenate([docs] + [p[0] for p in self._pending])
+                p_rows = np.concatenate([p[1] for p in self._pending])
+                p_cols = np.concatenate([p[2] for p in self._pending])
+                p_vals = np.concatenate([p[3] for p in self._pending])
+            csc_rows, csc_vals, col_ptr, df = self._csc_rows, self._csc_vals, self._col_ptr, self._df
+            deleted = np.fromiter(self._deleted, dtype=np.int64) if self._deleted else None
+
+        n_docs = len(docs)
+        if not n_docs:
+            return []
+
+        q_df = df[q_cols]
+        if pending:
+            q_df = q_df + np.bincount(p_cols, minlength=N_FEATURES)[q_cols]
+        q_weights = q_vals * (np.log((1.0 + n_docs) / (1.0 + q_df)) + 1.0)
+        q_weights /= np.linalg.norm(q_weights)
+
+        # CSC mat-vec: gather only the posting ranges of the query's features
+        starts = col_ptr[q_cols]
+        lengths = col_ptr[q_cols + 1] - starts
+        total = int(lengths.sum())
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        scores = np.bincount(
+            csc_rows[offsets],
+            weights=csc_vals[offsets] * np.repeat(q_weights, lengths),
+            minlength=n_docs,
+        ).astype(np.float64, copy=False)
+
+        if pending:
+            q_dense = np.zeros(N_FEATURES, dtype=np.float32)
+            q_dense[q_cols] = q_weights
+            scores += np.bincount(p_rows, weights=p_vals * q_dense[p_cols], minlength=n_docs)
+
+        if user_id is not None:
+            scores[docs[:, 1] != user_id] = -np.inf
+        if deleted is not None:
+            scores[np.isin(docs[:, 0], deleted)] = -np.inf
+
+        k = min(top_k, n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(docs[i, 0]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+# -----------------------------
+# Process-wide instance
+# -----------------------------
+_index: Optional[JobVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_job_index() -> JobVectorIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = JobVectorIndex()
+    return _index
@@ -0,0 +1,57 @@
+# utils/json_row.py
+import json
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict
+
+
+class JsonRow(MutableMapping):
+    """
+    A database row (column name -> value) whose JSON text columns are decoded on
+    first access and cached. Pages that only count rows or read one plain column
+    never pay for json.loads on the rest.
+
+    Behaves like the dict rows it replaces: row["x"], .get(), `in`, iteration in
+    column order, ** unpacking and == all work. Use dict(row) where a real dict
+    is required (e.g. json.dumps), which decodes everything.
+    """
+
+    __slots__ = ("_data", "_pending")
+
+    def __init__(self, data: Dict[str, Any], json_defaults: Dict[str, Callable[[], Any]]):
+        """
+        data: the row as read, JSON columns still as text.
+        json_defaults: JSON column -> factory for the value used when it is empty or invalid.
+        """
+        self._data = data
+        self._pending = {name: default for name, default in json_defaults.items() if name in data}
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        default = self._pending.pop(key, None)
+        if default is not None:
+            try:
+                value = json.loads(value) if value else default()
+            except Exception:
+                value = default()
+            self._data[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._pending.pop(key, None)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return f"JsonRow({dict(self)!r})"